@@ -0,0 +1,58 @@
+from typing import Any, Iterable, List, Optional, Tuple
+import numpy as np
+
+# Enumeração comum das ações de movimento.
+# Internamente (políticas, agentes, ambientes) as ações são inteiros 0..7;
+# os nomes em texto ficam apenas como formato de fronteira (configs JSON, debug).
+NORTE, SUL, ESTE, OESTE, NORDESTE, SUDESTE, SUDOESTE, NOROESTE = range(8)
+
+NOMES_ACCOES = ("norte", "sul", "este", "oeste", "nordeste", "sudeste", "sudoeste", "noroeste")
+N_ACCOES = len(NOMES_ACCOES)
+
+# Vetor (dx, dy) de cada ação. A ordem coincide com Sensor.VIZINHANCA:
+# o bit i da máscara de obstáculos é a parede que a ação i encontraria.
+VETORES = ((0, -1), (0, 1), (1, 0), (-1, 0), (1, -1), (1, 1), (-1, 1), (-1, -1))
+DX = tuple(v[0] for v in VETORES)
+DY = tuple(v[1] for v in VETORES)
+DELTAS = np.array(VETORES, dtype=np.int64) # Tabela dx/dy para código vetorizado
+
+_ID_POR_NOME = {nome: i for i, nome in enumerate(NOMES_ACCOES)}
+_ID_POR_VETOR = {v: i for i, v in enumerate(VETORES)}
+
+
+def id_accao(accao: Any) -> int:
+    """Converte uma ação (id, nome ou vetor (dx, dy)) para o seu id inteiro."""
+    if type(accao) is int:
+        return accao
+    if isinstance(accao, str):
+        return _ID_POR_NOME[accao.lower()]
+    if isinstance(accao, (tuple, list)):
+        return _ID_POR_VETOR[tuple(accao)]
+    raise ValueError(f"Ação desconhecida: {accao!r}")
+
+
+def ids_accoes(accoes: Iterable[Any]) -> List[int]:
+    """Converte uma lista de ações (ex: lida de um JSON) para ids inteiros."""
+    return [id_accao(a) for a in accoes]
+
+
+def nome_accao(accao_id: int) -> str:
+    return NOMES_ACCOES[accao_id]
+
+
+def vetor_accao(direcao: Any) -> Optional[Tuple[float, float]]:
+    """
+    Vetor (dx, dy) de uma direção em qualquer formato aceite pelos ambientes:
+    id inteiro, nome em texto (desconhecido -> (0, 0)) ou vetor já calculado.
+    Devolve None se a direção não for utilizável.
+    """
+    if type(direcao) is int:
+        return VETORES[direcao]
+    if not direcao:
+        return None
+    if isinstance(direcao, str):
+        i = _ID_POR_NOME.get(direcao.lower())
+        return VETORES[i] if i is not None else (0, 0)
+    if isinstance(direcao, (tuple, list)) and len(direcao) == 2:
+        return direcao
+    return None
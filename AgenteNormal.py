@@ -4,7 +4,8 @@ from Agente import Agente
 from Modelos import Accao
 from Sensor import SensorDirecao
 # Importar as políticas novas
-from Politica import PoliticaAleatoria, PoliticaGulosa
+from Politica import PoliticaAleatoria, PoliticaGulosa, PoliticaPlaneador
+import Registo
 
 class AgenteNormal(Agente):
     def __init__(self, nome: str, posicao: tuple, ficheiro_config: str = None):
@@ -31,16 +32,19 @@ class AgenteNormal(Agente):
                 cfg = json.load(f)
                 modo = cfg.get("modo", "aleatorio")
                 
-                print(f"[{self.nome}] Modo configurado: {modo}")
+                Registo.depuracao(f"[{self.nome}] Modo configurado: {modo}")
 
                 # AQUI ESCOLHEMOS A POLÍTICA (O CÉREBRO)
                 if modo == "seguidor" or modo == "guloso":
                     self.politica = PoliticaGulosa(self.accoes_possiveis)
+                elif modo == "planeador":
+                    # Rota mais curta até ao alvo, contornando as paredes (ver Planeador.py)
+                    self.politica = PoliticaPlaneador(self.accoes_possiveis)
                 else:
                     self.politica = PoliticaAleatoria(self.accoes_possiveis)
 
         except Exception as e:
-            print(f"Erro config AgenteNormal: {e}")
+            Registo.erro(f"Erro config AgenteNormal: {e}")
 
     def age(self):
         """
@@ -51,9 +55,11 @@ class AgenteNormal(Agente):
         
         # Tenta usar o SensorDirecao se tivermos uma política Gulosa
         if isinstance(self.politica, PoliticaGulosa):
+            if isinstance(self.politica, PoliticaPlaneador):
+                self.politica.ambiente = self.ambiente # O planeador consulta as rotas do mapa deste ambiente
             sensor_dir = next((s for s in self.sensores if isinstance(s, SensorDirecao)), None)
             if sensor_dir:
-                obs = sensor_dir.detetar(self.ambiente, self)
+                obs = self.ler_sensor(sensor_dir)
         
         # Se não houver observação específica (ou for modo aleatório), 
         # usa a última observação genérica ou cria uma vazia
@@ -1,10 +1,20 @@
 import json
+import os
 from Agente import Agente
-from Modelos import Accao, Observacao
-from Politica import PoliticaQLearning
+from Modelos import Accao, Observacao, ObservacaoEstado
+from Politica import PoliticaQLearning, PoliticaQLambda, PoliticaSarsaLambda, PoliticaDynaQ
 from Sensor import SensorDirecao, SensorProximidade
+from Checkpoint import GestorCheckpoints
+import FicheiroQ
+import TabelaPartilhada
+from Estado import DESCONHECIDA, N_MASCARAS, id_direcao, rotulo_direcao
+import Registo
 
 class AgenteRL(Agente):
+    JUNTAR_LEITURAS = False # O estado é montado no age() a partir de cada sensor
+    # Só o dono de uma tabela partilhada a carrega e grava em disco. Posto a False na classe antes de criar
+    # os agentes (ex: trabalhadores de treinar_paralelo), nenhum lê a memória nem cria checkpoints
+    dono_memoria = True
     def __init__(self, nome: str, posicao: tuple, ficheiro_config: str):
         super().__init__(nome)
         self.cor = "red"
@@ -18,47 +28,123 @@ class AgenteRL(Agente):
         self.ficheiro_config = caminho_limpo
         # Agora o ficheiro de memória também fica com o caminho correto
         self.ficheiro_memoria = caminho_limpo.replace(".json", ".pkl")
+        # Gravação periódica da Q-Table em segundo plano (bloco "checkpoint" do JSON; None desativa,
+        # ex: em estudos paralelos)
+        self.checkpoints = None
+        self._config_checkpoint = {}
+        # "inferencia": true no JSON -> depois de carregar a memória, a política é congelada (ver congelar)
+        self.inferencia = False
+        # "tabela_partilhada": "<chave>" no JSON -> todos os agentes com a mesma chave usam a mesma Q-Table
+        self.tabela_partilhada = None
         
         # Carregar política usando o caminho limpo
         self.politica = self._criar_politica_do_ficheiro(self.ficheiro_config)
         
         # Tentar carregar memória existente
         if self.politica:
-            self.politica.carregar(self.ficheiro_memoria)
+            if self.tabela_partilhada:
+                self.politica.tabela, dono = TabelaPartilhada.partilhar(self.tabela_partilhada, self.politica.tabela)
+                self.dono_memoria = self.dono_memoria and dono
+            if self.dono_memoria:
+                # Em inferência a tabela fica só de leitura (mapeada sem cópias, se for .qtab); no treino é copiada
+                self.politica.carregar(self.ficheiro_memoria, modo="r" if self.inferencia else "c")
+            if self.dono_memoria and hasattr(self.politica, "instantaneo"):
+                # Métodos do agente e não da política: se a política for trocada depois (ex: treinar_farol.py),
+                # os checkpoints gravam a tabela da política atual
+                self.checkpoints = GestorCheckpoints.de_config(
+                    self.ficheiro_memoria, self._instantaneo, self._serializar, self._config_checkpoint)
+            if self.inferencia:
+                self.congelar()
     # --- MÉTODOS PRIVADOS ---
+    def _instantaneo(self):
+        return self.politica.instantaneo()
+
+    def _serializar(self, tabela) -> bytes:
+        return self.politica.serializar(tabela, caminho=self.ficheiro_memoria)
+
     def _criar_politica_do_ficheiro(self, caminho: str):
         try:
             caminho_limpo = caminho.lstrip('/') if caminho.startswith('/') else caminho
             with open(caminho_limpo, 'r') as f:
                 params = json.load(f)
             
+            self.inferencia = params.get("inferencia", False)
+            # Memória em formato binário (FicheiroQ): "memoria": "binaria" no JSON, ou se já existir um .qtab
+            ficheiro_binario = self.ficheiro_config.replace(".json", FicheiroQ.EXTENSAO)
+            if params.get("memoria") == "binaria" or os.path.exists(ficheiro_binario):
+                self.ficheiro_memoria = ficheiro_binario
+            self.tabela_partilhada = params.get("tabela_partilhada")
+            # ex: "checkpoint": {"passos": 100, "segundos": 30, "episodios": 10, "manter": 3}
+            self._config_checkpoint = params.get("checkpoint", {})
             accoes = params.get("accoes", ["norte", "sul", "este", "oeste", 
                                           "nordeste", "sudeste", "sudoeste", "noroeste"])
             
+            # "algoritmo": "qlearning" (por defeito), "q_lambda" ou "sarsa_lambda" (traços de elegibilidade),
+            # ou "dyna_q" (planeamento com um modelo aprendido). "replay" só se aplica a qlearning e dyna_q:
+            # os traços já propagam cada recompensa pelo caminho recente
+            algoritmo = params.get("algoritmo", "qlearning")
+            if algoritmo in ("q_lambda", "sarsa_lambda"):
+                if params.get("replay"):
+                    Registo.aviso(f"{self.ficheiro_config}: \"replay\" é ignorado com o algoritmo {algoritmo}")
+                classe = PoliticaQLambda if algoritmo == "q_lambda" else PoliticaSarsaLambda
+                return classe(
+                    accoes_possiveis=accoes,
+                    alpha=params.get("alpha", 0.1),
+                    gamma=params.get("gamma", 0.9),
+                    epsilon=params.get("epsilon", 0.1),
+                    lambda_=params.get("lambda", 0.8),
+                    tabela=params.get("tabela_q", "dicionario"),
+                    substituir_tracos=params.get("tracos", "substituicao") == "substituicao",
+                    limiar_traco=params.get("limiar_traco", 0.01),
+                    exploracao=params.get("exploracao")
+                )
+
+            if algoritmo == "dyna_q":
+                return PoliticaDynaQ(
+                    accoes_possiveis=accoes,
+                    alpha=params.get("alpha", 0.1),
+                    gamma=params.get("gamma", 0.9),
+                    epsilon=params.get("epsilon", 0.1),
+                    tabela=params.get("tabela_q", "dicionario"),
+                    planeamento=params.get("planeamento", 10),
+                    varrimento_prioritario=params.get("varrimento_prioritario", False),
+                    limiar_prioridade=params.get("limiar_prioridade", 0.01),
+                    replay=params.get("replay"),
+                    exploracao=params.get("exploracao")
+                )
+
             return PoliticaQLearning(
                 accoes_possiveis=accoes,
                 alpha=params.get("alpha", 0.1),
                 gamma=params.get("gamma", 0.9),
-                epsilon=params.get("epsilon", 0.1)
+                epsilon=params.get("epsilon", 0.1),
+                # "dicionario" (por defeito) ou "densa" (Q-Table num array NumPy)
+                tabela=params.get("tabela_q", "dicionario"),
+                # Experience replay opcional (Replay.BufferReplay), ex: {"capacidade": 10000, "lote": 32}
+                replay=params.get("replay"),
+                # Agenda do epsilon (Exploracao.py), ex: {"tipo": "exponencial", "inicial": 0.6, "fator": 0.996}
+                exploracao=params.get("exploracao")
             )
         except Exception as e:
-            print(f"ERRO: {e}")
+            Registo.erro(f"ERRO: {e}")
             return None 
 
     def _vetor_para_cardinal(self, dx, dy):
-        if dx == 0 and dy == 0: return "parado"
-        limiar = 0.3
-        v, h = "", ""
-        if dy < -limiar: v = "norte"
-        elif dy > limiar: v = "sul"
-        if dx > limiar: h = "este"
-        elif dx < -limiar: h = "oeste"
-        
-        mapa = {
-            ("norte", "este"): "nordeste", ("norte", "oeste"): "noroeste",
-            ("sul", "este"): "sudeste", ("sul", "oeste"): "sudoeste"
-        }
-        return mapa.get((v, h), v or h)
+        """Rótulo de direção em texto (para debug; o estado usa o id de Estado.id_direcao)."""
+        return rotulo_direcao(dx, dy)
+
+    def congelar(self, epsilon: float = 0.0):
+        """
+        Passa o agente a modo de inferência: a Q-Table é compilada numa tabela estado -> ação
+        (PoliticaCongelada), sem atualizações TD e sem gravações em disco. Só sorteia ações com epsilon > 0
+        ou em estados que não viu no treino.
+        """
+        if self.politica is not None and hasattr(self.politica, "compilar"):
+            self.politica = self.politica.compilar(epsilon=epsilon)
+
+    @property
+    def treinavel(self) -> bool:
+        return self.politica is not None and self.politica.treinavel
 
     # ==========================================================
     # IMPLEMENTAÇÃO OBRIGATÓRIA (NOMES CORRIGIDOS)
@@ -74,50 +160,57 @@ class AgenteRL(Agente):
     def avaliacao_estado_atual(self, recompensa: float):
         super().avaliacao_estado_atual(recompensa)
         
-        if self.politica:
+        if self.politica is not None and self.politica.treinavel:
             self.politica.atualizar(recompensa)
-            if self.passos % 100 == 0:
-                self.politica.salvar(self.ficheiro_memoria)
+            if self.checkpoints is not None:
+                self.checkpoints.passo() # Só tira o instantâneo; a escrita é feita noutra thread
+
+    def reiniciar(self):
+        super().reiniciar()
+        if self.politica:
+            # Descarta a transição pendente: não atravessa a fronteira entre episódios
+            self.politica.terminar_episodio(terminal=False)
+
+    def fim_episodio(self, sucesso: bool):
+        if self.politica:
+            self.politica.terminar_episodio(terminal=sucesso)
+            if self.checkpoints is not None and self.politica.treinavel:
+                self.checkpoints.episodio()
 
     # CORREÇÃO 2: Adicionado o método comunica que estava em falta
     def comunica(self, mensagem: str, de_agente):
         pass
 
-    def age(self) -> Accao:
-        # 1. Construir o Estado
-        direcao_farol = "desconhecida"
-        obstaculos_perto = tuple([0]*8)
-
-        # DEBUG: Verificar se tem sensores
-        if not self.sensores:
-            print(f"[ALERTA] {self.nome} NÃO TEM SENSORES INSTALADOS!")
+    def observacao_politica(self) -> ObservacaoEstado:
+        """
+        Observação que a política recebe: o estado codificado (Estado.codificar: id_direcao * 256 + mascara)
+        a partir do SensorDirecao e do SensorProximidade, e a posição atual (do SensorDirecao).
+        Usada pelo age() deste agente e do AgenteLabirinto, para os dois montarem o estado da mesma forma.
+        """
+        direcao_alvo = DESCONHECIDA # Id do rótulo de direção (Estado.ROTULOS_DIRECAO)
+        obstaculos_perto = 0 # Máscara de 8 bits (bit i = parede em VIZINHANCA[i])
+        posicao = self.posicao # self.posicao é só a de partida; a atual vem dos sensores
 
         for s in self.sensores:
             if isinstance(s, SensorDirecao):
-                obs = s.detetar(self.ambiente, self)
-                d = obs.dados.get("direcao", (0,0))
-                direcao_farol = self._vetor_para_cardinal(d[0], d[1])
+                obs = self.ler_sensor(s)
+                d = obs.get("direcao", (0,0))
+                direcao_alvo = id_direcao(d[0], d[1])
+                posicao = obs.get("posicao", posicao)
             elif isinstance(s, SensorProximidade):
-                obs = s.detetar(self.ambiente, self)
-                dados_prox = obs.dados.get("proximidade_obstaculos", {})
-                chaves_ordem = [
-                    (0, -1), (0, 1), (1, 0), (-1, 0), 
-                    (1, -1), (1, 1), (-1, 1), (-1, -1)
-                ]
-                obstaculos_perto = tuple(
-                    1 if dados_prox.get(f"obs_{x}_{y}") else 0 
-                    for x, y in chaves_ordem
-                )
+                obs = self.ler_sensor(s)
+                obstaculos_perto = obs.get("mascara_obstaculos", 0)
 
-        estado_rl = (direcao_farol, obstaculos_perto)
+        # DEBUG: O que é que ele está a ver? (Estado.descodificar(estado_rl) -> (rotulo, mascara))
+        # print(f"ESTADO: Dir={direcao_alvo} | Obs={obstaculos_perto}")
+        return ObservacaoEstado(direcao_alvo * N_MASCARAS + obstaculos_perto, posicao)
 
-        # DEBUG: O que é que ele está a ver?
-        # print(f"ESTADO: Dir={direcao_farol} | Obs={obstaculos_perto}")
+    def age(self) -> Accao:
+        # DEBUG: Verificar se tem sensores
+        if not self.sensores and Registo.AVISO_ATIVO:
+            Registo.aviso(f"[ALERTA] {self.nome} NÃO TEM SENSORES INSTALADOS!")
 
-        obs_para_politica = Observacao({
-            "estado_customizado": estado_rl,
-            "posicao": self.posicao 
-        })
+        obs_para_politica = self.observacao_politica()
 
         if self.politica:
             accao = self.politica.selecionar_accao(obs_para_politica)
@@ -128,5 +221,9 @@ class AgenteRL(Agente):
         return Accao("parar")
 
     def stop(self):
-        if self.politica:
+        if not self.treinavel or not self.dono_memoria:
+            return
+        if self.checkpoints is not None:
+            self.checkpoints.gravar(esperar=True) # Garante que o ficheiro em disco já tem a tabela atual
+        else:
             self.politica.salvar(self.ficheiro_memoria)
\ No newline at end of file
@@ -0,0 +1,68 @@
+from typing import Optional, Sequence
+import numpy as np
+
+# Geradores aleatórios explícitos das políticas (em vez do módulo global random).
+# Cada política tem o seu FluxoAleatorio, semeado a partir da semente do cenário ("semente" no JSON)
+# e do índice do agente: com threads ou processos, cada agente repete sempre a mesma sequência.
+
+BLOCO = 1024 # Uniformes sorteadas de uma vez pelo NumPy e consumidas uma a uma
+
+
+def semente_agente(semente_cenario: int, indice: int) -> int:
+    """Semente do agente 'indice' de um cenário: fluxos independentes (SeedSequence) e reprodutíveis."""
+    return int(np.random.SeedSequence([semente_cenario, indice]).generate_state(1)[0])
+
+
+class FluxoAleatorio:
+    """
+    Gerador de uma política: um np.random.Generator (para sorteios vetorizados, ex: BufferReplay)
+    e uma reserva de uniformes sorteadas em blocos, para as decisões passo a passo sem uma chamada ao NumPy por passo.
+    """
+    def __init__(self, semente: Optional[int] = None, bloco: int = BLOCO):
+        self.gerador = np.random.default_rng(semente)
+        self.bloco = bloco
+        self._reserva = []
+        self._tirar = self._reserva.pop # Uniforme seguinte (do fim da reserva), sem passar por atributos
+
+    def _recarregar(self) -> float:
+        self._reserva.extend(self.gerador.random(self.bloco).tolist())
+        return self._tirar()
+
+    def random(self) -> float:
+        """Uniforme em [0, 1)."""
+        try:
+            return self._tirar()
+        except IndexError:
+            return self._recarregar()
+
+    def choice(self, opcoes: Sequence):
+        try:
+            u = self._tirar()
+        except IndexError:
+            u = self._recarregar()
+        return opcoes[int(u * len(opcoes))]
+
+    def explorar(self, epsilon: float, opcoes: Sequence):
+        """
+        Decisão epsilon-greedy com uma só uniforme: devolve uma opção ao acaso com probabilidade epsilon,
+        ou None (a política escolhe a melhor ação). Abaixo de epsilon, u / epsilon volta a ser uniforme em [0, 1).
+        """
+        try:
+            u = self._tirar()
+        except IndexError:
+            u = self._recarregar()
+        if u < epsilon:
+            return opcoes[int(u / epsilon * len(opcoes))]
+        return None
+
+    def explorar_lote(self, epsilon, n: int, n_opcoes: int) -> np.ndarray:
+        """
+        As mesmas decisões para n passos ou agentes numa chamada vetorizada (epsilon escalar ou array de tamanho n):
+        índice da opção sorteada, ou -1 onde a decisão é gulosa.
+        """
+        epsilon = np.broadcast_to(np.asarray(epsilon, dtype=np.float64), (n,))
+        u = self.gerador.random(n)
+        explorar = u < epsilon
+        indices = np.full(n, -1, dtype=np.int64)
+        indices[explorar] = (u[explorar] / epsilon[explorar] * n_opcoes).astype(np.int64)
+        return indices
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 import threading
+import numpy as np
 from Modelos import Observacao, Accao
 # Forward reference for Agente to avoid circular import if possible, or just import if no cycle.
 # Since Agente imports Modelos, and Ambiente imports Modelos, that's fine.
@@ -7,11 +8,156 @@ from Modelos import Observacao, Accao
 # For now, let's use string forward references or TYPE_CHECKING, but simple import might work if Agente doesn't import Ambiente.
 # Agente.py does NOT import Ambiente.
 from Agente import Agente
+from Sensor import VIZINHANCA
+from Accoes import DELTAS
+
+MAX_REGISTO_MAPA = 1024 # Alterações de obstáculos guardadas para reparar rotas sem nova BFS
 
 class Ambiente(ABC):
     """Interface base para todos os ambientes de simulação."""
     def __init__(self):
         self.lock = threading.RLock()
+        # Contador de passos da simulação, avançado pelo Motor; invalida as leituras em cache dos agentes
+        self.tick = 0
+        # Versão do mapa de obstáculos: muda em cada alteração (ver definir_obstaculo e Planeador.rotas)
+        self.versao_mapa = 0
+        self._inicio_registo_mapa = 0
+        self._registo_mapa = [] # [(versão, x, y, ocupado)] das alterações desde _inicio_registo_mapa
+
+    def _compilar_obstaculos(self, obstaculos):
+        """
+        Compila os obstáculos numa grelha de ocupação densa (uint8, indexada [x, y]),
+        para que as colisões e os sensores sejam O(1) independentemente do número de paredes.
+        O conjunto self.obstaculos mantém-se para acesso legado (visualizador, display).
+        Requer self.largura e self.altura já definidos.
+        """
+        self.obstaculos = set(obstaculos) if obstaculos else set()
+        self.grelha_obstaculos = np.zeros((self.largura, self.altura), dtype=np.uint8)
+
+        if self.obstaculos:
+            coords = np.array(list(self.obstaculos), dtype=np.int64).reshape(-1, 2)
+            dentro = (coords[:, 0] >= 0) & (coords[:, 0] < self.largura) & \
+                     (coords[:, 1] >= 0) & (coords[:, 1] < self.altura)
+            self.grelha_obstaculos[coords[dentro, 0], coords[dentro, 1]] = 1
+
+        self._compilar_mascaras_vizinhanca()
+        # Mapa novo: as alterações anteriores deixam de servir para reparar rotas
+        self.versao_mapa += 1
+        self._inicio_registo_mapa = self.versao_mapa
+        self._registo_mapa = []
+
+    def definir_obstaculo(self, x: int, y: int, ocupado: bool = True):
+        """
+        Põe ou tira um obstáculo na célula (x, y) do mapa, para ambientes dinâmicos (ex: no atualizacao()).
+        Atualiza a grelha, o conjunto e as máscaras das 8 células vizinhas, e avança versao_mapa.
+        """
+        if not (0 <= x < self.largura and 0 <= y < self.altura):
+            raise ValueError(f"Célula fora do mapa: {(x, y)}")
+        with self.lock:
+            if bool(self.grelha_obstaculos[x, y]) == ocupado:
+                return
+            self.grelha_obstaculos[x, y] = 1 if ocupado else 0
+            if ocupado:
+                self.obstaculos.add((x, y))
+            else:
+                self.obstaculos.discard((x, y))
+
+            # O vizinho (x - dx, y - dy) vê esta célula na direção (dx, dy): só o bit dessa direção muda
+            for bit, (dx, dy) in enumerate(VIZINHANCA):
+                vx, vy = x - dx, y - dy
+                if 0 <= vx < self.largura and 0 <= vy < self.altura:
+                    if ocupado:
+                        self.mascaras_vizinhanca[vx, vy] |= 1 << bit
+                    else:
+                        self.mascaras_vizinhanca[vx, vy] &= ~(1 << bit) & 0xFF
+
+            self.versao_mapa += 1
+            self._registo_mapa.append((self.versao_mapa, x, y, ocupado))
+            if len(self._registo_mapa) > MAX_REGISTO_MAPA:
+                removida = self._registo_mapa.pop(0)
+                self._inicio_registo_mapa = removida[0]
+
+    def alteracoes_mapa(self, desde_versao: int):
+        """Alterações [(x, y, ocupado)] feitas depois de 'desde_versao', ou None se já não estiverem todas registadas."""
+        if desde_versao < self._inicio_registo_mapa:
+            return None
+        return [(x, y, ocupado) for versao, x, y, ocupado in self._registo_mapa if versao > desde_versao]
+
+    def _compilar_mascaras_vizinhanca(self):
+        """
+        Pré-calcula, uma vez por mapa, a máscara de 8 bits das paredes vizinhas de cada célula
+        (bit i = parede em VIZINHANCA[i]). Fica em self.mascaras_vizinhanca (uint8, [x, y]).
+        """
+        L, A = self.largura, self.altura
+
+        # Grelha com margem de 1 célula; a margem recebe os obstáculos declarados logo fora dos limites
+        ocupado = np.zeros((L + 2, A + 2), dtype=np.uint8)
+        ocupado[1:-1, 1:-1] = self.grelha_obstaculos
+        if self.obstaculos:
+            coords = np.array(list(self.obstaculos), dtype=np.int64).reshape(-1, 2)
+            na_margem = (coords[:, 0] >= -1) & (coords[:, 0] <= L) & \
+                        (coords[:, 1] >= -1) & (coords[:, 1] <= A)
+            coords = coords[na_margem] + 1
+            ocupado[coords[:, 0], coords[:, 1]] = 1
+
+        mascaras = np.zeros((L, A), dtype=np.uint8)
+        for bit, (dx, dy) in enumerate(VIZINHANCA):
+            mascaras |= (ocupado[1 + dx:1 + dx + L, 1 + dy:1 + dy + A] << bit).astype(np.uint8)
+        self.mascaras_vizinhanca = mascaras
+
+    def mascara_vizinhanca(self, x, y) -> int:
+        """Máscara de paredes vizinhas da célula (x, y): consulta O(1) à tabela pré-calculada."""
+        xi, yi = int(x), int(y)
+        if xi == x and yi == y and 0 <= xi < self.largura and 0 <= yi < self.altura:
+            return int(self.mascaras_vizinhanca[xi, yi])
+
+        # Posições fracionárias ou fora da grelha: cálculo direto vizinho a vizinho
+        mascara = 0
+        for bit, (dx, dy) in enumerate(VIZINHANCA):
+            if self.e_obstaculo(x + dx, y + dy):
+                mascara |= 1 << bit
+        return mascara
+
+    def mascaras_vizinhanca_lote(self, posicoes) -> np.ndarray:
+        """Máscaras de todas as posições de uma vez. posicoes: array (N, 2) de células dentro do mapa."""
+        posicoes = np.asarray(posicoes, dtype=np.int64)
+        return self.mascaras_vizinhanca[posicoes[:, 0], posicoes[:, 1]]
+
+    def e_obstaculo(self, x, y) -> bool:
+        """Indica se a célula (x, y) contém um obstáculo (consulta O(1) à grelha)."""
+        xi, yi = int(x), int(y)
+        # Posições fracionárias nunca coincidem com uma célula de obstáculo
+        if xi != x or yi != y:
+            return False
+        if 0 <= xi < self.largura and 0 <= yi < self.altura:
+            return self.grelha_obstaculos[xi, yi] != 0
+        # Fora da grelha: obstáculos declarados fora dos limites só existem no conjunto
+        return (xi, yi) in self.obstaculos
+
+    def _campo_distancias(self, alvo) -> np.ndarray:
+        """
+        Distância geodésica (número mínimo de passos, movimentos 8-conexos, sem atravessar paredes)
+        de cada célula até ao alvo, por BFS a partir do alvo. -1 = célula inalcançável ou parede.
+        A BFS avança por frentes inteiras com operações NumPy (uma iteração por nível de distância).
+        """
+        L, A = self.largura, self.altura
+        livre = self.grelha_obstaculos == 0
+        livre[alvo[0], alvo[1]] = True # O alvo é sempre alcançável, mesmo se marcado como obstáculo
+
+        distancias = np.full((L, A), -1, dtype=np.int32)
+        distancias[alvo[0], alvo[1]] = 0
+        fronteira = np.array([alvo], dtype=np.int64)
+        nivel = 0
+        while len(fronteira):
+            nivel += 1
+            vizinhos = (fronteira[:, None, :] + DELTAS[None, :, :]).reshape(-1, 2)
+            dentro = (vizinhos[:, 0] >= 0) & (vizinhos[:, 0] < L) & (vizinhos[:, 1] >= 0) & (vizinhos[:, 1] < A)
+            vizinhos = vizinhos[dentro]
+            novos = livre[vizinhos[:, 0], vizinhos[:, 1]] & (distancias[vizinhos[:, 0], vizinhos[:, 1]] < 0)
+            lineares = np.unique(vizinhos[novos, 0] * A + vizinhos[novos, 1])
+            fronteira = np.stack([lineares // A, lineares % A], axis=1)
+            distancias[fronteira[:, 0], fronteira[:, 1]] = nivel
+        return distancias
 
     @abstractmethod
     def observacaoPara(self, agente: Agente) -> Observacao:
@@ -34,6 +180,10 @@ class Ambiente(ABC):
         """Implementação da ação (chamada dentro do lock)."""
         pass
 
+    def reset(self):
+        """Repõe o ambiente no estado inicial de um episódio (posições iniciais, alvo por atingir)."""
+        pass
+
     @abstractmethod
     def simulacao_concluida(self) -> bool:
         """
@@ -3,7 +3,9 @@ import random
 import threading
 from typing import Tuple, List
 from Ambiente import Ambiente
-from Modelos import Observacao, Accao
+from Modelos import Observacao, ObservacaoDirecao, Accao
+from Accoes import VETORES, vetor_accao
+import Registo
 
 
 class AmbienteFarol(Ambiente):
@@ -13,21 +15,29 @@ class AmbienteFarol(Ambiente):
         self.farol_pos = farol_pos
         self.dimensoes = dimensoes
         self.largura, self.altura = dimensoes
-        self.obstaculos = obstaculos if obstaculos else []
+        self._compilar_obstaculos(obstaculos) # self.obstaculos (conjunto) + self.grelha_obstaculos
         self.agentes_posicoes = {} # Dicionário para guardar posições dos agentes {agente: (x, y)}
+        self.posicoes_iniciais = {} # Posições de partida, repostas em cada reset()
 
         self._alvo_atingido = False # Variável interna de controlo
 
     def adicionar_agente(self, agente, pos_inicial: Tuple[int, int]):
         self.agentes_posicoes[agente] = pos_inicial
+        self.posicoes_iniciais[agente] = pos_inicial
+
+    def reset(self):
+        """Volta a colocar os agentes nas posições iniciais para um novo episódio."""
+        with self.lock:
+            self.agentes_posicoes.update(self.posicoes_iniciais)
+            self._alvo_atingido = False
 
     def observacaoPara(self, agente) -> Observacao:
         """
         Calcula a direção (vetor unitário) para o farol.
         """
         if agente not in self.agentes_posicoes:
-            print("Agente não encontrado no ambiente para observação.")
-            return Observacao({})
+            Registo.aviso("Agente não encontrado no ambiente para observação.")
+            return Observacao()
         
         pos_agente = self.agentes_posicoes[agente]
         dx = self.farol_pos[0] - pos_agente[0]
@@ -40,7 +50,7 @@ class AmbienteFarol(Ambiente):
         else:
             direcao = (dx / dist, dy / dist) # Vetor normalizado
             
-        return Observacao({"direcao": direcao, "posicao": pos_agente, "distancia": dist})
+        return ObservacaoDirecao(direcao, dist, pos_agente)
 
     def atualizacao(self):
         """Pode ser usado para mover obstáculos ou alterar o ambiente."""
@@ -58,36 +68,16 @@ class AmbienteFarol(Ambiente):
             return 0.0
         
         # 1. Obter o valor que vem do agente
-        input_direcao = accao.parametros.get("direcao")
+        input_direcao = accao.direcao
         
-        if not input_direcao:
-            return 0.0
-            
-        # 2. TRADUÇÃO: Converter texto para vetor (dx, dy)
-        vetores_direcao = {
-            # Cardinais
-            "norte": (0, -1),
-            "sul":   (0, 1),
-            "este":  (1, 0),
-            "oeste": (-1, 0),
-            # Diagonais
-            "nordeste": (1, -1),
-            "sudeste":  (1, 1),
-            "sudoeste": (-1, 1),
-            "noroeste": (-1, -1)
-        }
-
-        direcao = (0, 0)
-
-        # Se for string (ex: "norte"), traduzimos
-        if isinstance(input_direcao, str):
-            direcao = vetores_direcao.get(input_direcao.lower(), (0,0))
-        
-        # Se já for uma tupla/lista (ex: (0, 1)), usamos direto
-        elif isinstance(input_direcao, (tuple, list)) and len(input_direcao) == 2:
-            direcao = input_direcao
+        # 2. TRADUÇÃO: id inteiro (caso normal) -> vetor (dx, dy) por tabela
+        if type(input_direcao) is int:
+            direcao = VETORES[input_direcao]
         else:
-            return 0.0
+            # Formatos de fronteira: texto (ex: "norte") ou tupla/lista (ex: (0, 1))
+            direcao = vetor_accao(input_direcao)
+            if direcao is None:
+                return 0.0
 
         pos_atual = self.agentes_posicoes[agente]
 
@@ -102,7 +92,7 @@ class AmbienteFarol(Ambiente):
         if not (0 <= x_int < self.largura and 0 <= y_int < self.altura):
             return -100.0 # Bateu na parede do mundo
             
-        if (x_int, y_int) in self.obstaculos:
+        if self.grelha_obstaculos[x_int, y_int]:
             return -50.0 # Bateu num obstáculo
 
         # Atualizar posição
@@ -117,7 +107,8 @@ class AmbienteFarol(Ambiente):
         # --- VERIFICAÇÃO DE VITÓRIA ---
         if dist_nova < 1.0:
             recompensa += 100 
-            print(f"!!! Agente {agente.nome} chegou ao Farol !!!")
+            if Registo.INFO_ATIVA:
+                Registo.info(f"!!! Agente {agente.nome} chegou ao Farol !!!", agente=agente.nome)
             
             # ATUALIZAÇÃO IMPORTANTE: Avisar o ambiente que acabou
             # (Certifica-te que definiste self._alvo_atingido = False no __init__)
@@ -1,32 +1,55 @@
 import math
-from typing import Tuple, List
+from typing import Tuple, List, Optional
+import numpy as np
 from Ambiente import Ambiente
-from Modelos import Observacao, Accao
+from Modelos import Observacao, ObservacaoDirecao, Accao
+from Accoes import VETORES, vetor_accao
+import Planeador
+import Registo
 
 class AmbienteLabirinto(Ambiente):
     """Ambiente de Labirinto onde o objetivo é chegar à Saída."""
     
-    def __init__(self, pos_saida: Tuple[int, int], dimensoes: Tuple[int, int], obstaculos: List[Tuple[int, int]] = None):
+    def __init__(self, pos_saida: Tuple[int, int], dimensoes: Tuple[int, int], obstaculos: List[Tuple[int, int]] = None,
+                 modo_recompensa: str = "euclidiana"):
         super().__init__()
         # Mapeamos a saída para 'farol_pos' para que os sensores existentes funcionem sem alterações
         self.farol_pos = pos_saida 
         self.pos_saida = pos_saida
         self.dimensoes = dimensoes
         self.largura, self.altura = dimensoes
-        self.obstaculos = obstaculos if obstaculos else []
+        self._compilar_obstaculos(obstaculos) # self.obstaculos (conjunto) + self.grelha_obstaculos
         self.agentes_posicoes = {}
+        self.posicoes_iniciais = {}
         self._alvo_atingido = False
 
+        # Campos de distância à saída, calculados uma vez por mapa:
+        # - euclidiana: substitui as raízes quadradas por passo;
+        # - geodésica (BFS, 8-conexa, contorna paredes): shaping opcional e métrica de passos ótimos.
+        #   É a árvore de rotas da saída do Planeador, partilhada com os agentes em modo "planeador".
+        xs, ys = np.meshgrid(np.arange(self.largura), np.arange(self.altura), indexing="ij")
+        self.distancia_euclidiana = np.hypot(pos_saida[0] - xs, pos_saida[1] - ys)
+        Planeador.rotas(self, pos_saida)
+        # "euclidiana" (por defeito): shaping em linha reta; "geodesica": shaping pelo caminho real
+        self.modo_recompensa = modo_recompensa
+
     def simulacao_concluida(self) -> bool:
         return self._alvo_atingido
 
     def adicionar_agente(self, agente, pos_inicial: Tuple[int, int]):
         self.agentes_posicoes[agente] = pos_inicial
+        self.posicoes_iniciais[agente] = pos_inicial
+
+    def reset(self):
+        """Volta a colocar os agentes nas posições iniciais para um novo episódio."""
+        with self.lock:
+            self.agentes_posicoes.update(self.posicoes_iniciais)
+            self._alvo_atingido = False
 
     def observacaoPara(self, agente) -> Observacao:
         # Lógica idêntica ao Farol: vetor para o objetivo
         if agente not in self.agentes_posicoes:
-            return Observacao({})
+            return Observacao()
         
         pos_agente = self.agentes_posicoes[agente]
         dx = self.pos_saida[0] - pos_agente[0]
@@ -34,28 +57,44 @@ class AmbienteLabirinto(Ambiente):
         dist = math.sqrt(dx**2 + dy**2)
         
         direcao = (dx/dist, dy/dist) if dist > 0 else (0,0)
-        return Observacao({"direcao": direcao, "posicao": pos_agente, "distancia": dist})
+        return ObservacaoDirecao(direcao, dist, pos_agente)
 
     def atualizacao(self):
         pass
 
+    @property
+    def distancia_geodesica(self) -> np.ndarray:
+        # Depois de alterações ao mapa (definir_obstaculo) a árvore é reparada no primeiro acesso,
+        # uma vez por lote de alterações e não por célula alterada
+        return Planeador.rotas(self, self.pos_saida).distancias
+
+    def _dentro(self, xi: int, yi: int) -> bool:
+        return 0 <= xi < self.largura and 0 <= yi < self.altura
+
+    def _distancia_euclidiana(self, x, y) -> float:
+        xi, yi = int(x), int(y)
+        if xi == x and yi == y and self._dentro(xi, yi):
+            return self.distancia_euclidiana.item(xi, yi)
+        return math.sqrt((self.pos_saida[0] - x)**2 + (self.pos_saida[1] - y)**2)
+
+    def passos_otimos(self, pos) -> Optional[int]:
+        """Número mínimo de passos de 'pos' até à saída (None se for inalcançável)."""
+        xi, yi = int(round(pos[0])), int(round(pos[1]))
+        if not self._dentro(xi, yi):
+            return None
+        d = self.distancia_geodesica.item(xi, yi)
+        return d if d >= 0 else None
+
     def _agir_safe(self, accao: Accao, agente) -> float:
         if accao.tipo != "mover": return 0.0
         
-        # 1. Traduzir Direção
-        input_direcao = accao.parametros.get("direcao")
-        if not input_direcao: return 0.0
-        
-        vetores = {
-            "norte": (0, -1), "sul": (0, 1), "este": (1, 0), "oeste": (-1, 0),
-            "nordeste": (1, -1), "sudeste": (1, 1), "sudoeste": (-1, 1), "noroeste": (-1, -1)
-        }
-        
-        direcao = (0,0)
-        if isinstance(input_direcao, str):
-            direcao = vetores.get(input_direcao.lower(), (0,0))
-        elif isinstance(input_direcao, (tuple, list)):
-            direcao = input_direcao
+        # 1. Traduzir Direção (id inteiro -> vetor por tabela; texto/tuplas como formato de fronteira)
+        input_direcao = accao.direcao
+        if type(input_direcao) is int:
+            direcao = VETORES[input_direcao]
+        else:
+            direcao = vetor_accao(input_direcao)
+            if direcao is None: return 0.0
 
         pos_atual = self.agentes_posicoes[agente]
         
@@ -72,22 +111,29 @@ class AmbienteLabirinto(Ambiente):
             return -100.0
             
         # Bateu num obstáculo? (A saída nunca é obstáculo)
-        if pos_futura in self.obstaculos and pos_futura != self.pos_saida:
+        if self.grelha_obstaculos[xi, yi] and pos_futura != self.pos_saida:
             return -50.0
 
         # Atualizar
         self.agentes_posicoes[agente] = (nx, ny)
         
-        # 4. Recompensas
-        dist_antiga = math.sqrt((self.pos_saida[0]-pos_atual[0])**2 + (self.pos_saida[1]-pos_atual[1])**2)
-        dist_nova = math.sqrt((self.pos_saida[0]-nx)**2 + (self.pos_saida[1]-ny)**2)
+        # 4. Recompensas (consultas às tabelas de distância em vez de raízes quadradas)
+        dist_antiga = self._distancia_euclidiana(pos_atual[0], pos_atual[1])
+        dist_nova = self._distancia_euclidiana(nx, ny)
         
-        recompensa = (dist_antiga - dist_nova) * 10
+        if self.modo_recompensa == "geodesica":
+            # Aproximar-se pelo caminho real (e não em linha reta contra a parede)
+            geo_antiga = self.passos_otimos(pos_atual)
+            geo_nova = self.passos_otimos((xi, yi))
+            recompensa = (geo_antiga - geo_nova) * 10 if geo_antiga is not None and geo_nova is not None else 0.0
+        else:
+            recompensa = (dist_antiga - dist_nova) * 10
         
         # Chegou à saída
         if dist_nova < 1.0:
             recompensa += 500 
-            print(f"!!! {agente.nome} ESCAPOU DO LABIRINTO !!!")
+            if Registo.INFO_ATIVA:
+                Registo.info(f"!!! {agente.nome} ESCAPOU DO LABIRINTO !!!", agente=agente.nome)
             self._alvo_atingido = True
             
         agente.avaliacao_estado_atual(recompensa)
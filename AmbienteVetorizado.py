@@ -0,0 +1,170 @@
+from typing import List, Tuple
+import numpy as np
+from AmbienteFarol import AmbienteFarol
+from AmbienteLabirinto import AmbienteLabirinto
+from Accoes import DELTAS
+from Estado import ROTULOS_DIRECAO, N_MASCARAS
+
+_ID_ROTULO = {rotulo: i for i, rotulo in enumerate(ROTULOS_DIRECAO)}
+
+
+def _rotulos_direcao_lote(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """Versão vetorizada de Estado.id_direcao: devolve ids de ROTULOS_DIRECAO."""
+    dist = np.hypot(dx, dy)
+    com_dist = dist > 0
+    ux = np.divide(dx, dist, out=np.zeros_like(dist), where=com_dist)
+    uy = np.divide(dy, dist, out=np.zeros_like(dist), where=com_dist)
+
+    limiar = 0.3
+    norte, sul = uy < -limiar, uy > limiar
+    este, oeste = ux > limiar, ux < -limiar
+
+    ids = np.select(
+        [~com_dist,
+         norte & este, norte & oeste, sul & este, sul & oeste,
+         norte, sul, este, oeste],
+        [_ID_ROTULO["parado"],
+         _ID_ROTULO["nordeste"], _ID_ROTULO["noroeste"], _ID_ROTULO["sudeste"], _ID_ROTULO["sudoeste"],
+         _ID_ROTULO["norte"], _ID_ROTULO["sul"], _ID_ROTULO["este"], _ID_ROTULO["oeste"]],
+        default=_ID_ROTULO["desconhecida"])
+    return ids.astype(np.int64)
+
+
+class _AmbienteVetorizado:
+    """
+    K réplicas independentes do mesmo mapa, avançadas em lote com arrays NumPy.
+    Partilham a grelha de ocupação e as tabelas pré-calculadas do ambiente escalar
+    e aplicam as mesmas regras de _agir_safe (limites, paredes, shaping, objetivo).
+    Cada réplica que atinge o objetivo (ou max_passos) volta sozinha à posição inicial.
+    """
+    RECOMPENSA_OBJETIVO = 0.0
+
+    def __init__(self, ambiente, posicoes_iniciais, n_replicas: int, max_passos: int = None):
+        self.ambiente = ambiente
+        self.n_replicas = n_replicas
+        self.max_passos = max_passos
+        self.largura, self.altura = ambiente.largura, ambiente.altura
+        self.alvo = np.array(ambiente.farol_pos, dtype=np.int64)
+
+        self.posicoes_iniciais = np.broadcast_to(
+            np.asarray(posicoes_iniciais, dtype=np.int64), (n_replicas, 2)).copy()
+        self.posicoes = self.posicoes_iniciais.copy()
+        self.passos = np.zeros(n_replicas, dtype=np.int64)
+        self.recompensa_total = np.zeros(n_replicas, dtype=np.float64)
+        self._k = np.arange(n_replicas)
+
+        # Células onde se pode bater: obstáculos (a exceção do alvo fica a cargo das subclasses)
+        self.bloqueado = ambiente.grelha_obstaculos.astype(bool)
+
+        # Tabelas por célula: distância ao alvo e estado RL (id_direcao * 256 + mascara)
+        xs, ys = np.meshgrid(np.arange(self.largura), np.arange(self.altura), indexing="ij")
+        dx = (self.alvo[0] - xs).astype(np.float64)
+        dy = (self.alvo[1] - ys).astype(np.float64)
+        self.distancias = np.hypot(dx, dy)
+        # Distâncias usadas no shaping (as subclasses podem trocar pela geodésica; -1 = inalcançável)
+        self.distancias_shaping = self.distancias
+        self.estado_por_celula = _rotulos_direcao_lote(dx, dy) * N_MASCARAS + ambiente.mascaras_vizinhanca
+
+        self.estados_atuais = self.estados()
+
+    def estados(self) -> np.ndarray:
+        """Estado RL de cada réplica (inteiros de Estado.codificar, como nos agentes escalares)."""
+        return self.estado_por_celula[self.posicoes[:, 0], self.posicoes[:, 1]]
+
+    def reiniciar(self) -> np.ndarray:
+        self.posicoes[:] = self.posicoes_iniciais
+        self.passos[:] = 0
+        self.recompensa_total[:] = 0.0
+        self.estados_atuais = self.estados()
+        return self.estados_atuais
+
+    def step(self, accoes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Aplica uma ação (id inteiro) a cada réplica.
+        Devolve (estados_seguintes, recompensas, terminais, truncados); os estados seguintes
+        são anteriores ao reinício automático. O estado para a próxima decisão fica em
+        self.estados_atuais.
+        """
+        novas = self.posicoes + DELTAS[accoes]
+        nx, ny = novas[:, 0], novas[:, 1]
+
+        fora = (nx < 0) | (nx >= self.largura) | (ny < 0) | (ny >= self.altura)
+        cx = np.clip(nx, 0, self.largura - 1)
+        cy = np.clip(ny, 0, self.altura - 1)
+        parede = ~fora & self.bloqueado[cx, cy]
+        move = ~(fora | parede)
+
+        # Shaping: (distancia_antiga - distancia_nova) * 10, como no ambiente escalar
+        shaping_antiga = self.distancias_shaping[self.posicoes[:, 0], self.posicoes[:, 1]]
+        shaping_nova = self.distancias_shaping[cx, cy]
+        shaping = np.where((shaping_antiga >= 0) & (shaping_nova >= 0), (shaping_antiga - shaping_nova) * 10, 0.0)
+        recompensas = np.where(fora, -100.0, np.where(parede, -50.0, shaping))
+
+        dist_nova = self.distancias[cx, cy]
+
+        terminais = move & (dist_nova < 1.0)
+        recompensas[terminais] += self.RECOMPENSA_OBJETIVO
+
+        self.posicoes[move] = novas[move]
+        self.passos += 1
+        self.recompensa_total += recompensas
+        estados_seguintes = self.estados()
+
+        if self.max_passos is not None:
+            truncados = ~terminais & (self.passos >= self.max_passos)
+        else:
+            truncados = np.zeros(self.n_replicas, dtype=bool)
+
+        # Reinício automático das réplicas que terminaram
+        acabou = terminais | truncados
+        if acabou.any():
+            self.posicoes[acabou] = self.posicoes_iniciais[acabou]
+            self.passos[acabou] = 0
+            self.recompensa_total[acabou] = 0.0
+            self.estados_atuais = self.estados()
+        else:
+            self.estados_atuais = estados_seguintes
+
+        return estados_seguintes, recompensas, terminais, truncados
+
+
+class AmbienteLabirintoVetorizado(_AmbienteVetorizado):
+    """K labirintos iguais avançados em lote (ver AmbienteLabirinto)."""
+    RECOMPENSA_OBJETIVO = 500.0
+
+    def __init__(self, pos_saida: Tuple[int, int], dimensoes: Tuple[int, int], obstaculos: List[Tuple[int, int]],
+                 pos_inicial, n_replicas: int, max_passos: int = None, modo_recompensa: str = "euclidiana"):
+        ambiente = AmbienteLabirinto(pos_saida, dimensoes, obstaculos, modo_recompensa)
+        super().__init__(ambiente, pos_inicial, n_replicas, max_passos)
+        # A saída nunca é obstáculo
+        self.bloqueado[tuple(self.alvo)] = False
+        if modo_recompensa == "geodesica":
+            self.distancias_shaping = ambiente.distancia_geodesica.astype(np.float64)
+
+
+class AmbienteFarolVetorizado(_AmbienteVetorizado):
+    """K mundos do farol avançados em lote (ver AmbienteFarol)."""
+    RECOMPENSA_OBJETIVO = 100.0
+
+    def __init__(self, farol_pos: Tuple[int, int], dimensoes: Tuple[int, int], obstaculos: List[Tuple[int, int]],
+                 pos_inicial, n_replicas: int, max_passos: int = None):
+        ambiente = AmbienteFarol(farol_pos, dimensoes, obstaculos)
+        super().__init__(ambiente, pos_inicial, n_replicas, max_passos)
+
+
+def treinar_em_lote(ambiente: _AmbienteVetorizado, politica, n_passos: int) -> List[List[int]]:
+    """
+    Corre n_passos de Q-Learning em todas as réplicas ao mesmo tempo.
+    Devolve, por réplica, a lista de passos de cada episódio concluído no objetivo.
+    """
+    episodios = [[] for _ in range(ambiente.n_replicas)]
+    estados = ambiente.estados_atuais
+    for _ in range(n_passos):
+        accoes = politica.selecionar_accoes(estados)
+        passos = ambiente.passos + 1
+        seguintes, recompensas, terminais, truncados = ambiente.step(accoes)
+        politica.atualizar(estados, accoes, recompensas, seguintes, terminais)
+        for k in np.flatnonzero(terminais):
+            episodios[k].append(int(passos[k]))
+        estados = ambiente.estados_atuais
+    return episodios
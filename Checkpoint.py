@@ -0,0 +1,192 @@
+import atexit
+import glob
+import os
+import tempfile
+import threading
+import time
+import weakref
+from typing import Any, Callable, Optional
+import Registo
+
+_NADA = object() # Nenhum instantâneo pendente (None pode ser um instantâneo válido)
+
+# Gravação da memória dos agentes (Q-Table) fora da thread da simulação.
+# A thread da simulação só tira um instantâneo (cópia barata da tabela); a serialização e a escrita
+# em disco acontecem numa thread de fundo. Cada escrita vai para um ficheiro temporário na mesma pasta
+# e só depois substitui o original com os.replace (atómico): o .pkl em disco está sempre completo.
+
+
+def escrever_atomico(caminho: str, conteudo: bytes):
+    """Escreve 'conteudo' em 'caminho' sem nunca deixar um ficheiro a meio (temporário + os.replace)."""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    fd, temporario = tempfile.mkstemp(dir=pasta, prefix=os.path.basename(caminho) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        raise
+
+
+class GestorCheckpoints:
+    """
+    Decide quando gravar (a cada N passos, N segundos e/ou N episódios) e grava numa thread de fundo.
+    - obter_instantaneo: chamado na thread da simulação; deve devolver uma cópia independente do estado;
+    - serializar: chamado na thread de fundo; converte o instantâneo em bytes.
+    Se chegar um pedido novo antes de o anterior ser escrito, só o mais recente é gravado.
+    Com manter > 0 guarda também as últimas 'manter' cópias numeradas (ex: agente.000012.pkl).
+    """
+    def __init__(self, caminho: str, obter_instantaneo: Callable[[], Any], serializar: Callable[[Any], bytes],
+                 passos: Optional[int] = 100, segundos: Optional[float] = None, episodios: Optional[int] = None,
+                 manter: int = 0, assincrono: bool = True):
+        self.caminho = caminho
+        self.obter_instantaneo = obter_instantaneo
+        self.serializar = serializar
+        self.passos = passos
+        self.segundos = segundos
+        self.episodios = episodios
+        self.manter = manter
+        self.assincrono = assincrono
+
+        self._contador_passos = 0
+        self._contador_episodios = 0
+        self._ultima_gravacao = time.monotonic()
+
+        raiz, extensao = os.path.splitext(caminho)
+        self._padrao_historico = raiz + ".{:06d}" + extensao
+        self._numero = self._ultimo_numero(raiz, extensao)
+
+        # Estatísticas (para testes e diagnóstico)
+        self.gravacoes = 0
+        self.substituidos = 0 # Pedidos ultrapassados por um mais recente antes de chegarem ao disco
+
+        self._condicao = threading.Condition()
+        self._pendente = _NADA
+        self._a_escrever = False
+        self._thread = None
+        self._fechado = False
+        _gestores.add(self)
+
+    @classmethod
+    def de_config(cls, caminho: str, obter_instantaneo, serializar, config: dict) -> 'GestorCheckpoints':
+        """
+        Cria o gestor a partir do bloco "checkpoint" do JSON do agente, ex:
+        {"passos": 100, "segundos": 30, "episodios": null, "manter": 3, "assincrono": true}
+        """
+        config = config or {}
+        return cls(caminho, obter_instantaneo, serializar,
+                   passos=config.get("passos", 100),
+                   segundos=config.get("segundos"),
+                   episodios=config.get("episodios"),
+                   manter=config.get("manter", 0),
+                   assincrono=config.get("assincrono", True))
+
+    # --- Gatilhos (chamados pela thread da simulação) ---
+    def passo(self):
+        self._contador_passos += 1
+        if self.passos and self._contador_passos % self.passos == 0:
+            self.gravar()
+        elif self.segundos and time.monotonic() - self._ultima_gravacao >= self.segundos:
+            self.gravar()
+
+    def episodio(self):
+        self._contador_episodios += 1
+        if self.episodios and self._contador_episodios % self.episodios == 0:
+            self.gravar()
+
+    def gravar(self, esperar: bool = False):
+        """Tira o instantâneo agora e entrega-o à thread de fundo (ou grava já, se não for assíncrono)."""
+        instantaneo = self.obter_instantaneo()
+        self._ultima_gravacao = time.monotonic()
+        if not self.assincrono:
+            self._escrever(instantaneo)
+            return
+        with self._condicao:
+            if self._fechado:
+                return
+            if self._pendente is not _NADA:
+                self.substituidos += 1
+            self._pendente = instantaneo
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._ciclo, name=f"checkpoint:{self.caminho}", daemon=True)
+                self._thread.start()
+            self._condicao.notify_all()
+        if esperar:
+            self.esperar()
+
+    def esperar(self):
+        """Bloqueia até não haver nada pendente nem a ser escrito."""
+        with self._condicao:
+            while self._pendente is not _NADA or self._a_escrever:
+                self._condicao.wait()
+
+    def fechar(self):
+        """Escreve o que estiver pendente e termina a thread de fundo."""
+        with self._condicao:
+            self._fechado = True
+            self._condicao.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # --- Thread de fundo ---
+    def _ciclo(self):
+        while True:
+            with self._condicao:
+                while self._pendente is _NADA and not self._fechado:
+                    self._condicao.wait()
+                if self._pendente is _NADA:
+                    return # Fechado e sem nada pendente
+                instantaneo, self._pendente = self._pendente, _NADA
+                self._a_escrever = True
+            try:
+                self._escrever(instantaneo)
+            except Exception as e:
+                # Uma falha de escrita não pode parar a simulação; o ficheiro anterior continua intacto
+                Registo.erro(f"[Checkpoint] Falha ao gravar {self.caminho}: {e}")
+            finally:
+                with self._condicao:
+                    self._a_escrever = False
+                    self._condicao.notify_all()
+
+    def _escrever(self, instantaneo):
+        conteudo = self.serializar(instantaneo)
+        escrever_atomico(self.caminho, conteudo)
+        if self.manter > 0:
+            self._numero += 1
+            escrever_atomico(self._padrao_historico.format(self._numero), conteudo)
+            antigo = self._numero - self.manter
+            if antigo > 0:
+                # Apaga todas as cópias mais antigas do que as 'manter' últimas (incluindo restos de execuções anteriores)
+                for n in range(antigo, 0, -1):
+                    ficheiro = self._padrao_historico.format(n)
+                    if not os.path.exists(ficheiro):
+                        break
+                    os.remove(ficheiro)
+        self.gravacoes += 1
+        Registo.depuracao(f"[Checkpoint] {self.caminho} gravado ({len(conteudo)} bytes)")
+
+    @staticmethod
+    def _ultimo_numero(raiz: str, extensao: str) -> int:
+        """Continua a numeração das cópias de execuções anteriores."""
+        numeros = []
+        for ficheiro in glob.glob(glob.escape(raiz) + ".*" + extensao):
+            meio = ficheiro[len(raiz) + 1:len(ficheiro) - len(extensao)]
+            if meio.isdigit():
+                numeros.append(int(meio))
+        return max(numeros, default=0)
+
+
+# Ao sair do programa, as gravações pendentes terminam antes de o interpretador matar as threads daemon
+_gestores = weakref.WeakSet()
+
+@atexit.register
+def _fechar_todos():
+    for gestor in list(_gestores):
+        gestor.fechar()
@@ -0,0 +1,67 @@
+from typing import Any, Tuple
+from Sensor import tuplo_para_mascara
+
+# Codificação do estado RL (direção do alvo + paredes vizinhas) num único inteiro pequeno:
+#     estado = id_direcao * 256 + mascara
+# Os ids das 8 direções coincidem com os ids das ações (Accoes.py); depois vêm "parado" e "desconhecida".
+# O mesmo inteiro serve de chave no dicionário da Q-Table e de linha na tabela densa.
+
+ROTULOS_DIRECAO = ("norte", "sul", "este", "oeste",
+                   "nordeste", "sudeste", "sudoeste", "noroeste",
+                   "parado", "desconhecida")
+N_MASCARAS = 256 # Máscaras de 8 bits das paredes vizinhas
+N_ESTADOS = len(ROTULOS_DIRECAO) * N_MASCARAS
+
+NORTE, SUL, ESTE, OESTE, NORDESTE, SUDESTE, SUDOESTE, NOROESTE, PARADO, DESCONHECIDA = range(len(ROTULOS_DIRECAO))
+_ID_ROTULO = {rotulo: i for i, rotulo in enumerate(ROTULOS_DIRECAO)}
+_DIAGONAIS = {(NORTE, ESTE): NORDESTE, (NORTE, OESTE): NOROESTE,
+              (SUL, ESTE): SUDESTE, (SUL, OESTE): SUDOESTE}
+LIMIAR_DIRECAO = 0.3
+
+
+def id_direcao(dx: float, dy: float) -> int:
+    """Id do rótulo de direção de um vetor (dx, dy) (8 direções, parado ou desconhecida)."""
+    if dx == 0 and dy == 0:
+        return PARADO
+    v = NORTE if dy < -LIMIAR_DIRECAO else SUL if dy > LIMIAR_DIRECAO else None
+    h = ESTE if dx > LIMIAR_DIRECAO else OESTE if dx < -LIMIAR_DIRECAO else None
+    if v is not None and h is not None:
+        return _DIAGONAIS[(v, h)]
+    if v is not None:
+        return v
+    if h is not None:
+        return h
+    return DESCONHECIDA
+
+def rotulo_direcao(dx: float, dy: float) -> str:
+    return ROTULOS_DIRECAO[id_direcao(dx, dy)]
+
+def codificar(direcao: Any, mascara: int) -> int:
+    """Estado inteiro a partir do rótulo (ou id) de direção e da máscara de paredes."""
+    id_dir = direcao if type(direcao) is int else _ID_ROTULO.get(direcao, DESCONHECIDA)
+    return id_dir * N_MASCARAS + mascara
+
+def codificar_vetor(dx: float, dy: float, mascara: int) -> int:
+    """Atalho usado pelos agentes: vetor de direção do sensor + máscara -> estado inteiro."""
+    return id_direcao(dx, dy) * N_MASCARAS + mascara
+
+def descodificar(estado: int) -> Tuple[str, int]:
+    """Inverso de codificar: (rótulo de direção, máscara). Útil para debug."""
+    return ROTULOS_DIRECAO[estado // N_MASCARAS], estado % N_MASCARAS
+
+def e_codificado(estado: Any) -> bool:
+    return type(estado) is int and 0 <= estado < N_ESTADOS
+
+def migrar_estado(estado: Any) -> Any:
+    """
+    Converte estados de Q-Tables antigas para inteiros:
+    (direcao, tuplo de 8 zeros/uns) ou (direcao, mascara) -> codificar(direcao, mascara).
+    Outros estados (ex: posições (x, y)) ficam como estão.
+    """
+    if type(estado) is tuple and len(estado) == 2 and isinstance(estado[0], str):
+        mascara = estado[1]
+        if isinstance(mascara, tuple) and len(mascara) == 8:
+            mascara = tuplo_para_mascara(mascara)
+        if type(mascara) is int and 0 <= mascara < N_MASCARAS:
+            return codificar(estado[0], mascara)
+    return estado
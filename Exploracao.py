@@ -0,0 +1,134 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Dict, Optional
+
+# Agendas de exploração (epsilon) para o PoliticaQLearning, declaradas no JSON do agente, ex:
+#   "exploracao": {"tipo": "exponencial", "inicial": 0.6, "fator": 0.996, "minimo": 0.01}
+# O Motor avança-as no fim de cada episódio (ou a cada passo, com "unidade": "passo") e a política
+# passa a usar o epsilon devolvido. Assim os scripts de treino e os estudos deixam de mudar o epsilon à mão.
+
+EPISODIO = "episodio"
+PASSO = "passo"
+
+
+class Exploracao(ABC):
+    """Base: epsilon em função do número t de unidades (episódios ou passos) já concluídas."""
+    def __init__(self, inicial: float, minimo: float = 0.0, unidade: str = EPISODIO):
+        if unidade not in (EPISODIO, PASSO):
+            raise ValueError(f"Unidade de exploração desconhecida: {unidade!r}")
+        self.inicial = inicial
+        self.minimo = minimo
+        self.unidade = unidade
+        self.t = 0
+        self.epsilon = self.valor(0)
+
+    @abstractmethod
+    def valor(self, t: int) -> float:
+        pass
+
+    def avancar(self, sucesso: Optional[bool] = None) -> float:
+        """Conclui mais uma unidade (sucesso: resultado do episódio, se houver) e devolve o novo epsilon."""
+        self.t += 1
+        self.epsilon = self.valor(self.t)
+        return self.epsilon
+
+    def reiniciar(self):
+        self.t = 0
+        self.epsilon = self.valor(0)
+
+
+class ExploracaoConstante(Exploracao):
+    def valor(self, t: int) -> float:
+        return self.inicial
+
+class ExploracaoExponencial(Exploracao):
+    """epsilon = max(minimo, inicial * fator ** t)"""
+    def __init__(self, inicial: float, fator: float = 0.995, minimo: float = 0.0, unidade: str = EPISODIO):
+        self.fator = fator
+        super().__init__(inicial, minimo, unidade)
+
+    def valor(self, t: int) -> float:
+        return max(self.minimo, self.inicial * self.fator ** t)
+
+class ExploracaoLinear(Exploracao):
+    """Desce em linha reta de 'inicial' até 'minimo' em 'duracao' unidades e fica no mínimo."""
+    def __init__(self, inicial: float, minimo: float = 0.0, duracao: int = 1000, unidade: str = EPISODIO):
+        self.duracao = duracao
+        super().__init__(inicial, minimo, unidade)
+
+    def valor(self, t: int) -> float:
+        if t >= self.duracao:
+            return self.minimo
+        return self.inicial + (self.minimo - self.inicial) * t / self.duracao
+
+class ExploracaoDegraus(Exploracao):
+    """Multiplica por 'fator' a cada 'intervalo' unidades: epsilon = max(minimo, inicial * fator ** (t // intervalo))."""
+    def __init__(self, inicial: float, fator: float = 0.5, intervalo: int = 100, minimo: float = 0.0,
+                 unidade: str = EPISODIO):
+        self.fator = fator
+        self.intervalo = intervalo
+        super().__init__(inicial, minimo, unidade)
+
+    def valor(self, t: int) -> float:
+        return max(self.minimo, self.inicial * self.fator ** (t // self.intervalo))
+
+class ExploracaoTempoInverso(Exploracao):
+    """epsilon = max(minimo, inicial / (1 + k * t)): desce depressa no início e devagar depois."""
+    def __init__(self, inicial: float, k: float = 0.01, minimo: float = 0.0, unidade: str = EPISODIO):
+        self.k = k
+        super().__init__(inicial, minimo, unidade)
+
+    def valor(self, t: int) -> float:
+        return max(self.minimo, self.inicial / (1.0 + self.k * t))
+
+class ExploracaoAdaptativa(Exploracao):
+    """
+    Segue o desempenho: com a taxa de sucesso dos últimos 'janela' episódios acima de 'alvo', o epsilon
+    é multiplicado por 'fator' (explora menos); abaixo, é dividido por 'fator' até 'maximo' (volta a explorar).
+    Só faz sentido por episódio: precisa do resultado de cada um.
+    """
+    def __init__(self, inicial: float, minimo: float = 0.0, maximo: float = None, alvo: float = 0.8,
+                 janela: int = 20, fator: float = 0.9, unidade: str = EPISODIO):
+        if unidade != EPISODIO:
+            raise ValueError("A exploração adaptativa avança por episódio")
+        self.maximo = inicial if maximo is None else maximo
+        self.alvo = alvo
+        self.fator = fator
+        self.resultados = deque(maxlen=janela)
+        super().__init__(inicial, minimo, unidade)
+
+    def valor(self, t: int) -> float:
+        return self.inicial # Depois do início o valor vem dos resultados (avancar), não de t
+
+    def avancar(self, sucesso: Optional[bool] = None) -> float:
+        self.t += 1
+        self.resultados.append(bool(sucesso))
+        if len(self.resultados) == self.resultados.maxlen:
+            taxa = sum(self.resultados) / len(self.resultados)
+            if taxa >= self.alvo:
+                self.epsilon = max(self.minimo, self.epsilon * self.fator)
+            else:
+                self.epsilon = min(self.maximo, self.epsilon / self.fator)
+        return self.epsilon
+
+    def reiniciar(self):
+        self.resultados.clear()
+        super().reiniciar()
+
+
+TIPOS = {
+    "constante": ExploracaoConstante,
+    "exponencial": ExploracaoExponencial,
+    "linear": ExploracaoLinear,
+    "degraus": ExploracaoDegraus,
+    "tempo_inverso": ExploracaoTempoInverso,
+    "adaptativa": ExploracaoAdaptativa,
+}
+
+def criar_exploracao(config: Dict[str, Any]) -> Exploracao:
+    """Bloco "exploracao" do JSON do agente: "tipo" (ver TIPOS) e os argumentos da classe."""
+    argumentos = dict(config)
+    tipo = argumentos.pop("tipo", "exponencial")
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de exploração desconhecido: {tipo!r} (opções: {', '.join(TIPOS)})")
+    return TIPOS[tipo](**argumentos)
@@ -0,0 +1,153 @@
+"""
+Formato binário das Q-Tables (.qtab), alternativo ao .pkl.
+
+    [8 bytes]  magia b"SMAQTAB\\0"
+    [4 bytes]  versão do formato (uint32 little-endian)
+    [4 bytes]  tamanho do cabeçalho (uint32 little-endian)
+    [N bytes]  cabeçalho JSON: ações, codificação do estado, dimensões, dtype, hiperparâmetros
+    [padding]  até múltiplo de 64 bytes
+    [q]        array float64 (linhas x ações), ordem C
+    [visitado] array uint8 (linhas), 1 = estado conhecido
+
+As linhas seguem TabelaQDensa: as primeiras N_ESTADOS são os estados codificados (Estado.codificar);
+estados fora desse formato (ex: posições (x, y)) vêm listados no cabeçalho com a sua linha.
+A leitura usa np.memmap: carregar é praticamente instantâneo e vários processos partilham as mesmas
+páginas em memória. Ao contrário do pickle, ler um .qtab nunca executa código.
+
+Conversão dos ficheiros antigos:
+    python FicheiroQ.py qtable_labirinto.pkl [qtable_labirinto.qtab]
+"""
+import json
+import struct
+import sys
+from typing import Any, Dict, Tuple
+import numpy as np
+from Checkpoint import escrever_atomico
+from Estado import N_ESTADOS, N_MASCARAS
+from TabelaQ import TabelaQDensa
+
+MAGIA = b"SMAQTAB\x00"
+VERSAO = 1
+EXTENSAO = ".qtab"
+CODIFICACAO = f"id_direcao*{N_MASCARAS}+mascara"
+_ALINHAMENTO = 64
+_PREFIXO = struct.Struct("<8sII")
+
+
+def e_binario(caminho: str) -> bool:
+    """True se o ficheiro começar pela magia do formato (independente da extensão)."""
+    try:
+        with open(caminho, "rb") as f:
+            return f.read(len(MAGIA)) == MAGIA
+    except OSError:
+        return False
+
+def _alinhar(n: int) -> int:
+    return (n + _ALINHAMENTO - 1) // _ALINHAMENTO * _ALINHAMENTO
+
+def _estado_json(estado):
+    # Os estados extra são tuplos (ex: posições); o JSON só tem listas
+    return list(estado) if isinstance(estado, tuple) else estado
+
+def _estado_de_json(estado):
+    return tuple(estado) if isinstance(estado, list) else estado
+
+
+def serializar(tabela, hiperparametros: Dict[str, Any] = None) -> bytes:
+    """Converte uma Q-Table (densa ou dicionário) nos bytes do formato .qtab."""
+    if not isinstance(tabela, TabelaQDensa):
+        densa = TabelaQDensa(tabela.accoes)
+        densa.carregar_dicionario(tabela.como_dicionario())
+        tabela = densa
+
+    n_linhas = tabela._n_fixos + len(tabela._indices_extra)
+    q = np.ascontiguousarray(tabela.q[:n_linhas], dtype="<f8")
+    visitado = np.ascontiguousarray(tabela.visitado[:n_linhas], dtype=np.uint8)
+    cabecalho = json.dumps({
+        "accoes": list(tabela.accoes),
+        "codificacao": CODIFICACAO,
+        "n_fixos": tabela._n_fixos,
+        "n_linhas": n_linhas,
+        "n_accoes": len(tabela.accoes),
+        "dtype": "<f8",
+        "estados_extra": [[_estado_json(e), i] for e, i in tabela._indices_extra.items()],
+        "hiperparametros": hiperparametros or {},
+    }).encode("utf-8")
+
+    inicio = _PREFIXO.pack(MAGIA, VERSAO, len(cabecalho)) + cabecalho
+    padding = b"\x00" * (_alinhar(len(inicio)) - len(inicio))
+    return b"".join((inicio, padding, q.tobytes(), visitado.tobytes()))
+
+def gravar(caminho: str, tabela, hiperparametros: Dict[str, Any] = None):
+    escrever_atomico(caminho, serializar(tabela, hiperparametros))
+
+
+def ler_cabecalho(caminho: str) -> Tuple[Dict[str, Any], int]:
+    """Devolve (cabeçalho, posição do array q no ficheiro). Valida magia, versão e codificação."""
+    with open(caminho, "rb") as f:
+        magia, versao, tamanho = _PREFIXO.unpack(f.read(_PREFIXO.size))
+        if magia != MAGIA:
+            raise ValueError(f"{caminho} não é uma Q-Table binária")
+        if versao > VERSAO:
+            raise ValueError(f"{caminho}: versão {versao} do formato não suportada (máximo {VERSAO})")
+        cabecalho = json.loads(f.read(tamanho).decode("utf-8"))
+    if cabecalho["codificacao"] != CODIFICACAO or cabecalho["n_fixos"] != N_ESTADOS:
+        raise ValueError(f"{caminho}: codificação do estado incompatível ({cabecalho['codificacao']})")
+    return cabecalho, _alinhar(_PREFIXO.size + tamanho)
+
+def ler(caminho: str, modo: str = "r") -> Tuple[Dict[str, Any], np.ndarray, np.ndarray]:
+    """
+    Mapeia o ficheiro em memória: (cabeçalho, q, visitado).
+    modo "r": só leitura (inferência); "c": cópia-na-escrita (treino: as alterações ficam só no processo).
+    """
+    cabecalho, posicao = ler_cabecalho(caminho)
+    forma = (cabecalho["n_linhas"], cabecalho["n_accoes"])
+    q = np.memmap(caminho, dtype=cabecalho["dtype"], mode=modo, offset=posicao, shape=forma)
+    posicao_visitado = posicao + q.nbytes
+    visitado = np.memmap(caminho, dtype=np.uint8, mode=modo, offset=posicao_visitado, shape=(forma[0],))
+    return cabecalho, q, visitado.view(bool)
+
+def carregar_densa(caminho: str, accoes, modo: str = "r") -> TabelaQDensa:
+    """TabelaQDensa cujos arrays são o próprio ficheiro (sem copiar) quando as ações coincidem."""
+    cabecalho, q, visitado = ler(caminho, modo)
+    tabela = TabelaQDensa(accoes)
+    indices_extra = {_estado_de_json(e): i for e, i in cabecalho["estados_extra"]}
+    if list(cabecalho["accoes"]) == tabela.accoes:
+        tabela.q = q
+        tabela.visitado = visitado
+        tabela._n_linhas = cabecalho["n_linhas"]
+        tabela._indices_extra = indices_extra
+        return tabela
+    # Ações noutra ordem (ou outro conjunto): passa pelo formato dicionário
+    dados = {}
+    estados = {i: e for e, i in indices_extra.items()}
+    for i in np.flatnonzero(visitado):
+        estado = int(i) if i < cabecalho["n_fixos"] else estados[int(i)]
+        dados[estado] = dict(zip(cabecalho["accoes"], q[i].tolist()))
+    tabela.carregar_dicionario(dados)
+    return tabela
+
+
+def converter(origem: str, destino: str = None) -> str:
+    """Converte um .pkl antigo (qtable_*.pkl, config_agente_*.pkl) para .qtab."""
+    import pickle
+    from Accoes import ids_accoes
+    from Politica import PoliticaQLearning
+    if destino is None:
+        destino = origem.rsplit(".", 1)[0] + EXTENSAO
+    with open(origem, "rb") as f:
+        dados = PoliticaQLearning._migrar_formato_antigo(pickle.load(f))
+    accoes = sorted({a for q_valores in dados.values() for a in q_valores}) or ids_accoes(
+        ["norte", "sul", "este", "oeste", "nordeste", "sudeste", "sudoeste", "noroeste"])
+    tabela = TabelaQDensa(accoes)
+    tabela.carregar_dicionario(dados)
+    gravar(destino, tabela)
+    return destino
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python FicheiroQ.py origem.pkl [destino.qtab]")
+        sys.exit(1)
+    destino = converter(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"{sys.argv[1]} -> {destino}")
@@ -0,0 +1,234 @@
+"""
+Solução ótima dos cenários em grelha (farol e labirinto) por iteração de valor.
+
+O cenário é compilado num modelo determinístico sobre as células (x, y) e as 8 ações, com as mesmas
+regras do _agir_safe dos ambientes: paredes do mundo (-100, fica no sítio), obstáculos (-50, fica no sítio),
+shaping euclidiano ou geodésico (* 10) e o bónus de chegada (farol +100, labirinto +500), que termina o episódio.
+A iteração de valor é toda em NumPy (uma operação por iteração sobre estados x ações).
+
+Usos:
+- referência: valor ótimo e passos do caminho ótimo a partir das posições iniciais;
+- PoliticaOraculo: política gulosa sobre a solução (precisa da posição na observação);
+- inicializar_tabela: Q-Table inicial para o PoliticaQLearning a partir dos Q* (warm start).
+
+    python IteracaoValor.py [cenario.json]
+"""
+import json
+import sys
+import time
+from typing import Dict, Optional
+import numpy as np
+from Accoes import DELTAS, N_ACCOES
+from AmbienteLabirinto import AmbienteLabirinto
+from Estado import N_MASCARAS, id_direcao
+from Modelos import Observacao, Accao
+from Politica import Politica
+
+PENALIZACAO_LIMITES = -100.0
+PENALIZACAO_OBSTACULO = -50.0
+
+
+class ModeloGrelha:
+    """Modelo determinístico: para cada estado (índice x * altura + y) e ação, o seguinte, a recompensa e se termina."""
+    def __init__(self, largura: int, altura: int, seguinte: np.ndarray, recompensa: np.ndarray,
+                 terminal: np.ndarray, objetivo: np.ndarray):
+        self.largura = largura
+        self.altura = altura
+        self.seguinte = seguinte # (S, 8) int64
+        self.recompensa = recompensa # (S, 8) float64
+        self.terminal = terminal # (S, 8) bool: a transição chega ao objetivo
+        self.objetivo = objetivo # (S,) bool: células onde o episódio já acabou (valor 0)
+
+class SolucaoValor:
+    def __init__(self, valores: np.ndarray, q: np.ndarray, politica: np.ndarray, iteracoes: int, gamma: float):
+        self.valores = valores # (largura, altura): V* de cada célula
+        self.q = q # (largura, altura, 8): Q* de cada célula e ação
+        self.politica = politica # (largura, altura): id da melhor ação (primeira em caso de empate)
+        self.iteracoes = iteracoes
+        self.gamma = gamma
+
+
+def compilar(ambiente) -> ModeloGrelha:
+    """Traduz um AmbienteFarol/AmbienteLabirinto (já construído) no modelo da grelha."""
+    L, A = ambiente.largura, ambiente.altura
+    alvo = ambiente.farol_pos
+    labirinto = isinstance(ambiente, AmbienteLabirinto)
+    bonus = 500.0 if labirinto else 100.0
+
+    xs, ys = np.meshgrid(np.arange(L), np.arange(A), indexing="ij")
+    xs, ys = xs.ravel(), ys.ravel()
+    nx = xs[:, None] + DELTAS[:, 0]
+    ny = ys[:, None] + DELTAS[:, 1]
+
+    dentro = (nx >= 0) & (nx < L) & (ny >= 0) & (ny < A)
+    nxc, nyc = np.clip(nx, 0, L - 1), np.clip(ny, 0, A - 1)
+    bate = dentro & ambiente.grelha_obstaculos[nxc, nyc].astype(bool)
+    if labirinto:
+        bate &= ~((nxc == alvo[0]) & (nyc == alvo[1])) # A saída nunca é obstáculo
+    move = dentro & ~bate
+
+    origem = xs * A + ys
+    seguinte = np.where(move, nxc * A + nyc, origem[:, None])
+
+    distancia = np.hypot(alvo[0] - np.arange(L)[:, None], alvo[1] - np.arange(A)[None, :]).ravel()
+    if labirinto and ambiente.modo_recompensa == "geodesica":
+        geo = ambiente.distancia_geodesica.ravel().astype(np.float64)
+        alcancavel = (geo[origem][:, None] >= 0) & (geo[seguinte] >= 0)
+        shaping = np.where(alcancavel, (geo[origem][:, None] - geo[seguinte]) * 10, 0.0)
+    else:
+        shaping = (distancia[origem][:, None] - distancia[seguinte]) * 10
+
+    terminal = move & (distancia[seguinte] < 1.0)
+    recompensa = np.where(move, shaping + bonus * terminal, 0.0)
+    recompensa = np.where(~dentro, PENALIZACAO_LIMITES, recompensa)
+    recompensa = np.where(bate, PENALIZACAO_OBSTACULO, recompensa)
+    return ModeloGrelha(L, A, seguinte, recompensa, terminal, distancia < 1.0)
+
+def resolver(modelo: ModeloGrelha, gamma: float = 0.9, tolerancia: float = 1e-6,
+             max_iteracoes: int = 10000) -> SolucaoValor:
+    """Iteração de valor: V <- max_a [R(s, a) + gamma * V(s') * (1 - terminal)] até convergir."""
+    # As células do objetivo já terminaram o episódio: recompensa 0 e sem continuação (V = 0)
+    continua = np.where(modelo.terminal | modelo.objetivo[:, None], 0.0, gamma)
+    recompensa = np.where(modelo.objetivo[:, None], 0.0, modelo.recompensa)
+    seguinte = modelo.seguinte
+
+    # No ciclo os arrays ficam por ação (8 x S, contíguos): o max sobre as ações percorre 8 linhas inteiras,
+    # muito mais rápido do que reduzir 8 colunas por estado. Arrays de trabalho reutilizados (sem alocações).
+    continua_t = np.ascontiguousarray(continua.T)
+    recompensa_t = np.ascontiguousarray(recompensa.T)
+    seguinte_t = np.ascontiguousarray(seguinte.T)
+    v = np.zeros(seguinte.shape[0])
+    v_novo = np.empty_like(v)
+    q_t = np.empty(seguinte_t.shape)
+    iteracao = 0
+    for iteracao in range(1, max_iteracoes + 1):
+        np.take(v, seguinte_t, out=q_t)
+        q_t *= continua_t
+        q_t += recompensa_t
+        np.max(q_t, axis=0, out=v_novo)
+        delta = np.abs(v_novo - v).max()
+        v, v_novo = v_novo, v
+        if delta < tolerancia:
+            break
+
+    q = recompensa + continua * v[seguinte]
+    forma = (modelo.largura, modelo.altura)
+    return SolucaoValor(v.reshape(forma), q.reshape(forma + (N_ACCOES,)), q.argmax(axis=1).reshape(forma),
+                        iteracao, gamma)
+
+def resolver_cenario(caminho: str, gamma: float = 0.9):
+    """Lê um cenário JSON, constrói o ambiente (MotorDeSimulacao.criar_ambiente) e resolve-o. Devolve (ambiente, solução)."""
+    from Motor import MotorDeSimulacao
+    with open(caminho, "r") as f:
+        params = json.load(f)
+    ambiente = MotorDeSimulacao.criar_ambiente(params)
+    return ambiente, resolver(compilar(ambiente), gamma)
+
+
+def caminho_otimo(solucao: SolucaoValor, modelo: ModeloGrelha, inicio, max_passos: int = 10000) -> Optional[int]:
+    """Número de passos da política ótima desde 'inicio' até ao objetivo (None se não chegar)."""
+    s = int(inicio[0]) * modelo.altura + int(inicio[1])
+    politica = solucao.politica.ravel()
+    for passos in range(1, max_passos + 1):
+        a = politica[s]
+        if modelo.terminal[s, a]:
+            return passos
+        s_next = modelo.seguinte[s, a]
+        if s_next == s:
+            return None
+        s = s_next
+    return None
+
+
+class PoliticaOraculo(Politica):
+    """
+    Política ótima do cenário: a melhor ação da SolucaoValor para a posição da observação.
+    Não aprende; serve de referência nos benchmarks e nas visualizações.
+    """
+    def __init__(self, solucao: SolucaoValor):
+        self.solucao = solucao
+        self.politica = solucao.politica.tolist() # Listas: consulta por índice mais rápida do que no array
+
+    def selecionar_accao(self, observacao: Observacao) -> Accao:
+        pos = observacao.get("posicao") if observacao is not None else None
+        if pos is None:
+            return Accao("parar")
+        return Accao.mover(self.politica[int(round(pos[0]))][int(round(pos[1]))])
+
+    def atualizar(self, recompensa: float):
+        pass
+
+
+def inicializar_tabela(politica, solucao: SolucaoValor, ambiente, por_posicao: bool = False) -> int:
+    """
+    Warm start da Q-Table de um PoliticaQLearning com Q*.
+    Por defeito os estados são os do AgenteRL (Estado.codificar: direção do alvo + máscara de paredes):
+    cada estado recebe a média de Q* das células onde aparece. Com por_posicao=True a chave é (x, y).
+    Devolve o número de estados escritos.
+    """
+    L, A = solucao.valores.shape
+    soma: Dict = {}
+    contagem: Dict = {}
+    alvo = ambiente.farol_pos
+    for x in range(L):
+        for y in range(A):
+            if ambiente.grelha_obstaculos[x, y] or (x, y) == tuple(alvo):
+                continue
+            if por_posicao:
+                estado = (x, y)
+            else:
+                dx, dy = alvo[0] - x, alvo[1] - y
+                d = (dx * dx + dy * dy) ** 0.5
+                direcao = id_direcao(dx / d, dy / d) if d > 0 else id_direcao(0, 0)
+                estado = direcao * N_MASCARAS + ambiente.mascara_vizinhanca(x, y)
+            soma[estado] = soma.get(estado, 0.0) + solucao.q[x, y]
+            contagem[estado] = contagem.get(estado, 0) + 1
+
+    dados = {}
+    for estado, total in soma.items():
+        media = total / contagem[estado]
+        dados[estado] = {accao: float(media[accao]) for accao in politica.accoes}
+    politica.tabela.carregar_dicionario(dados)
+    return len(dados)
+
+
+if __name__ == "__main__":
+    from Motor import MotorDeSimulacao
+    import Registo
+    Registo.configurar(nivel=Registo.AVISO)
+    cenario = sys.argv[1] if len(sys.argv) > 1 else "JSONFILES/labirinto1.json"
+
+    inicio = time.perf_counter()
+    ambiente, solucao = resolver_cenario(cenario)
+    duracao = time.perf_counter() - inicio
+    modelo = compilar(ambiente)
+    print(f"=== {cenario}: {ambiente.largura}x{ambiente.altura} resolvido em {duracao * 1000:.1f} ms "
+          f"({solucao.iteracoes} iterações) ===")
+
+    with open(cenario, "r") as f:
+        agentes = json.load(f).get("agentes", [])
+    for info in agentes:
+        pos = tuple(info.get("posicao", [0, 0]))
+        print(f"  {info.get('nome')}: V*{pos} = {solucao.valores[pos]:.1f} | "
+              f"caminho ótimo: {caminho_otimo(solucao, modelo, pos)} passos")
+
+    # Comparação com a política aprendida (Q-Table em disco) nos mesmos episódios
+    motor = MotorDeSimulacao.cria(cenario, sincrono=True)
+    for nome, preparar in (("aprendida", lambda a: a.congelar()), ("oráculo", lambda a: setattr(a, "politica", PoliticaOraculo(solucao)))):
+        for agente in motor.agentes:
+            if hasattr(agente, "congelar"):
+                preparar(agente)
+        estatisticas = motor.executa_episodio(1000)
+        print(f"  política {nome}: {estatisticas['passos']} passos, sucesso={estatisticas['sucesso']}, "
+              f"recompensa={estatisticas['recompensa_total']:.1f}")
+    motor.parar_agentes()
+
+    # Escala: mapa aleatório 100x100
+    rng = np.random.default_rng(0)
+    obstaculos = [tuple(map(int, p)) for p in rng.integers(0, 100, size=(2000, 2)) if tuple(p) != (99, 99)]
+    grande = AmbienteLabirinto((99, 99), (100, 100), obstaculos)
+    inicio = time.perf_counter()
+    modelo_grande = compilar(grande)
+    solucao_grande = resolver(modelo_grande)
+    print(f"100x100 ({len(set(obstaculos))} obstáculos): {(time.perf_counter() - inicio) * 1000:.1f} ms, "
+          f"{solucao_grande.iteracoes} iterações")
@@ -1,21 +1,177 @@
 from typing import Dict, Any
 
+# Marca de "campo não preenchido" (None é um valor válido em alguns campos)
+_AUSENTE = object()
+
 class Observacao:
-    """Estrutura de dados para a observação do ambiente pelo agente."""
-    def __init__(self, dados: Dict[str, Any]):
-        self.dados = dados
+    """
+    Estrutura de dados para a observação do ambiente pelo agente.
+    Os campos dos sensores incluídos no projeto têm lugar fixo (__slots__), para não alocar
+    um dicionário por leitura; chaves fora desta lista ficam num dicionário 'extra'.
+    Só os campos passados são atribuídos: os outros ficam por preencher e '_preenchidos' guarda
+    um bit por campo preenchido (ver BITS), para o atualizar não ter de procurar os que faltam.
+    Os campos preenchem-se pelo construtor ou pelo atualizar (não por atribuição direta).
+    Aceita tanto Observacao({"direcao": d, ...}) (formato antigo) como Observacao(direcao=d, ...).
+    """
+    CAMPOS = ("direcao", "distancia", "posicao", "mascara_obstaculos", "farol_visto",
+              "direcao_visual", "distancia_geodesica", "estado_customizado", "erro")
+    _CAMPOS = frozenset(CAMPOS)
+    BITS = {campo: 1 << i for i, campo in enumerate(CAMPOS)}
+    __slots__ = CAMPOS + ("extra", "_preenchidos")
+
+    def __init__(self, dados: Dict[str, Any] = None, *, direcao=_AUSENTE, distancia=_AUSENTE, posicao=_AUSENTE,
+                 mascara_obstaculos=_AUSENTE, farol_visto=_AUSENTE, direcao_visual=_AUSENTE,
+                 distancia_geodesica=_AUSENTE, estado_customizado=_AUSENTE, erro=_AUSENTE):
+        # Desenrolado de propósito (como o atualizar): uma observação é criada por cada sensor em cada passo
+        preenchidos = 0
+        if direcao is not _AUSENTE: self.direcao = direcao; preenchidos = 1
+        if distancia is not _AUSENTE: self.distancia = distancia; preenchidos |= 2
+        if posicao is not _AUSENTE: self.posicao = posicao; preenchidos |= 4
+        if mascara_obstaculos is not _AUSENTE: self.mascara_obstaculos = mascara_obstaculos; preenchidos |= 8
+        if farol_visto is not _AUSENTE: self.farol_visto = farol_visto; preenchidos |= 16
+        if direcao_visual is not _AUSENTE: self.direcao_visual = direcao_visual; preenchidos |= 32
+        if distancia_geodesica is not _AUSENTE: self.distancia_geodesica = distancia_geodesica; preenchidos |= 64
+        if estado_customizado is not _AUSENTE: self.estado_customizado = estado_customizado; preenchidos |= 128
+        if erro is not _AUSENTE: self.erro = erro; preenchidos |= 256
+        self._preenchidos = preenchidos
+        self.extra = None
+        if dados:
+            self.atualizar(dados)
 
     def __repr__(self):
         return f"Observacao({self.dados})"
 
     def get(self, key, default=None):
-        return self.dados.get(key, default)
+        valor = getattr(self, key, _AUSENTE) if key in Observacao._CAMPOS else _AUSENTE
+        if valor is not _AUSENTE:
+            return valor
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _AUSENTE) is not _AUSENTE
+
+    def atualizar(self, outra):
+        """Junta os campos preenchidos de outra observação (ou dicionário), como dict.update."""
+        if isinstance(outra, Observacao):
+            # Só lê os campos com o bit ligado: ler um slot por preencher (getattr com default) custa
+            # uma AttributeError por campo, mais do que a própria leitura do sensor
+            preenchidos = outra._preenchidos
+            if preenchidos:
+                if preenchidos & 1: self.direcao = outra.direcao
+                if preenchidos & 2: self.distancia = outra.distancia
+                if preenchidos & 4: self.posicao = outra.posicao
+                if preenchidos & 8: self.mascara_obstaculos = outra.mascara_obstaculos
+                if preenchidos & 16: self.farol_visto = outra.farol_visto
+                if preenchidos & 32: self.direcao_visual = outra.direcao_visual
+                if preenchidos & 64: self.distancia_geodesica = outra.distancia_geodesica
+                if preenchidos & 128: self.estado_customizado = outra.estado_customizado
+                if preenchidos & 256: self.erro = outra.erro
+                self._preenchidos |= preenchidos
+            if outra.extra:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra.update(outra.extra)
+            return
+        for chave, valor in outra.items():
+            bit = Observacao.BITS.get(chave)
+            if bit is not None:
+                setattr(self, chave, valor)
+                self._preenchidos |= bit
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[chave] = valor
+
+    @property
+    def dados(self) -> Dict[str, Any]:
+        """Vista em dicionário (compatibilidade; cria um dicionário novo a cada acesso)."""
+        dados = {}
+        for campo in Observacao.CAMPOS:
+            valor = getattr(self, campo, _AUSENTE)
+            if valor is not _AUSENTE:
+                dados[campo] = valor
+        if self.extra:
+            dados.update(self.extra)
+        return dados
+
+class ObservacaoDirecao(Observacao):
+    """
+    Leitura com direção, distância e posição (SensorDirecao e observacaoPara dos ambientes).
+    As subclasses seguintes servem os sítios que criam uma observação em cada passo: recebem os campos
+    por posição, porque uma chamada com argumentos por nome a uma classe custa mais do que um dicionário literal.
+    """
+    __slots__ = ()
+    PREENCHIDOS = Observacao.BITS["direcao"] | Observacao.BITS["distancia"] | Observacao.BITS["posicao"]
+
+    def __init__(self, direcao, distancia, posicao):
+        self.direcao = direcao
+        self.distancia = distancia
+        self.posicao = posicao
+        self._preenchidos = self.PREENCHIDOS
+        self.extra = None
+
+class ObservacaoProximidade(Observacao):
+    """Leitura do SensorProximidade: máscara dos obstáculos vizinhos e posição."""
+    __slots__ = ()
+    PREENCHIDOS = Observacao.BITS["mascara_obstaculos"] | Observacao.BITS["posicao"]
+
+    def __init__(self, mascara_obstaculos, posicao):
+        self.mascara_obstaculos = mascara_obstaculos
+        self.posicao = posicao
+        self._preenchidos = self.PREENCHIDOS
+        self.extra = None
+
+class ObservacaoEstado(Observacao):
+    """Observação que os agentes de RL passam à política: estado já codificado e posição."""
+    __slots__ = ()
+    PREENCHIDOS = Observacao.BITS["estado_customizado"] | Observacao.BITS["posicao"]
+
+    def __init__(self, estado_customizado, posicao):
+        self.estado_customizado = estado_customizado
+        self.posicao = posicao
+        self._preenchidos = self.PREENCHIDOS
+        self.extra = None
 
 class Accao:
-    """Estrutura de dados para a ação do agente."""
-    def __init__(self, tipo: str, parametros: Dict[str, Any] = None):
+    """
+    Estrutura de dados para a ação do agente.
+    A direção (o único parâmetro usado pelos ambientes) tem lugar fixo; outros parâmetros ficam em 'extra'.
+    Aceita Accao("mover", {"direcao": d}) (formato antigo) ou Accao("mover", direcao=d).
+    """
+    __slots__ = ("tipo", "direcao", "extra")
+
+    def __init__(self, tipo: str, parametros: Dict[str, Any] = None, direcao=None):
         self.tipo = tipo
-        self.parametros = parametros or {}
+        self.direcao = direcao
+        self.extra = None
+        if parametros:
+            parametros = dict(parametros)
+            if "direcao" in parametros:
+                self.direcao = parametros.pop("direcao")
+            self.extra = parametros or None
+
+    _MOVER = {}
+
+    @classmethod
+    def mover(cls, direcao) -> 'Accao':
+        """
+        Ação "mover" partilhada, uma por direção (ids de Accoes): as políticas devolvem-na em cada passo sem criar
+        uma ação nova. Quem a recebe não a deve alterar.
+        """
+        accao = cls._MOVER.get(direcao)
+        if accao is None:
+            accao = cls._MOVER[direcao] = cls("mover", direcao=direcao)
+        return accao
+
+    @property
+    def parametros(self) -> Dict[str, Any]:
+        """Vista em dicionário (compatibilidade)."""
+        parametros = {} if self.direcao is None else {"direcao": self.direcao}
+        if self.extra:
+            parametros.update(self.extra)
+        return parametros
 
     def __repr__(self):
         return f"Accao(tipo='{self.tipo}', params={self.parametros})"
@@ -7,21 +7,39 @@ from AgenteNormal import AgenteNormal
 from Agente import AgenteDirecional as AgenteFarol
 from Sensor import SensorVisao, SensorDirecao, SensorProximidade
 from AmbienteLabirinto import AmbienteLabirinto
+from Aleatorio import semente_agente
+from Exploracao import EPISODIO, PASSO
+import Registo
 
 class MotorDeSimulacao:
-    def __init__(self, ambiente , agentes):
+    def __init__(self, ambiente , agentes, sincrono: bool = False):
         self.ambiente = ambiente
         self.agentes = agentes
+        # Modo síncrono: os agentes correm em lockstep na thread de quem chama o Motor,
+        # sem threads nem handshakes de Events (muito mais rápido para treino sem visualização)
+        self.sincrono = sincrono
 
         self.largura, self.altura = ambiente.dimensoes
+        self._atualizar_exploracao_por_passo()
 
         for agente in self.agentes:
             agente.set_ambiente(self.ambiente)
-            agente.start()
+            if not self.sincrono:
+                agente.start()
 
     #O método executa() faz um ciclo completo: todos os agentes observam, 
     # processam, decidem ação e o ambiente executa. Depois atualiza o ambiente
     def executa(self):
+        if self.sincrono:
+            # Mesmo ciclo, mas inline: cada agente observa -> age -> ambiente.agir, por ordem
+            for agente in self.agentes:
+                agente.executa_passo()
+            self.ambiente.atualizacao()
+            self.ambiente.tick += 1
+            for politica in self._exploracao_por_passo:
+                politica.avancar_exploracao(PASSO)
+            return
+
         # 1. Trigger all agents to start their step
         for agente in self.agentes:
             agente.end_step_event.clear()
@@ -33,32 +51,90 @@ class MotorDeSimulacao:
             
         # 3. Update environment
         self.ambiente.atualizacao()
+        self.ambiente.tick += 1
+        for politica in self._exploracao_por_passo:
+            politica.avancar_exploracao(PASSO)
+
+    def _atualizar_exploracao_por_passo(self):
+        # Políticas com agenda de exploração por passo (a lista é refeita a cada episódio, ex: depois de congelar())
+        self._exploracao_por_passo = [
+            agente.politica for agente in self.agentes
+            if getattr(getattr(agente, "politica", None), "exploracao", None) is not None
+            and agente.politica.exploracao.unidade == PASSO
+        ]
+
+    def avancar_exploracao(self, sucesso: bool):
+        """Fim de episódio: avança as agendas de exploração por episódio de todos os agentes."""
+        for agente in self.agentes:
+            politica = getattr(agente, "politica", None)
+            if hasattr(politica, "avancar_exploracao"):
+                politica.avancar_exploracao(EPISODIO, sucesso)
+
+    def parar_agentes(self):
+        """Termina as threads dos agentes (se existirem) e espera que acabem."""
+        for agente in self.agentes:
+            agente.running = False
+            if agente.is_alive():
+                agente.start_step_event.set()
+                agente.join()
+
+    def reiniciar(self):
+        """
+        Prepara um novo episódio sem reconstruir o mundo: repõe as posições iniciais
+        e os contadores dos agentes, mantendo políticas, Q-Tables e sensores em memória.
+        """
+        self.ambiente.reset()
+        self.ambiente.tick += 1 # O mundo mudou: nenhuma leitura anterior é válida
+        for agente in self.agentes:
+            agente.reiniciar()
+        self._atualizar_exploracao_por_passo()
+
+    def executa_episodio(self, max_passos: int) -> dict:
+        """
+        Reinicia o mundo e corre um episódio completo (até ao objetivo ou max_passos).
+        Devolve as estatísticas do episódio: passos, recompensa total e sucesso.
+        """
+        self.reiniciar()
+
+        passos = 0
+        while passos < max_passos:
+            self.executa()
+            passos += 1
+            if self.ambiente.simulacao_concluida():
+                break
+
+        sucesso = self.ambiente.simulacao_concluida()
+        for agente in self.agentes:
+            agente.fim_episodio(sucesso)
+        self.avancar_exploracao(sucesso)
+
+        estatisticas = {
+            "passos": passos,
+            "recompensa_total": sum(a.recompensa_total for a in self.agentes),
+            "sucesso": sucesso,
+        }
+        # Referência: o caminho mais curto possível a partir das posições iniciais
+        if hasattr(self.ambiente, "passos_otimos"):
+            otimos = [self.ambiente.passos_otimos(p) for p in self.ambiente.posicoes_iniciais.values()]
+            otimos = [o for o in otimos if o is not None]
+            estatisticas["passos_otimos"] = min(otimos) if otimos else None
+        return estatisticas
 
     def listaAgentes(self) -> List[Agente]:
         return self.agentes
 
     @staticmethod
-    def cria(nome_do_ficheiro_parametros: str) -> 'MotorDeSimulacao': 
-        print(f"DEBUG: A ler ficheiro: {nome_do_ficheiro_parametros}")
-        
-        with open(nome_do_ficheiro_parametros, 'r') as f:
-            params = json.load(f)
-
+    def criar_ambiente(params: dict):
+        """Constrói apenas o ambiente descrito num cenário (dicionário já lido do JSON)."""
         tipo = params.get("tipo")
-        print(f"DEBUG: Tipo de ambiente encontrado no JSON: '{tipo}'")
-        
-        ambiente = None
-        agentes = []
-
-        # Variáveis auxiliares para evitar duplicar código de criação de agentes
         env_params = params["ambiente"]
-        lista_agentes_json = params.get("agentes", [])
+        ambiente = None
 
         # ==========================================
         # LÓGICA 1: AMBIENTE FAROL
         # ==========================================
         if tipo == "farol":
-            print("DEBUG: Entrou na lógica 'farol'.")
+            Registo.depuracao("DEBUG: Entrou na lógica 'farol'.")
             ambiente = AmbienteFarol(
                 farol_pos=tuple(env_params["pos_farol"]),
                 dimensoes=tuple(env_params["dimensao"]),
@@ -69,21 +145,50 @@ class MotorDeSimulacao:
         # LÓGICA 2: AMBIENTE LABIRINTO (NOVO)
         # ==========================================
         elif tipo == "labirinto":
-            print("DEBUG: Entrou na lógica 'labirinto'.")
+            Registo.depuracao("DEBUG: Entrou na lógica 'labirinto'.")
             ambiente = AmbienteLabirinto(
                 pos_saida=tuple(env_params["pos_saida"]), # JSON usa "pos_saida"
                 dimensoes=tuple(env_params["dimensao"]),
-                obstaculos=[tuple(o) for o in env_params.get("obstaculos", [])]
+                obstaculos=[tuple(o) for o in env_params.get("obstaculos", [])],
+                # Shaping da recompensa: "euclidiana" (por defeito) ou "geodesica"
+                modo_recompensa=env_params.get("recompensa", "euclidiana")
             )
         
         else:
-            print(f"DEBUG: ERRO - Tipo '{tipo}' desconhecido.")
+            Registo.erro(f"DEBUG: ERRO - Tipo '{tipo}' desconhecido.")
             return None
 
+        return ambiente
+
+    @staticmethod
+    def cria(nome_do_ficheiro_parametros: str, sincrono: bool = None, semente: int = None) -> 'MotorDeSimulacao': 
+        Registo.depuracao(f"DEBUG: A ler ficheiro: {nome_do_ficheiro_parametros}")
+        
+        with open(nome_do_ficheiro_parametros, 'r') as f:
+            params = json.load(f)
+
+        tipo = params.get("tipo")
+
+        # Modo de execução: o argumento tem prioridade sobre o JSON ("modo_execucao": "sincrono" | "threads")
+        if sincrono is None:
+            sincrono = params.get("modo_execucao", "threads") == "sincrono"
+        Registo.depuracao(f"DEBUG: Tipo de ambiente encontrado no JSON: '{tipo}'")
+
+        # Semente do cenário (argumento ou "semente" no JSON): cada agente recebe um gerador derivado dela e do seu índice
+        if semente is None:
+            semente = params.get("semente")
+        
+        ambiente = MotorDeSimulacao.criar_ambiente(params)
+        if ambiente is None:
+            return None
+
+        agentes = []
+        lista_agentes_json = params.get("agentes", [])
+
         # ==========================================
         # CRIAÇÃO COMUM DOS AGENTES
         # ==========================================
-        print(f"DEBUG: Encontrei {len(lista_agentes_json)} agentes.")
+        Registo.depuracao(f"DEBUG: Encontrei {len(lista_agentes_json)} agentes.")
 
         for i, agente_info in enumerate(lista_agentes_json):
             nome_classe = agente_info.get("classe", "AgenteFarol")
@@ -91,11 +196,18 @@ class MotorDeSimulacao:
             posicao = tuple(agente_info.get("posicao", [0, 0]))
             caminho_config = agente_info.get("ficheiro_config", "")
             
-            print(f"DEBUG: A processar Agente {i} | {nome_classe}")
+            Registo.depuracao(f"DEBUG: A processar Agente {i} | {nome_classe}")
             novo_agente = None
 
             if nome_classe.strip() == "AgenteRL":
                 novo_agente = AgenteRL(nome, posicao, caminho_config)
+                # "inferencia": true no cenário sobrepõe-se ao ficheiro de configuração do agente
+                if agente_info.get("inferencia"):
+                    novo_agente.congelar()
+                # "oraculo": true -> política ótima do cenário (IteracaoValor), como referência
+                if agente_info.get("oraculo"):
+                    from IteracaoValor import PoliticaOraculo, compilar, resolver
+                    novo_agente.politica = PoliticaOraculo(resolver(compilar(ambiente)))
                 
                 # Instalação de Sensores
                 # DIREÇÃO: Obrigatório (saber para onde ir)
@@ -116,13 +228,15 @@ class MotorDeSimulacao:
                 novo_agente.instala(SensorProximidade()) # Útil se quiseres que ele evite bater
                 
             else:
-                print(f"   -> AVISO: Classe desconhecida.")
+                Registo.aviso(f"   -> AVISO: Classe desconhecida.")
 
             if novo_agente:
+                if semente is not None and getattr(novo_agente, "politica", None) is not None:
+                    novo_agente.politica.semear(semente_agente(semente, i))
                 ambiente.adicionar_agente(novo_agente, posicao)
                 if hasattr(novo_agente, 'posicao'): novo_agente.posicao = posicao
                 agentes.append(novo_agente)
-                print(f"   -> Agente {nome} adicionado.")
+                Registo.depuracao(f"   -> Agente {nome} adicionado.")
 
-        print(f"DEBUG FINAL: Motor criado com {len(agentes)} agentes.")
-        return MotorDeSimulacao(ambiente, agentes)
\ No newline at end of file
+        Registo.depuracao(f"DEBUG FINAL: Motor criado com {len(agentes)} agentes.")
+        return MotorDeSimulacao(ambiente, agentes, sincrono=sincrono)
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Rotas na grelha de obstáculos para a PoliticaPlaneador (AgenteNormal com "modo": "planeador").
+
+Em vez de uma pesquisa (A*) por agente e por passo, cada alvo tem uma árvore de BFS inversa:
+uma BFS a partir do alvo dá a distância de todas as células, e a próxima ação de cada célula é a de
+um vizinho a menos um passo. Uma árvore responde a qualquer posição de partida com uma consulta O(1),
+e é partilhada por todos os agentes do mesmo ambiente e alvo.
+
+A árvore fica em cache por (ambiente, alvo) e guarda a versão do mapa (Ambiente.versao_mapa) em que
+foi calculada. Quando o mapa muda (Ambiente.definir_obstaculo, ex: no atualizacao() de um ambiente
+dinâmico), a árvore é reparada localmente se as alterações não mexem em caminhos de outras células,
+e só é recalculada (uma BFS) nos outros casos.
+
+    python Planeador.py    # benchmark com centenas de agentes e paredes a mudar
+"""
+import threading
+import time
+import weakref
+from typing import Tuple
+import numpy as np
+from Accoes import N_ACCOES, VETORES
+
+SEM_ACCAO = -1 # Célula sem rota: o próprio alvo, paredes e células inalcançáveis
+
+
+class RotasAlvo:
+    """Árvore de BFS inversa de um alvo: distância e próxima ação (id 0..7) de cada célula [x, y]."""
+    def __init__(self, alvo: Tuple[int, int], versao: int, distancias: np.ndarray, accoes: np.ndarray):
+        self.alvo = alvo
+        self.versao = versao # Ambiente.versao_mapa em que a árvore é válida
+        self.distancias = distancias # (largura, altura) int32, -1 = inalcançável ou parede
+        self.accoes = accoes # (largura, altura) int8, SEM_ACCAO quando não há rota
+        self.bfs = 1 # Número de BFS completas feitas para esta árvore (estatística)
+
+    def accao(self, x: int, y: int) -> int:
+        """Próxima ação a partir de (x, y) (SEM_ACCAO no alvo, fora do mapa ou sem caminho)."""
+        if 0 <= x < self.accoes.shape[0] and 0 <= y < self.accoes.shape[1]:
+            return self.accoes.item(x, y)
+        return SEM_ACCAO
+
+    def passos(self, x: int, y: int):
+        """Número de passos até ao alvo (None se não houver caminho)."""
+        if 0 <= x < self.distancias.shape[0] and 0 <= y < self.distancias.shape[1]:
+            d = self.distancias.item(x, y)
+            return d if d >= 0 else None
+        return None
+
+
+def _proximas_accoes(distancias: np.ndarray) -> np.ndarray:
+    """Para cada célula alcançável, a primeira ação (ordem de Accoes.VETORES) cujo vizinho está a d - 1."""
+    L, A = distancias.shape
+    # Margem de 1 célula a -1 para os vizinhos fora do mapa
+    margem = np.full((L + 2, A + 2), -1, dtype=np.int32)
+    margem[1:-1, 1:-1] = distancias
+    accoes = np.full((L, A), SEM_ACCAO, dtype=np.int8)
+    por_decidir = distancias > 0
+    # Ordem inversa: a última escrita (a primeira ação da lista) ganha, como no argmax
+    for accao in range(N_ACCOES - 1, -1, -1):
+        dx, dy = VETORES[accao]
+        vizinho = margem[1 + dx:1 + dx + L, 1 + dy:1 + dy + A]
+        accoes[por_decidir & (vizinho >= 0) & (vizinho == distancias - 1)] = accao
+    return accoes
+
+def _calcular(ambiente, alvo: Tuple[int, int]) -> RotasAlvo:
+    distancias = ambiente._campo_distancias(alvo)
+    return RotasAlvo(alvo, ambiente.versao_mapa, distancias, _proximas_accoes(distancias))
+
+
+def _reparar(ambiente, rotas: RotasAlvo, x: int, y: int, ocupado: bool) -> bool:
+    """
+    Aplica uma alteração de uma célula à árvore sem nova BFS, quando é possível. Devolve False se for preciso recalcular.
+    - Parede nova: basta se nenhuma célula tiver rota a passar por (x, y) (folha da árvore ou já inalcançável).
+    - Parede removida: (x, y) fica a 1 + a menor distância dos vizinhos; basta se nenhum vizinho encurtar por ela.
+    """
+    L, A = rotas.distancias.shape
+    if (x, y) == rotas.alvo:
+        return True # O alvo é sempre alcançável: as paredes no alvo não mudam a árvore
+
+    vizinhos = [(x + dx, y + dy) for dx, dy in VETORES if 0 <= x + dx < L and 0 <= y + dy < A]
+    if ocupado:
+        if rotas.distancias[x, y] >= 0:
+            for vx, vy in vizinhos:
+                a = rotas.accoes[vx, vy]
+                if a != SEM_ACCAO and (vx + VETORES[a][0], vy + VETORES[a][1]) == (x, y):
+                    return False
+        rotas.distancias[x, y] = -1
+        rotas.accoes[x, y] = SEM_ACCAO
+        return True
+
+    if ambiente.grelha_obstaculos[x, y]:
+        return True # Continua ocupada (ex: removida do conjunto mas marcada na grelha)
+    melhor, melhor_accao = -1, SEM_ACCAO
+    for accao, (dx, dy) in enumerate(VETORES):
+        vx, vy = x + dx, y + dy
+        if 0 <= vx < L and 0 <= vy < A:
+            d = rotas.distancias[vx, vy]
+            if d >= 0 and (melhor < 0 or d < melhor):
+                melhor, melhor_accao = int(d), accao
+    if melhor < 0:
+        return True # Célula livre mas isolada: continua sem rota
+    nova = melhor + 1
+    for vx, vy in vizinhos:
+        d = rotas.distancias[vx, vy]
+        if not ambiente.grelha_obstaculos[vx, vy] and (d < 0 or d > nova + 1):
+            return False
+    rotas.distancias[x, y] = nova
+    rotas.accoes[x, y] = melhor_accao
+    return True
+
+
+# --- Cache partilhada: ambiente -> {alvo: RotasAlvo} ---
+_cache = weakref.WeakKeyDictionary()
+_lock_cache = threading.Lock()
+
+def rotas(ambiente, alvo) -> RotasAlvo:
+    """
+    Árvore de rotas para 'alvo' no estado atual do mapa. Sem alterações ao mapa é uma consulta a um dicionário;
+    depois de alterações, o primeiro agente a pedir repara ou recalcula a árvore, e os outros recebem-na já pronta.
+    """
+    alvo = (int(round(alvo[0])), int(round(alvo[1])))
+    por_alvo = _cache.get(ambiente)
+    if por_alvo is not None:
+        existente = por_alvo.get(alvo)
+        if existente is not None and existente.versao == ambiente.versao_mapa:
+            return existente
+
+    with _lock_cache:
+        por_alvo = _cache.setdefault(ambiente, {})
+        existente = por_alvo.get(alvo)
+        versao = ambiente.versao_mapa
+        if existente is not None and existente.versao == versao:
+            return existente # Outro agente já atualizou enquanto esperávamos
+
+        if existente is not None:
+            alteracoes = ambiente.alteracoes_mapa(existente.versao)
+            if alteracoes is not None and all(_reparar(ambiente, existente, x, y, ocupado) for x, y, ocupado in alteracoes):
+                existente.versao = versao
+                return existente
+        novas = _calcular(ambiente, alvo)
+        if existente is not None:
+            novas.bfs = existente.bfs + 1
+        por_alvo[alvo] = novas
+        return novas
+
+def esquecer(ambiente=None):
+    """Remove da cache as rotas de um ambiente (ou de todos)."""
+    with _lock_cache:
+        if ambiente is None:
+            _cache.clear()
+        else:
+            _cache.pop(ambiente, None)
+
+
+if __name__ == "__main__":
+    # Benchmark: centenas de agentes com a PoliticaPlaneador num labirinto grande com paredes a mudar
+    from AmbienteLabirinto import AmbienteLabirinto
+    from Modelos import Observacao
+    from Politica import PoliticaPlaneador
+    import Planeador # A cache usada pelas políticas é a do módulo importado, não a deste __main__
+
+    rng = np.random.default_rng(0)
+    L = A = 200
+    obstaculos = [tuple(map(int, p)) for p in rng.integers(0, L, size=(8000, 2)) if tuple(p) != (L - 1, A - 1)]
+    ambiente = AmbienteLabirinto((L - 1, A - 1), (L, A), obstaculos)
+    livres = np.argwhere(ambiente.grelha_obstaculos == 0)
+    posicoes = [tuple(map(int, p)) for p in livres[rng.choice(len(livres), size=500, replace=False)]]
+    politicas = [PoliticaPlaneador(["norte", "sul", "este", "oeste", "nordeste", "sudeste", "sudoeste", "noroeste"])
+                 for _ in posicoes]
+    for politica in politicas:
+        politica.ambiente = ambiente
+
+    inicio = time.perf_counter()
+    for passo in range(100):
+        if passo % 10 == 0:
+            # Mudança do mapa (como num atualizacao() dinâmico): 5 células trocam de estado
+            for x, y in rng.integers(0, L, size=(5, 2)):
+                ambiente.definir_obstaculo(int(x), int(y), not ambiente.grelha_obstaculos[x, y])
+        for politica, pos in zip(politicas, posicoes):
+            politica.selecionar_accao(Observacao(posicao=pos, direcao=(0, 0)))
+    duracao = time.perf_counter() - inicio
+    arvore = Planeador.rotas(ambiente, ambiente.pos_saida)
+    print(f"{L}x{A}, {len(politicas)} agentes x 100 passos: {duracao * 1000:.1f} ms "
+          f"({duracao / (100 * len(politicas)) * 1e6:.2f} us/decisão) | versão do mapa {ambiente.versao_mapa}, "
+          f"BFS completas: {arvore.bfs}")
@@ -1,10 +1,26 @@
 from abc import ABC, abstractmethod
-import random
+import heapq
+import os
+import itertools
 from typing import Dict, List, Any
 from Modelos import Observacao, Accao
+import Registo
+from Checkpoint import escrever_atomico
+import FicheiroQ
+import Planeador
+from Estado import N_ESTADOS, migrar_estado, descodificar, e_codificado
+import numpy as np
+from TabelaQ import criar_tabela, TabelaQLote, TabelaQDicionario, TabelaQDensa
+from Replay import BufferReplay
+from Aleatorio import FluxoAleatorio
+from Exploracao import criar_exploracao
+from Accoes import (NORTE, SUL, ESTE, OESTE, NORDESTE, SUDESTE, SUDOESTE, NOROESTE,
+                    N_ACCOES, id_accao, ids_accoes)
 
 class Politica(ABC):
     """Interface para estratégias de tomada de decisão."""
+    # Se a política aprende com as recompensas (e portanto precisa de atualizações e de ser gravada)
+    treinavel = False
 
     @abstractmethod
     def selecionar_accao(self, observacao: Observacao) -> Accao:
@@ -16,45 +32,121 @@ class Politica(ABC):
         """Atualiza a política com base na recompensa recebida."""
         pass
 
+    def semear(self, semente: int):
+        """Reinicia o gerador aleatório da política (ver Aleatorio.semente_agente)."""
+        self.rng = FluxoAleatorio(semente)
+
+    def terminar_episodio(self, terminal: bool):
+        """Fecha o episódio atual. terminal=True se o objetivo foi atingido."""
+        pass
+
 class PoliticaAleatoria(Politica):
     """Escolhe uma ação aleatória das opções disponíveis."""
-    def __init__(self, accoes_possiveis):
-        self.accoes = accoes_possiveis
+    def __init__(self, accoes_possiveis, semente: int = None):
+        self.accoes = ids_accoes(accoes_possiveis)
+        self.rng = FluxoAleatorio(semente)
 
     def selecionar_accao(self, observacao: Observacao) -> Accao:
-        escolha = random.choice(self.accoes)
-        return Accao("mover", {"direcao": escolha})
+        escolha = self.rng.choice(self.accoes)
+        return Accao.mover(escolha)
 
     def atualizar(self, recompensa: float):
         pass # Não aprende nada
 
 class PoliticaQLearning(Politica):
-    """Implementa Q-Learning."""
-    def __init__(self, accoes_possiveis: List[str], alpha=0.1, gamma=0.9, epsilon=0.3):
-        self.q_table = {} # {(x, y): {accao: valor}}
-        self.accoes = accoes_possiveis
+    """
+    Implementa Q-Learning.
+    A Q-Table pode ser um dicionário (por defeito) ou um array NumPy denso (tabela="densa").
+    """
+    treinavel = True
+
+    def __init__(self, accoes_possiveis: List[str], alpha=0.1, gamma=0.9, epsilon=0.3, tabela: str = "dicionario",
+                 replay: Dict[str, Any] = None, semente: int = None, exploracao: Dict[str, Any] = None):
+        # As ações podem vir como nomes ("norte") ou vetores ((0, -1)); internamente são ids inteiros
+        self.accoes = ids_accoes(accoes_possiveis)
+        if replay and tabela != "densa":
+            tabela = "densa" # O replay atualiza lotes de índices: precisa da tabela densa
+        self.tabela = criar_tabela(tabela, self.accoes) # {estado: {accao: valor}}
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
+        # Gerador próprio (exploração, desempates, replay): reprodutível com a semente do agente
+        self.rng = FluxoAleatorio(semente)
+        # Agenda de exploração (Exploracao.py), avançada pelo Motor; sem agenda o epsilon fica fixo
+        self.exploracao = None
+        self.definir_exploracao(exploracao)
         
         # Estado temporário para o ciclo de update
         self.ultimo_estado = None
         self.ultima_accao = None
         self.ultima_recompensa = 0.0
+
+        # Experience replay (opcional), ex: "replay": {"capacidade": 10000, "lote": 32, "intervalo": 4,
+        # "aquecimento": 200, "prioritario": false}
+        self.replay = None
+        if replay:
+            self.configurar_replay(**replay)
+
+    def configurar_replay(self, capacidade: int = 10000, lote: int = 32, intervalo: int = 4,
+                          aquecimento: int = None, prioritario: bool = False, alfa: float = 0.6,
+                          beta: float = 0.4, semente: int = None):
+        """
+        Guarda cada transição num BufferReplay e, a cada 'intervalo' transições, reaprende um lote de
+        'lote' transições amostradas (depois de o buffer ter pelo menos 'aquecimento' transições).
+        """
+        # Sem semente própria, o buffer sorteia com o gerador da política
+        rng = self.rng.gerador if semente is None else None
+        self.replay = BufferReplay(capacidade, prioritario=prioritario, alfa=alfa, beta=beta, semente=semente, rng=rng)
+        self.replay_lote = lote
+        self.replay_intervalo = intervalo
+        self.replay_aquecimento = lote if aquecimento is None else aquecimento
+        self._transicoes = 0
+
+    def semear(self, semente: int):
+        super().semear(semente)
+        if self.replay is not None:
+            self.replay.rng = self.rng.gerador
+
+    def definir_exploracao(self, exploracao):
+        """Agenda de exploração: bloco do JSON, objeto Exploracao ou None (epsilon fixo). O epsilon passa ao inicial."""
+        if isinstance(exploracao, dict):
+            exploracao = criar_exploracao(exploracao)
+        self.exploracao = exploracao
+        if exploracao is not None:
+            self.epsilon = exploracao.epsilon
+
+    def avancar_exploracao(self, unidade: str, sucesso: bool = None):
+        """Chamado pelo Motor no fim de cada passo ou episódio: só avança a agenda com essa unidade."""
+        exploracao = self.exploracao
+        if exploracao is not None and exploracao.unidade == unidade:
+            self.epsilon = exploracao.avancar(sucesso)
+
+    # Compatibilidade: q_table continua a ler/escrever o formato dicionário
+    # (na tabela densa a leitura devolve uma cópia e a escrita converte os valores)
+    @property
+    def q_table(self) -> Dict:
+        return self.tabela.como_dicionario()
+
+    @q_table.setter
+    def q_table(self, dados: Dict):
+        self.tabela.carregar_dicionario(dados)
     
-    def get_estado_key(self, observacao: Observacao):
-        # 1. Tentar obter os dados
-        dados = observacao.dados if hasattr(observacao, 'dados') else observacao
-        if not isinstance(dados, dict):
+    @staticmethod
+    def get_estado_key(observacao: Observacao):
+        # 1. Tentar obter os dados (Observacao ou dicionário simples)
+        if not isinstance(observacao, (Observacao, dict)):
             return None
 
         # --- ALTERAÇÃO AQUI ---
         # Prioridade 1: Se o agente já processou os sensores e mandou um estado pronto
-        if "estado_customizado" in dados:
-            return dados["estado_customizado"] # Retorna o tuplo (Direcao, Obstaculos)
+        estado = observacao.get("estado_customizado")
+        if estado is not None:
+            if type(estado) is int:
+                return estado # Estado já codificado (Estado.codificar: id_direcao * 256 + mascara)
+            return migrar_estado(estado) # Tuplo (Direcao, Obstaculos) antigo -> inteiro
 
         # Prioridade 2: Fallback para posição (x,y) se não houver sensores (o modo antigo)
-        pos = dados.get("posicao")
+        pos = observacao.get("posicao")
         if pos is not None:
             return tuple(pos)
             
@@ -64,12 +156,14 @@ class PoliticaQLearning(Politica):
     def selecionar_accao(self, observacao: Observacao) -> Accao:
         estado_atual = self.get_estado_key(observacao)
 
-        # --- DEBUG PRINT ---
-        conhecido = estado_atual in self.q_table
-        print(f"Estado: {estado_atual} | Conhecido? {conhecido}")
-        if conhecido:
-            valores = self.q_table[estado_atual]
-            print(f"   -> Valores: {valores}")
+        # --- DEBUG (só constrói as mensagens se o nível DEPURACAO estiver ativo) ---
+        if Registo.DEPURACAO_ATIVA:
+            conhecido = self.tabela.conhece(estado_atual)
+            legivel = descodificar(estado_atual) if e_codificado(estado_atual) else estado_atual
+            Registo.depuracao(f"Estado: {legivel} | Conhecido? {conhecido}", estado=estado_atual)
+            if conhecido:
+                valores = self.tabela.valores(estado_atual)
+                Registo.depuracao(f"   -> Valores: {valores}", estado=estado_atual, valores=valores)
         
         # 1. Se tivermos um passo anterior pendente, fazemos o update do Q-Value agora
         # Q(S, A) = Q(S, A) + alpha * (R + gamma * max(Q(S', a')) - Q(S, A))
@@ -77,73 +171,399 @@ class PoliticaQLearning(Politica):
             self._atualizar_q_table(self.ultimo_estado, self.ultima_accao, self.ultima_recompensa, estado_atual)
 
         # 2. Escolher ação (Epsilon-Greedy)
-        if random.random() < self.epsilon:
-            accao_nome = random.choice(self.accoes)
-        else:
-            accao_nome = self._melhor_accao(estado_atual)
+        accao_id = self.rng.explorar(self.epsilon, self.accoes)
+        if accao_id is None:
+            accao_id = self._melhor_accao(estado_atual)
 
         # 3. Guardar estado para o próximo update
         self.ultimo_estado = estado_atual
-        self.ultima_accao = accao_nome
+        self.ultima_accao = accao_id
         
-        return Accao("mover", {"direcao": accao_nome})
+        return Accao.mover(accao_id)
 
     def atualizar(self, recompensa: float):
         # Apenas guardamos a recompensa. O update matemático acontece 
         # quando soubermos o "próximo estado" (na próxima chamada de selecionar_accao)
         self.ultima_recompensa = recompensa
 
+    def terminar_episodio(self, terminal: bool):
+        # Se o episódio acabou no objetivo, a última transição não tem próximo estado:
+        # Q(S, A) = Q(S, A) + alpha * (R - Q(S, A))
+        if terminal and self.ultimo_estado is not None and self.ultima_accao is not None:
+            self._atualizar_q_terminal(self.ultimo_estado, self.ultima_accao, self.ultima_recompensa)
+
+        self.ultimo_estado = None
+        self.ultima_accao = None
+        self.ultima_recompensa = 0.0
+
     def _melhor_accao(self, estado):
-        if estado not in self.q_table:
-            return random.choice(self.accoes)
-        
-        # Encontrar ação com maior valor Q
-        q_valores = self.q_table[estado]
-        # Se estado existe mas vazio (não deve acontecer se inicializarmos), random
-        if not q_valores:
-            return random.choice(self.accoes)
-            
-        # Retorna a ação com max valor. Em caso de empate, max escolhe uma (a primeira).
-        return max(q_valores, key=q_valores.get)
+        # Retorna a ação com max valor. Em caso de empate escolhe a primeira.
+        melhor = self.tabela.melhor_accao(estado)
+        if melhor is None:
+            # Estado desconhecido: random
+            return self.rng.choice(self.accoes)
+        return melhor
 
     def _atualizar_q_table(self, s, a, r, s_next):
-        if s not in self.q_table:
-            self.q_table[s] = {ac: 0.0 for ac in self.accoes}
-        
-        if s_next not in self.q_table:
-            self.q_table[s_next] = {ac: 0.0 for ac in self.accoes}
-            
-        old_q = self.q_table[s][a]
-        next_max = max(self.q_table[s_next].values())
-        
-        new_q = old_q + self.alpha * (r + self.gamma * next_max - old_q)
-        self.q_table[s][a] = new_q
+        self.tabela.atualizar(s, a, r, s_next, self.alpha, self.gamma)
+        if self.replay is not None:
+            self._guardar_transicao(s, a, r, s_next, False)
+
+    def _atualizar_q_terminal(self, s, a, r):
+        self.tabela.atualizar_terminal(s, a, r, self.alpha)
+        if self.replay is not None:
+            self._guardar_transicao(s, a, r, s, True)
+
+    # --- Experience replay ---
+    def _guardar_transicao(self, s, a, r, s_next, terminal: bool):
+        tabela = self.tabela
+        self.replay.adicionar(tabela.indice_estado(s), tabela.indice_accao(a), r, tabela.indice_estado(s_next), terminal)
+        self._transicoes += 1
+        if self._transicoes % self.replay_intervalo == 0 and len(self.replay) >= self.replay_aquecimento:
+            self.aprender_replay()
+
+    def aprender_replay(self):
+        """Uma atualização TD vetorizada sobre um lote amostrado do buffer."""
+        buffer = self.replay
+        indices, pesos = buffer.amostrar(self.replay_lote)
+        # Na amostragem prioritária os pesos de importância escalam o passo de cada transição
+        alpha = self.alpha if pesos is None else self.alpha * pesos
+        erros_td = self.tabela.atualizar_lote(buffer.s[indices], buffer.a[indices], buffer.r[indices],
+                                              buffer.s_next[indices], alpha, self.gamma,
+                                              terminal=buffer.terminal[indices])
+        if buffer.prioritario:
+            buffer.atualizar_prioridades(indices, erros_td)
 
     def salvar(self, caminho: str):
-        import pickle
-        with open(caminho, 'wb') as f:
-            pickle.dump(self.q_table, f)
-        print(f"Política salva em {caminho}")
+        # .qtab -> formato binário (FicheiroQ); outro nome -> formato dicionário, compatível com os .pkl existentes.
+        # Escrita atómica: um crash a meio nunca deixa o ficheiro corrompido
+        escrever_atomico(caminho, self.serializar(self.tabela, caminho))
+        Registo.info(f"Política salva em {caminho}")
+
+    def instantaneo(self):
+        """Cópia da Q-Table para o GestorCheckpoints (barata; a serialização fica na thread de fundo)."""
+        return self.tabela.copia()
+
+    def hiperparametros(self) -> Dict[str, Any]:
+        return {"alpha": self.alpha, "gamma": self.gamma, "epsilon": self.epsilon}
 
-    def carregar(self, caminho: str):
+    def serializar(self, tabela, caminho: str = "") -> bytes:
+        if caminho.endswith(FicheiroQ.EXTENSAO):
+            return FicheiroQ.serializar(tabela, self.hiperparametros())
         import pickle
+        return pickle.dumps(tabela.como_dicionario())
+
+    def carregar(self, caminho: str, modo: str = "c"):
+        """
+        Lê a Q-Table de um .qtab (detetado pela magia) ou de um .pkl.
+        modo "r": só leitura, o .qtab fica mapeado em memória (np.memmap) sem cópias (inferência).
+        Outro modo ("c", treino): os arrays são copiados para memória. Um ficheiro mapeado fica aberto
+        enquanto a tabela existir, e no Windows o os.replace dos checkpoints não o consegue substituir.
+        """
+        antigo = caminho[:-len(FicheiroQ.EXTENSAO)] + ".pkl" if caminho.endswith(FicheiroQ.EXTENSAO) else None
+        if antigo and not os.path.exists(caminho) and os.path.exists(antigo):
+            # Passagem para "memoria": "binaria": a memória continua no .pkl até o primeiro checkpoint gravar o .qtab
+            Registo.aviso(f"{caminho} ainda não existe: a carregar a memória de {antigo}")
+            caminho = antigo
         try:
-            with open(caminho, 'rb') as f:
-                self.q_table = pickle.load(f)
-            print(f"Política carregada de {caminho}")
+            if FicheiroQ.e_binario(caminho):
+                tabela = FicheiroQ.carregar_densa(caminho, self.accoes, modo)
+                if modo != "r":
+                    tabela.q = np.array(tabela.q)
+                    tabela.visitado = np.array(tabela.visitado)
+                # Só leitura: a tabela mapeada é adotada mesmo que a política use dicionários (passá-la para
+                # dicionário copiava-a toda). Uma tabela partilhada entre agentes é sempre preenchida no sítio.
+                if type(self.tabela) is type(tabela) or (modo == "r" and type(self.tabela) is TabelaQDicionario):
+                    self.tabela = tabela
+                else:
+                    self.tabela.carregar_dicionario(tabela.como_dicionario())
+            else:
+                import pickle
+                with open(caminho, 'rb') as f:
+                    dados = pickle.load(f)
+                self.tabela.carregar_dicionario(self._migrar_formato_antigo(dados))
+            Registo.info(f"Política carregada de {caminho}")
         except FileNotFoundError:
-            print(f"Ficheiro {caminho} não encontrado. Começando com Q-Table vazia.")
+            Registo.aviso(f"Ficheiro {caminho} não encontrado. Começando com Q-Table vazia.")
+
+    @staticmethod
+    def _migrar_formato_antigo(dados: Dict) -> Dict:
+        """
+        Converte Q-Tables antigas para o formato atual:
+        - estados (direcao, tuplo de 8 zeros/uns) ou (direcao, mascara) -> inteiro de Estado.codificar;
+        - ações em texto ("norte") ou vetor ((0, -1)) -> ids inteiros.
+        """
+        migrados = {}
+        for estado, q_valores in dados.items():
+            migrados[migrar_estado(estado)] = {id_accao(a): v for a, v in q_valores.items()}
+        return migrados
+
+    def compilar(self, epsilon: float = 0.0) -> 'PoliticaCongelada':
+        """
+        Congela a Q-Table para inferência: cada estado passa a apontar diretamente para a sua melhor ação
+        (mesmo desempate que _melhor_accao). A política devolvida não aprende nem grava nada.
+        """
+        if isinstance(self.tabela, TabelaQDensa):
+            # Lido diretamente dos arrays (mapeados ou não), sem passar a tabela para dicionário
+            melhores, outros = self.tabela.melhores_accoes()
+            return PoliticaCongelada(self.accoes, melhores, outros, epsilon=epsilon, rng=self.rng)
+        melhores = np.full(N_ESTADOS, -1, dtype=np.int64)
+        outros = {}
+        for estado, q_valores in self.tabela.como_dicionario().items():
+            if not q_valores:
+                continue
+            accao = max(q_valores, key=q_valores.get)
+            if e_codificado(estado):
+                melhores[estado] = accao
+            else:
+                outros[estado] = accao
+        return PoliticaCongelada(self.accoes, melhores, outros, epsilon=epsilon, rng=self.rng)
+
+class PoliticaQLambda(PoliticaQLearning):
+    """
+    Q(lambda) de Watkins: cada recompensa atualiza de uma vez todos os pares (estado, ação) recentes,
+    pesados pelo seu traço de elegibilidade. Os traços são esparsos ({(estado, ação): traço}) e são
+    descartados abaixo de 'limiar_traco', pelo que cada passo só toca nos ~log(limiar)/log(gamma*lambda) pares ativos.
+    Depois de uma ação exploratória os traços são apagados (o retorno já não segue a política gulosa).
+    """
+    def __init__(self, accoes_possiveis: List[str], alpha=0.1, gamma=0.9, epsilon=0.3, lambda_=0.8,
+                 tabela: str = "dicionario", substituir_tracos: bool = True, limiar_traco: float = 0.01,
+                 semente: int = None, exploracao: Dict[str, Any] = None):
+        super().__init__(accoes_possiveis, alpha=alpha, gamma=gamma, epsilon=epsilon, tabela=tabela, semente=semente,
+                         exploracao=exploracao)
+        self.lambda_ = lambda_
+        self.substituir_tracos = substituir_tracos # True: traço = 1 ao visitar; False: traço += 1 (acumulação)
+        self.limiar_traco = limiar_traco
+        self.tracos = {}
+
+    def selecionar_accao(self, observacao: Observacao) -> Accao:
+        estado_atual = self.get_estado_key(observacao)
+
+        # Escolher primeiro: o alvo da atualização depende da ação seguinte (SARSA) ou de ela ser gulosa (Q)
+        melhor = self._melhor_accao(estado_atual)
+        accao_id = self.rng.explorar(self.epsilon, self.accoes)
+        if accao_id is None:
+            accao_id = melhor
+
+        if self.ultimo_estado is not None and self.ultima_accao is not None:
+            self._atualizar_tracos(self.ultimo_estado, self.ultima_accao, self.ultima_recompensa,
+                                   estado_atual, accao_id, melhor)
+
+        self.ultimo_estado = estado_atual
+        self.ultima_accao = accao_id
+        return Accao.mover(accao_id)
+
+    def _alvo(self, s_next, a_next, melhor) -> float:
+        return self.tabela.valor_maximo(s_next)
+
+    def _continua_traco(self, a_next, melhor) -> bool:
+        return a_next == melhor
+
+    def _atualizar_tracos(self, s, a, r, s_next, a_next, melhor):
+        erro_td = r + self.gamma * self._alvo(s_next, a_next, melhor) - self.tabela.valor(s, a)
+        decaimento = self.gamma * self.lambda_ if self._continua_traco(a_next, melhor) else 0.0
+        self._propagar(s, a, erro_td, decaimento)
+
+    def _propagar(self, s, a, erro_td: float, decaimento: float):
+        tracos = self.tracos
+        chave = (s, a)
+        tracos[chave] = 1.0 if self.substituir_tracos else tracos.get(chave, 0.0) + 1.0
+
+        passo = self.alpha * erro_td
+        somar = self.tabela.somar
+        limiar = self.limiar_traco
+        ativos = {}
+        for (estado, accao), traco in tracos.items():
+            somar(estado, accao, passo * traco)
+            traco *= decaimento
+            if traco >= limiar:
+                ativos[(estado, accao)] = traco
+        self.tracos = ativos
+
+    def terminar_episodio(self, terminal: bool):
+        # Objetivo atingido: a última transição não tem estado seguinte (alvo = R)
+        if terminal and self.ultimo_estado is not None and self.ultima_accao is not None:
+            s, a = self.ultimo_estado, self.ultima_accao
+            self._propagar(s, a, self.ultima_recompensa - self.tabela.valor(s, a), 0.0)
+        self.tracos = {}
+        self.ultimo_estado = None
+        self.ultima_accao = None
+        self.ultima_recompensa = 0.0
+
+class PoliticaSarsaLambda(PoliticaQLambda):
+    """
+    SARSA(lambda): como PoliticaQLambda, mas o alvo usa a ação realmente escolhida em S' (on-policy)
+    e os traços nunca são apagados por exploração.
+    """
+    def _alvo(self, s_next, a_next, melhor) -> float:
+        return self.tabela.valor(s_next, a_next)
+
+    def _continua_traco(self, a_next, melhor) -> bool:
+        return True
+
+class PoliticaDynaQ(PoliticaQLearning):
+    """
+    Dyna-Q: além do update normal, guarda num modelo o último resultado de cada par (estado, ação)
+    e, depois de cada passo real, faz 'planeamento' atualizações simuladas a partir desse modelo.
+    Com varrimento_prioritario=True os pares simulados saem de um heap ordenado pelo |erro TD|
+    (prioritized sweeping): primeiro o par acabado de visitar, depois os predecessores dos estados que mudaram.
+    A Q-Table e a gravação são as do PoliticaQLearning; o modelo vive só em memória.
+    """
+    def __init__(self, accoes_possiveis: List[str], alpha=0.1, gamma=0.9, epsilon=0.3, tabela: str = "dicionario",
+                 planeamento: int = 10, varrimento_prioritario: bool = False, limiar_prioridade: float = 0.01,
+                 replay: Dict[str, Any] = None, semente: int = None, exploracao: Dict[str, Any] = None):
+        super().__init__(accoes_possiveis, alpha=alpha, gamma=gamma, epsilon=epsilon, tabela=tabela, replay=replay,
+                         semente=semente, exploracao=exploracao)
+        self.planeamento = planeamento
+        self.varrimento_prioritario = varrimento_prioritario
+        self.limiar_prioridade = limiar_prioridade
+
+        self.modelo = {} # (estado, ação) -> (recompensa, estado seguinte, terminal)
+        self._pares = [] # As chaves do modelo, para sortear uma em O(1)
+        self._predecessores = {} # estado -> {(estado anterior, ação)} que lá foram dar
+        self._fila = [] # heap de (-prioridade, ordem, (estado, ação))
+        self._na_fila = {} # (estado, ação) -> maior prioridade com que está no heap (evita duplicados)
+        self._ordem = itertools.count() # Desempate no heap (os estados podem não ser comparáveis)
+
+    def _atualizar_q_table(self, s, a, r, s_next):
+        erro_td = r + self.gamma * self.tabela.valor_maximo(s_next) - self.tabela.valor(s, a)
+        super()._atualizar_q_table(s, a, r, s_next)
+        self._aprender_modelo(s, a, r, s_next, False, erro_td)
+
+    def _atualizar_q_terminal(self, s, a, r):
+        erro_td = r - self.tabela.valor(s, a)
+        super()._atualizar_q_terminal(s, a, r)
+        self._aprender_modelo(s, a, r, None, True, erro_td)
+
+    # --- Modelo e planeamento ---
+    def _aprender_modelo(self, s, a, r, s_next, terminal: bool, erro_td: float):
+        par = (s, a)
+        if par not in self.modelo:
+            self._pares.append(par)
+        self.modelo[par] = (r, s_next, terminal)
+        if not terminal:
+            self._predecessores.setdefault(s_next, set()).add(par)
+
+        if self.varrimento_prioritario:
+            self._enfileirar(par, abs(erro_td))
+            self._varrer()
+        else:
+            self._planear()
+
+    def _backup(self, par):
+        r, s_next, terminal = self.modelo[par]
+        if terminal:
+            self.tabela.atualizar_terminal(par[0], par[1], r, self.alpha)
+        else:
+            self.tabela.atualizar(par[0], par[1], r, s_next, self.alpha, self.gamma)
+
+    def _planear(self):
+        """Dyna-Q clássico: 'planeamento' pares já vistos, sorteados uniformemente."""
+        pares = self._pares
+        aleatorio = self.rng.random
+        for _ in range(self.planeamento):
+            self._backup(pares[int(aleatorio() * len(pares))])
+
+    def _enfileirar(self, par, prioridade: float):
+        if prioridade > self.limiar_prioridade and prioridade > self._na_fila.get(par, 0.0):
+            self._na_fila[par] = prioridade
+            heapq.heappush(self._fila, (-prioridade, next(self._ordem), par))
+
+    def _varrer(self):
+        """Prioritized sweeping: até 'planeamento' backups pela ordem do heap de |erro TD|."""
+        fila = self._fila
+        na_fila = self._na_fila
+        tabela = self.tabela
+        feitos = 0
+        while fila and feitos < self.planeamento:
+            menos_prioridade, _, par = heapq.heappop(fila)
+            if na_fila.get(par) != -menos_prioridade:
+                continue # Entrada antiga: o par voltou a entrar com prioridade maior
+            del na_fila[par]
+            self._backup(par)
+            feitos += 1
+            # Os pares que levam a este estado podem ter mudado de valor
+            maximo = tabela.valor_maximo(par[0])
+            for anterior in self._predecessores.get(par[0], ()):
+                r = self.modelo[anterior][0]
+                self._enfileirar(anterior, abs(r + self.gamma * maximo - tabela.valor(anterior[0], anterior[1])))
+
+class PoliticaCongelada(Politica):
+    """
+    Política de inferência compilada a partir de uma PoliticaQLearning (ver compilar()):
+    uma tabela plana estado -> ação. Não faz atualizações TD nem gravações, e só usa o
+    gerador aleatório com epsilon > 0 ou em estados que não estão na tabela.
+    """
+    def __init__(self, accoes_possiveis, melhores, outros: Dict = None, epsilon: float = 0.0,
+                 rng: FluxoAleatorio = None):
+        self.accoes = ids_accoes(accoes_possiveis)
+        # Lista Python: indexar com um int é mais rápido do que num array NumPy
+        self.melhores = [int(a) for a in np.asarray(melhores).tolist()]
+        self.outros = dict(outros or {}) # Estados não codificados (ex: posições (x, y))
+        self.epsilon = epsilon
+        # Estado nunca visto no treino: uma ação ao acaso do gerador (semeado) da política. Uma ação fixa
+        # deixaria um agente sem treino a andar contra a mesma parede para sempre
+        self.rng = rng if rng is not None else FluxoAleatorio() # compilar() passa o gerador da política original
+
+    def selecionar_accao(self, observacao: Observacao) -> Accao:
+        estado = observacao.get("estado_customizado") if observacao is not None else None
+        if type(estado) is int and 0 <= estado < N_ESTADOS:
+            accao_id = self.melhores[estado]
+        else:
+            accao_id = self.outros.get(PoliticaQLearning.get_estado_key(observacao), -1)
+
+        if self.epsilon and self.rng.random() < self.epsilon:
+            accao_id = self.rng.choice(self.accoes)
+        elif accao_id < 0:
+            accao_id = self.rng.choice(self.accoes)
+        return Accao.mover(accao_id)
+
+    def atualizar(self, recompensa: float):
+        pass # Congelada: não aprende
+
+class PoliticaQLearningLote:
+    """
+    Q-Learning para K réplicas em simultâneo (ex: AmbienteLabirintoVetorizado).
+    Não segue a interface Politica (que decide para uma observação de cada vez):
+    recebe um array de estados e devolve um array de ações.
+    alpha, gamma e epsilon podem ser escalares ou arrays de tamanho K,
+    o que permite comparar hiperparâmetros na mesma corrida.
+    """
+    def __init__(self, n_replicas: int, accoes_possiveis: List[str], alpha=0.1, gamma=0.9, epsilon=0.3, semente=None):
+        self.accoes = ids_accoes(accoes_possiveis)
+        self.tabela = TabelaQLote(n_replicas, self.accoes)
+        self.alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), (n_replicas,))
+        self.gamma = np.broadcast_to(np.asarray(gamma, dtype=np.float64), (n_replicas,))
+        self.epsilon = np.broadcast_to(np.asarray(epsilon, dtype=np.float64), (n_replicas,))
+        self.rng = FluxoAleatorio(semente)
+        self._accoes_array = np.array(self.accoes, dtype=np.int64)
+        # id da ação -> coluna da tabela
+        self._coluna_de_accao = np.full(N_ACCOES, -1, dtype=np.int64)
+        self._coluna_de_accao[self._accoes_array] = np.arange(len(self.accoes))
+
+    def selecionar_accoes(self, estados: np.ndarray) -> np.ndarray:
+        """Epsilon-greedy vetorizado (estados desconhecidos escolhem ao acaso, como no escalar)."""
+        n = len(estados)
+        colunas = self.tabela.melhores_accoes(estados)
+        sorteadas = self.rng.explorar_lote(self.epsilon, n, len(self.accoes))
+        desconhecidos = (sorteadas < 0) & ~self.tabela.conhecidos(estados)
+        sorteadas[desconhecidos] = self.rng.gerador.integers(0, len(self.accoes), int(desconhecidos.sum()))
+        colunas = np.where(sorteadas >= 0, sorteadas, colunas)
+        return self._accoes_array[colunas]
+
+    def atualizar(self, estados, accoes, recompensas, seguintes, terminais):
+        colunas = self._coluna_de_accao[accoes]
+        self.tabela.atualizar(estados, colunas, recompensas, seguintes, terminais, self.alpha, self.gamma)
 
 # vai deretamente ao farol
 class PoliticaGulosa(Politica):
     """Escolhe a ação que mais aproxima o agente do alvo (baseado em sensores)."""
     def __init__(self, accoes_possiveis):
-        self.accoes = accoes_possiveis
+        self.accoes = ids_accoes(accoes_possiveis)
 
     def selecionar_accao(self, observacao: Observacao) -> Accao:
         # A observação tem de vir do SensorDirecao
-        dados = observacao.dados if hasattr(observacao, 'dados') else observacao
-        vetor = dados.get("direcao", (0,0))
+        vetor = observacao.get("direcao", (0,0))
         dx, dy = vetor
 
         if dx == 0 and dy == 0:
@@ -162,17 +582,40 @@ class PoliticaGulosa(Politica):
         if dir_v and dir_h:
             # Combinar para diagonal
             mapa = {
-                ("norte", "este"): "nordeste", ("norte", "oeste"): "noroeste",
-                ("sul", "este"): "sudeste",   ("sul", "oeste"): "sudoeste"
+                ("norte", "este"): NORDESTE, ("norte", "oeste"): NOROESTE,
+                ("sul", "este"): SUDESTE,   ("sul", "oeste"): SUDOESTE
             }
             comb = mapa.get((dir_v, dir_h))
-            if comb: return Accao("mover", {"direcao": comb})
+            if comb is not None: return Accao.mover(comb)
 
         # Cardinal fallback
         if abs(dx) > abs(dy):
-            return Accao("mover", {"direcao": "este" if dx > 0 else "oeste"})
+            return Accao.mover(ESTE if dx > 0 else OESTE)
         else:
-            return Accao("mover", {"direcao": "sul" if dy > 0 else "norte"})
+            return Accao.mover(SUL if dy > 0 else NORTE)
 
     def atualizar(self, recompensa: float):
-        pass # Não aprende, segue regra fixa
\ No newline at end of file
+        pass # Não aprende, segue regra fixa
+
+
+class PoliticaPlaneador(PoliticaGulosa):
+    """
+    Segue a rota mais curta (8-conexa, a contornar paredes) até ao alvo do ambiente.
+    As rotas vêm da árvore de BFS inversa partilhada do Planeador: uma consulta por passo, sem pesquisa por agente.
+    Precisa da posição na observação (SensorDirecao) e do ambiente (definido pelo AgenteNormal);
+    sem rota (alvo inalcançável) comporta-se como a PoliticaGulosa.
+    """
+    def __init__(self, accoes_possiveis):
+        super().__init__(accoes_possiveis)
+        self.ambiente = None
+
+    def selecionar_accao(self, observacao: Observacao) -> Accao:
+        ambiente = self.ambiente
+        pos = observacao.get("posicao") if observacao is not None else None
+        if ambiente is None or pos is None:
+            return super().selecionar_accao(observacao)
+
+        accao = Planeador.rotas(ambiente, ambiente.farol_pos).accao(int(round(pos[0])), int(round(pos[1])))
+        if accao == Planeador.SEM_ACCAO:
+            return super().selecionar_accao(observacao)
+        return Accao.mover(accao)
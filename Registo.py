@@ -0,0 +1,139 @@
+import atexit
+import json
+import sys
+import threading
+import time
+
+# Registo (logging) do projeto, com níveis e custo praticamente nulo quando desligado.
+# Nos sítios quentes (por passo) verifica-se primeiro a flag do módulo, para nem sequer
+# construir a mensagem:
+#
+#     import Registo
+#     if Registo.DEPURACAO_ATIVA:
+#         Registo.depuracao(f"Estado: {estado}", estado=estado)
+#
+# Usar sempre "import Registo" (e não "from Registo import ..."), para ler o valor atual das flags.
+
+DEPURACAO, INFO, AVISO, ERRO, SILENCIO = 10, 20, 30, 40, 100
+_NOMES_NIVEIS = {DEPURACAO: "DEPURACAO", INFO: "INFO", AVISO: "AVISO", ERRO: "ERRO", SILENCIO: "SILENCIO"}
+_NIVEIS_POR_NOME = {nome: nivel for nivel, nome in _NOMES_NIVEIS.items()}
+
+# Flags lidas diretamente pelo código quente (atualizadas por configurar)
+DEPURACAO_ATIVA = False
+INFO_ATIVA = True
+AVISO_ATIVO = True
+
+_nivel = INFO
+
+
+class DestinoConsola:
+    """Escreve só a mensagem no stdout atual (compatível com contextlib.redirect_stdout)."""
+    def escrever(self, registo: dict):
+        print(registo["msg"], file=sys.stdout)
+
+    def despejar(self):
+        pass
+
+    def fechar(self):
+        pass
+
+
+class DestinoJSONL:
+    """
+    Acumula os registos em memória e escreve-os em blocos num ficheiro JSON Lines
+    (um objeto por linha), para não pagar uma escrita em disco por mensagem.
+    """
+    def __init__(self, caminho: str, tamanho_buffer: int = 1000):
+        self.caminho = caminho
+        self.tamanho_buffer = tamanho_buffer
+        self._ficheiro = open(caminho, "a", encoding="utf-8")
+        self._buffer = []
+        self._lock = threading.Lock() # Os agentes em modo threads registam em paralelo
+
+    def escrever(self, registo: dict):
+        with self._lock:
+            self._buffer.append(registo)
+            if len(self._buffer) >= self.tamanho_buffer:
+                self._despejar_sem_lock()
+
+    def despejar(self):
+        with self._lock:
+            self._despejar_sem_lock()
+
+    def _despejar_sem_lock(self):
+        if not self._buffer or self._ficheiro.closed:
+            return
+        self._ficheiro.write("".join(_para_json(r) + "\n" for r in self._buffer))
+        self._ficheiro.flush()
+        self._buffer.clear()
+
+    def fechar(self):
+        self.despejar()
+        self._ficheiro.close()
+
+
+def _para_json(registo: dict) -> str:
+    try:
+        return json.dumps(registo, ensure_ascii=False, default=repr)
+    except TypeError:
+        # Ex: dicionários com chaves que não são texto/números (tuplos de estado)
+        return json.dumps({k: v if isinstance(v, (str, int, float, bool, type(None))) else repr(v)
+                           for k, v in registo.items()}, ensure_ascii=False)
+
+
+_destino = DestinoConsola()
+
+
+def configurar(nivel=None, ficheiro: str = None, tamanho_buffer: int = 1000):
+    """
+    Define o nível mínimo (DEPURACAO, INFO, AVISO, ERRO, SILENCIO ou o nome em texto)
+    e, opcionalmente, um ficheiro .jsonl onde escrever em vez do stdout.
+    """
+    global _nivel, _destino, DEPURACAO_ATIVA, INFO_ATIVA, AVISO_ATIVO
+    if nivel is not None:
+        _nivel = _NIVEIS_POR_NOME[nivel.upper()] if isinstance(nivel, str) else int(nivel)
+    if ficheiro is not None:
+        _destino.fechar()
+        _destino = DestinoJSONL(ficheiro, tamanho_buffer)
+
+    DEPURACAO_ATIVA = _nivel <= DEPURACAO
+    INFO_ATIVA = _nivel <= INFO
+    AVISO_ATIVO = _nivel <= AVISO
+
+
+def nivel_atual() -> int:
+    return _nivel
+
+
+def registar(nivel: int, mensagem: str, **campos):
+    """Regista uma mensagem (com campos estruturados opcionais, guardados no JSONL)."""
+    if nivel < _nivel:
+        return
+    registo = {"t": time.time(), "nivel": _NOMES_NIVEIS.get(nivel, str(nivel)), "msg": mensagem}
+    if campos:
+        registo.update(campos)
+    _destino.escrever(registo)
+
+
+def depuracao(mensagem: str, **campos):
+    registar(DEPURACAO, mensagem, **campos)
+
+
+def info(mensagem: str, **campos):
+    registar(INFO, mensagem, **campos)
+
+
+def aviso(mensagem: str, **campos):
+    registar(AVISO, mensagem, **campos)
+
+
+def erro(mensagem: str, **campos):
+    registar(ERRO, mensagem, **campos)
+
+
+def despejar():
+    _destino.despejar()
+
+
+# Garante que o que ficou no buffer chega ao ficheiro quando o programa termina
+atexit.register(lambda: _destino.fechar())
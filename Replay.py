@@ -0,0 +1,63 @@
+from typing import Optional, Tuple
+import numpy as np
+
+# Memória de experiência (experience replay) para o Q-Learning tabular.
+# As transições ficam em arrays NumPy pré-alocados (buffer circular), já como índices da TabelaQDensa,
+# para que um lote de transições antigas possa ser reaprendido com uma única chamada a atualizar_lote.
+
+
+class BufferReplay:
+    """
+    Buffer circular de capacidade fixa: (estado, ação, recompensa, estado seguinte, terminal).
+    Amostragem uniforme ou prioritária (proporcional a |erro TD| ** alfa, com pesos de importância ** beta).
+    Os estados e as ações são índices de linha/coluna da tabela densa.
+    """
+    def __init__(self, capacidade: int = 10000, prioritario: bool = False, alfa: float = 0.6, beta: float = 0.4,
+                 semente: Optional[int] = None, rng: Optional[np.random.Generator] = None):
+        self.capacidade = capacidade
+        self.prioritario = prioritario
+        self.alfa = alfa
+        self.beta = beta
+        self.rng = rng if rng is not None else np.random.default_rng(semente)
+
+        self.s = np.zeros(capacidade, dtype=np.int64)
+        self.a = np.zeros(capacidade, dtype=np.int64)
+        self.r = np.zeros(capacidade, dtype=np.float64)
+        self.s_next = np.zeros(capacidade, dtype=np.int64)
+        self.terminal = np.zeros(capacidade, dtype=bool)
+        self.prioridades = np.zeros(capacidade, dtype=np.float64)
+
+        self._proximo = 0 # Posição onde entra a próxima transição
+        self._tamanho = 0
+        self._prioridade_maxima = 1.0 # Transições novas entram com a maior prioridade já vista
+
+    def __len__(self):
+        return self._tamanho
+
+    def adicionar(self, s: int, a: int, r: float, s_next: int, terminal: bool):
+        i = self._proximo
+        self.s[i] = s
+        self.a[i] = a
+        self.r[i] = r
+        self.s_next[i] = s_next
+        self.terminal[i] = terminal
+        self.prioridades[i] = self._prioridade_maxima
+        self._proximo = (i + 1) % self.capacidade
+        if self._tamanho < self.capacidade:
+            self._tamanho += 1
+
+    def amostrar(self, n: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Devolve (índices no buffer, pesos de importância ou None na amostragem uniforme)."""
+        if not self.prioritario:
+            return self.rng.integers(0, self._tamanho, size=n), None
+        p = self.prioridades[:self._tamanho] ** self.alfa
+        p /= p.sum()
+        indices = self.rng.choice(self._tamanho, size=n, p=p)
+        # Corrige o enviesamento da amostragem; normalizado pelo maior peso para só reduzir passos
+        pesos = (self._tamanho * p[indices]) ** -self.beta
+        return indices, pesos / pesos.max()
+
+    def atualizar_prioridades(self, indices: np.ndarray, erros_td: np.ndarray):
+        prioridades = np.abs(erros_td) + 1e-6
+        self.prioridades[indices] = prioridades
+        self._prioridade_maxima = max(self._prioridade_maxima, float(prioridades.max()))
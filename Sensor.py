@@ -1,6 +1,28 @@
 from abc import ABC, abstractmethod
 import math
-from Modelos import Observacao
+import numpy as np
+from Modelos import Observacao, ObservacaoDirecao, ObservacaoProximidade
+
+# Ordem das 8 células vizinhas usada na máscara de obstáculos: o bit i corresponde a VIZINHANCA[i]
+# (norte, sul, este, oeste, nordeste, sudeste, sudoeste, noroeste)
+VIZINHANCA = ((0, -1), (0, 1), (1, 0), (-1, 0), (1, -1), (1, 1), (-1, 1), (-1, -1))
+
+def tuplo_para_mascara(tuplo) -> int:
+    """Converte o antigo tuplo de 8 valores 0/1 (ordem VIZINHANCA) na máscara inteira."""
+    mascara = 0
+    for bit, valor in enumerate(tuplo):
+        if valor:
+            mascara |= 1 << bit
+    return mascara
+
+def mascara_para_tuplo(mascara: int) -> tuple:
+    """Inverso de tuplo_para_mascara (útil para debug e para ler Q-Tables antigas)."""
+    return tuple((mascara >> bit) & 1 for bit in range(len(VIZINHANCA)))
+
+def _posicoes_lote(ambiente, agentes) -> np.ndarray:
+    """Posições dos agentes como array (N, 2) de floats."""
+    posicoes = ambiente.agentes_posicoes
+    return np.array([posicoes[a] for a in agentes], dtype=np.float64).reshape(-1, 2)
 
 class Sensor(ABC):
     """Interface base para todos os sensores."""
@@ -12,18 +34,43 @@ class Sensor(ABC):
         """
         pass
 
-class SensorVisao(Sensor):
+class _SensorLote(Sensor):
+    """
+    Sensores com versão em lote: detetar_lote(ambiente, agentes) devolve arrays NumPy com as leituras da
+    população toda, para quem as consome diretamente (ex: construir estados de muitos agentes de uma vez).
+    O detetar por agente continua escalar: converter o lote em observações por agente saía mais caro
+    (~5.3 µs contra ~3.6 µs por agente e passo, medido num labirinto 60x60 de 256 a 4096 agentes).
+    """
+
+    @abstractmethod
+    def detetar_lote(self, ambiente, agentes) -> dict:
+        pass
+
+class SensorVisao(_SensorLote):
     def __init__(self, raio_visao: float = 1.5): # 1.5 cobre as diagonais (raiz de 2 = 1.41)
         self.raio_visao = raio_visao
 
+    def detetar_lote(self, ambiente, agentes) -> dict:
+        """farol_visto (N,), direcao_visual (N, 2), distancia (N,) e posicao (N, 2) de todos os agentes."""
+        pos = _posicoes_lote(ambiente, agentes)
+        dx = ambiente.farol_pos[0] - pos[:, 0]
+        dy = ambiente.farol_pos[1] - pos[:, 1]
+        distancia = np.sqrt(dx**2 + dy**2)
+        visto = (distancia > 0) & (distancia <= self.raio_visao)
+        com_dist = distancia > 0
+        direcao = np.zeros_like(pos)
+        np.divide(dx, distancia, out=direcao[:, 0], where=com_dist)
+        np.divide(dy, distancia, out=direcao[:, 1], where=com_dist)
+        return {"farol_visto": visto, "direcao_visual": direcao, "distancia": distancia, "posicao": pos}
+
     def detetar(self, ambiente, agente) -> Observacao:
         # 1. Obter posições
         if not hasattr(ambiente, 'farol_pos') or agente not in ambiente.agentes_posicoes:
             # Tentar ainda devolver a posição se for possível
             pos_agente = ambiente.agentes_posicoes.get(agente) if hasattr(ambiente, 'agentes_posicoes') else None
             if pos_agente is not None:
-                return Observacao({"farol_visto": False, "posicao": pos_agente})
-            return Observacao({"farol_visto": False})
+                return Observacao(farol_visto=False, posicao=pos_agente)
+            return Observacao(farol_visto=False)
 
         pos_agente = ambiente.agentes_posicoes[agente]
         pos_farol = ambiente.farol_pos
@@ -38,17 +85,29 @@ class SensorVisao(Sensor):
         if 0 < distancia <= self.raio_visao:
             # Normalizar o vetor para saber a direção exata
             direcao = (dx / distancia, dy / distancia)
-            return Observacao({
-                "farol_visto": True,
-                "direcao_visual": direcao,
-                "distancia": distancia,
-                "posicao": pos_agente
-            })
+            return Observacao(
+                farol_visto=True,
+                direcao_visual=direcao,
+                distancia=distancia,
+                posicao=pos_agente
+            )
         
-        return Observacao({"farol_visto": False, "posicao": pos_agente})
+        return Observacao(farol_visto=False, posicao=pos_agente)
 
-class SensorDirecao(Sensor):
+class SensorDirecao(_SensorLote):
     """Sensor que deteta a direção para um alvo (ex: Farol)."""
+    def detetar_lote(self, ambiente, agentes) -> dict:
+        """direcao (N, 2) unitária (0 no alvo), distancia (N,) e posicao (N, 2) de todos os agentes."""
+        pos = _posicoes_lote(ambiente, agentes)
+        dx = ambiente.farol_pos[0] - pos[:, 0]
+        dy = ambiente.farol_pos[1] - pos[:, 1]
+        distancia = np.sqrt(dx**2 + dy**2)
+        com_dist = distancia > 0
+        direcao = np.zeros_like(pos)
+        np.divide(dx, distancia, out=direcao[:, 0], where=com_dist)
+        np.divide(dy, distancia, out=direcao[:, 1], where=com_dist)
+        return {"direcao": direcao, "distancia": distancia, "posicao": pos}
+
     def detetar(self, ambiente, agente) -> Observacao:
         # Tenta obter a posição do alvo e do agente
         # Esta lógica assume que o ambiente tem 'farol_pos' e 'agentes_posicoes'
@@ -63,59 +122,67 @@ class SensorDirecao(Sensor):
                     direcao = (dx / dist, dy / dist)
                 else:
                     direcao = (0, 0)
-                return Observacao({"direcao": direcao, "distancia": dist, "posicao": pos_agente})
+                return ObservacaoDirecao(direcao, dist, pos_agente)
         
         # Se não conhecemos a posição do agente, devolvemos um dicionário com erro.
         pos_agente = None
         if hasattr(ambiente, 'agentes_posicoes'):
             pos_agente = ambiente.agentes_posicoes.get(agente)
-        obs = {"direcao": (0, 0), "erro": "alvo_nao_encontrado"}
+        obs = Observacao(direcao=(0, 0), erro="alvo_nao_encontrado")
         if pos_agente is not None:
-            obs["posicao"] = pos_agente
-        return Observacao(obs)
+            obs.atualizar({"posicao": pos_agente})
+        return obs
 
-class SensorProximidade(Sensor):
+class SensorProximidade(_SensorLote):
     def __init__(self, raio_visao: int = 1):
         # O raio 1 significa verificar as 8 células vizinhas
         self.raio_visao = raio_visao
         
-        # As 8 direções de movimento (dx, dy)
-        self.direcoes_vizinhanca = [
-            (0, 1), (0, -1), (1, 0), (-1, 0), # Cardinais
-            (1, 1), (1, -1), (-1, 1), (-1, -1) # Diagonais
-        ]
+        # As 8 direções de movimento (dx, dy), pela ordem dos bits da máscara
+        self.direcoes_vizinhanca = VIZINHANCA
+
+    def detetar_lote(self, ambiente, agentes) -> dict:
+        """mascara_obstaculos (N,) e posicao (N, 2) de todos os agentes."""
+        pos = _posicoes_lote(ambiente, agentes)
+        mascaras = np.zeros(len(pos), dtype=np.int64)
+        # Células inteiras dentro do mapa: consulta vetorizada à tabela; as restantes, uma a uma
+        na_grelha = (pos == np.floor(pos)).all(axis=1) & (pos[:, 0] >= 0) & (pos[:, 0] < ambiente.largura) \
+                    & (pos[:, 1] >= 0) & (pos[:, 1] < ambiente.altura)
+        celulas = pos[na_grelha].astype(np.int64)
+        mascaras[na_grelha] = ambiente.mascaras_vizinhanca_lote(celulas)
+        for i in np.flatnonzero(~na_grelha):
+            mascaras[i] = ambiente.mascara_vizinhanca(pos[i, 0], pos[i, 1])
+        return {"mascara_obstaculos": mascaras, "posicao": pos}
 
     def detetar(self, ambiente, agente) -> Observacao:
         # Obter a posição atual do agente
         pos_agente = ambiente.agentes_posicoes.get(agente)
         
         if pos_agente is None:
-            return Observacao({"erro": "agente_nao_posicionado"})
-        
-        # O estado (observação) deve ser um dicionário que mapeia a direção 
-        # para a presença de um obstáculo (True/False)
-        deteccao_obstaculos = {}
+            return Observacao(erro="agente_nao_posicionado")
         
         # Converter pos_agente de (x, y)
         ax, ay = pos_agente
-        
-        for dx, dy in self.direcoes_vizinhanca:
-            # Calcular a posição vizinha (apenas 1 passo, pois raio_visao é 1)
-            px = ax + dx
-            py = ay + dy
-            
-            pos_vizinha = (px, py)
-            
-            # Verificar se a posição vizinha contém um obstáculo
-            # Assumimos que 'ambiente.obstaculos' é um conjunto ou lista de tuplas (x, y)
-            
-            is_obstaculo = pos_vizinha in ambiente.obstaculos
-            
-            # Adicionar ao dicionário de deteção. Usamos o vetor (dx, dy) como chave.
-            deteccao_obstaculos[f"obs_{dx}_{dy}"] = is_obstaculo
+
+        # O estado (observação) é uma máscara de 8 bits: o bit i indica parede em VIZINHANCA[i].
+        # Se o ambiente tiver a tabela pré-calculada por célula, a consulta é O(1).
+        mascara_vizinhanca = getattr(ambiente, 'mascara_vizinhanca', None)
+        if mascara_vizinhanca is not None:
+            mascara = mascara_vizinhanca(ax, ay)
+        else:
+            # Sem tabela, assumimos que 'ambiente.obstaculos' é um conjunto ou lista de tuplas (x, y)
+            mascara = 0
+            for bit, (dx, dy) in enumerate(self.direcoes_vizinhanca):
+                if (ax + dx, ay + dy) in ambiente.obstaculos:
+                    mascara |= 1 << bit
             
-        # Incluir a posição atual para completar o estado
-        deteccao_obstaculos["posicao"] = pos_agente
-        
-        # Devolver a observação
-        return Observacao({"proximidade_obstaculos": deteccao_obstaculos})
\ No newline at end of file
+        # Devolver a observação (com a posição atual para completar o estado)
+        return ObservacaoProximidade(mascara, pos_agente)
+
+class SensorGeodesico(Sensor):
+    """Sensor que lê a distância geodésica (passos mínimos) até ao alvo, se o ambiente a tiver."""
+    def detetar(self, ambiente, agente) -> Observacao:
+        pos_agente = ambiente.agentes_posicoes.get(agente)
+        if pos_agente is None or not hasattr(ambiente, 'passos_otimos'):
+            return Observacao(erro="distancia_geodesica_indisponivel")
+        return Observacao(distancia_geodesica=ambiente.passos_otimos(pos_agente), posicao=pos_agente)
@@ -0,0 +1,227 @@
+"""
+Q-Tables partilhadas entre agentes ("tabela_partilhada": "<chave>" no JSON do agente).
+
+Todos os AgenteRL com a mesma chave leem e atualizam a mesma tabela, cada um com a sua política
+(epsilon, transição pendente). Dentro de um processo a tabela é envolvida numa TabelaQSincronizada
+(locks por faixas de estados); entre processos a tabela densa vive num bloco de memória partilhada
+(TabelaQMemoriaPartilhada) e os trabalhadores atualizam-na sem locks, como no Q-learning assíncrono.
+"""
+import threading
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from Estado import N_ESTADOS, e_codificado
+from TabelaQ import TabelaQDensa
+import Registo
+
+N_FAIXAS = 64 # Número de locks: estados em faixas diferentes atualizam-se em paralelo
+
+
+class TabelaQSincronizada:
+    """
+    Envolve uma Q-Table (dicionário ou densa) para uso por várias threads.
+    Cada estado pertence a uma faixa (hash % N_FAIXAS) com o seu lock; uma atualização TD tranca as faixas
+    de S e S' (por ordem, sem deadlocks). As leituras não trancam: no pior caso veem um valor com um passo de atraso.
+    Operações sobre a tabela inteira (cópia, carregar, criar linhas na tabela densa) trancam todas as faixas.
+    """
+    def __init__(self, tabela, n_faixas: int = N_FAIXAS):
+        self.tabela = tabela
+        self._locks = [threading.Lock() for _ in range(n_faixas)]
+        self._n_faixas = n_faixas
+        # Na tabela densa, um estado fora de Estado.codificar pode realocar os arrays (_crescer)
+        self._linhas_fixas = isinstance(tabela, TabelaQDensa)
+
+    def __getattr__(self, nome):
+        return getattr(self.tabela, nome)
+
+    def __len__(self):
+        return len(self.tabela)
+
+    def _faixas(self, *estados) -> List[threading.Lock]:
+        if self._linhas_fixas and not all(e_codificado(e) for e in estados):
+            return self._locks
+        return [self._locks[i] for i in sorted({hash(e) % self._n_faixas for e in estados})]
+
+    def _trancar(self, locks):
+        for lock in locks:
+            lock.acquire()
+
+    def _destrancar(self, locks):
+        for lock in reversed(locks):
+            lock.release()
+
+    # --- Leituras (sem lock) ---
+    def conhece(self, estado) -> bool:
+        return self.tabela.conhece(estado)
+
+    def valores(self, estado) -> Dict[Any, float]:
+        return self.tabela.valores(estado)
+
+    def melhor_accao(self, estado):
+        return self.tabela.melhor_accao(estado)
+
+    # --- Escritas ---
+    def atualizar(self, s, a, r, s_next, alpha, gamma):
+        locks = self._faixas(s, s_next)
+        self._trancar(locks)
+        try:
+            self.tabela.atualizar(s, a, r, s_next, alpha, gamma)
+        finally:
+            self._destrancar(locks)
+
+    def atualizar_terminal(self, s, a, r, alpha):
+        locks = self._faixas(s)
+        self._trancar(locks)
+        try:
+            self.tabela.atualizar_terminal(s, a, r, alpha)
+        finally:
+            self._destrancar(locks)
+
+    # valor e valor_maximo podem criar a linha do estado: trancam a faixa como as escritas
+    def valor(self, estado, accao) -> float:
+        locks = self._faixas(estado)
+        self._trancar(locks)
+        try:
+            return self.tabela.valor(estado, accao)
+        finally:
+            self._destrancar(locks)
+
+    def valor_maximo(self, estado) -> float:
+        locks = self._faixas(estado)
+        self._trancar(locks)
+        try:
+            return self.tabela.valor_maximo(estado)
+        finally:
+            self._destrancar(locks)
+
+    def somar(self, estado, accao, incremento: float):
+        locks = self._faixas(estado)
+        self._trancar(locks)
+        try:
+            self.tabela.somar(estado, accao, incremento)
+        finally:
+            self._destrancar(locks)
+
+    def atualizar_lote(self, s, a, r, s_next, alpha, gamma, terminal=None):
+        # Um lote toca em muitas faixas: tranca a tabela inteira (uma vez por lote, não por transição)
+        self._trancar(self._locks)
+        try:
+            return self.tabela.atualizar_lote(s, a, r, s_next, alpha, gamma, terminal=terminal)
+        finally:
+            self._destrancar(self._locks)
+
+    def como_dicionario(self) -> Dict:
+        self._trancar(self._locks)
+        try:
+            return self.tabela.como_dicionario()
+        finally:
+            self._destrancar(self._locks)
+
+    def carregar_dicionario(self, dados: Dict):
+        self._trancar(self._locks)
+        try:
+            self.tabela.carregar_dicionario(dados)
+        finally:
+            self._destrancar(self._locks)
+
+    def copia(self):
+        # A cópia (para o GestorCheckpoints) é da tabela interna: o ficheiro não precisa de locks
+        self._trancar(self._locks)
+        try:
+            return self.tabela.copia()
+        finally:
+            self._destrancar(self._locks)
+
+
+class TabelaQMemoriaPartilhada(TabelaQDensa):
+    """
+    TabelaQDensa cujos arrays q e visitado estão num bloco multiprocessing.shared_memory.
+    Só tem as N_ESTADOS linhas fixas (Estado.codificar): o bloco não pode crescer depois de criado.
+    O processo principal cria o bloco (criar=True) e no fim chama destruir(); os trabalhadores ligam-se pelo nome.
+    """
+    def __init__(self, accoes: List[Any], nome: str = None, criar: bool = False):
+        super().__init__(accoes)
+        n_accoes = len(self.accoes)
+        tamanho_q = N_ESTADOS * n_accoes * 8
+        self.memoria = shared_memory.SharedMemory(name=nome, create=criar, size=tamanho_q + N_ESTADOS if criar else 0)
+        self.nome = self.memoria.name
+        self.q = np.ndarray((N_ESTADOS, n_accoes), dtype=np.float64, buffer=self.memoria.buf)
+        self.visitado = np.ndarray((N_ESTADOS,), dtype=bool, buffer=self.memoria.buf, offset=tamanho_q)
+        if criar:
+            self.q[:] = 0.0
+            self.visitado[:] = False
+
+    def _crescer(self):
+        raise ValueError("A tabela em memória partilhada só aceita estados de Estado.codificar")
+
+    def carregar_dicionario(self, dados: Dict):
+        # Memórias antigas (.pkl) podem ter estados noutro formato (ex: posições (x, y)): não cabem no bloco
+        ignorados = [estado for estado in dados if not e_codificado(estado)]
+        if ignorados:
+            Registo.aviso(f"{len(ignorados)} estados fora de Estado.codificar ignorados ao carregar para memória "
+                          f"partilhada (ex: {ignorados[0]!r})")
+            dados = {estado: q_valores for estado, q_valores in dados.items() if e_codificado(estado)}
+        super().carregar_dicionario(dados)
+
+    def copia(self) -> TabelaQDensa:
+        # Cópia normal (fora da memória partilhada), para gravar em disco
+        tabela = TabelaQDensa(self.accoes)
+        tabela.q = self.q.copy()
+        tabela.visitado = self.visitado.copy()
+        return tabela
+
+    def fechar(self):
+        # Os arrays são vistas sobre o bloco: têm de desaparecer antes de o fechar
+        self.q = self.visitado = None
+        self.memoria.close()
+
+    def destruir(self):
+        memoria = self.memoria
+        self.fechar()
+        memoria.unlink()
+
+
+# --- Registo do processo: chave -> tabela partilhada ---
+_tabelas: Dict[str, Any] = {}
+_memorias: Dict[str, str] = {} # chave -> nome do bloco de memória partilhada (definido nos trabalhadores)
+_lock_registo = threading.Lock()
+
+def usar_memoria_partilhada(chave: str, nome: str):
+    """Nos trabalhadores: as tabelas com esta chave passam a ser o bloco de memória partilhada 'nome'."""
+    with _lock_registo:
+        _memorias[chave] = nome
+        _tabelas.pop(chave, None)
+
+def partilhar(chave: str, tabela) -> Tuple[Any, bool]:
+    """
+    Devolve (tabela partilhada da chave, dono). O primeiro agente a pedir uma chave é o dono: a sua tabela
+    passa a ser a partilhada, e é ele quem a carrega e grava em disco. Os seguintes recebem a mesma.
+    Se a chave estiver ligada a memória partilhada, nenhum agente deste processo é dono (grava o processo principal).
+    """
+    with _lock_registo:
+        existente = _tabelas.get(chave)
+        if existente is not None:
+            return existente, False
+        nome = _memorias.get(chave)
+        if nome is not None:
+            # Sem locks entre processos: as escritas são atualizações de um float (Hogwild)
+            partilhada, dono = TabelaQMemoriaPartilhada(tabela.accoes, nome=nome), False
+        else:
+            partilhada, dono = TabelaQSincronizada(tabela), True
+        _tabelas[chave] = partilhada
+        return partilhada, dono
+
+def esquecer(chave: str = None):
+    """
+    Remove uma chave do registo (ou todas), ex: entre execuções de um estudo no mesmo processo.
+    As ligações deste processo a blocos de memória partilhada são fechadas (o bloco continua a existir).
+    """
+    with _lock_registo:
+        if chave is None:
+            removidas = list(_tabelas.values())
+            _tabelas.clear()
+        else:
+            removidas = [_tabelas.pop(chave, None)]
+    for tabela in removidas:
+        if isinstance(tabela, TabelaQMemoriaPartilhada):
+            tabela.fechar()
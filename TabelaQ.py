@@ -0,0 +1,289 @@
+from typing import Any, Dict, List
+import numpy as np
+from Estado import N_ESTADOS, migrar_estado
+
+
+class TabelaQDicionario:
+    """Q-Table clássica: dicionário de dicionários {estado: {accao: valor}}."""
+    def __init__(self, accoes: List[Any]):
+        self.accoes = accoes
+        self.dados = {}
+
+    def __len__(self):
+        return len(self.dados)
+
+    def conhece(self, estado) -> bool:
+        return estado in self.dados
+
+    def valores(self, estado) -> Dict[Any, float]:
+        return self.dados.get(estado, {})
+
+    def melhor_accao(self, estado):
+        """Ação com maior valor Q, ou None se o estado nunca foi visto."""
+        q_valores = self.dados.get(estado)
+        if not q_valores:
+            return None
+        # Em caso de empate, max escolhe a primeira
+        return max(q_valores, key=q_valores.get)
+
+    def _linha(self, estado) -> Dict[Any, float]:
+        linha = self.dados.get(estado)
+        if linha is None:
+            linha = self.dados[estado] = {ac: 0.0 for ac in self.accoes}
+        return linha
+
+    def atualizar(self, s, a, r, s_next, alpha, gamma):
+        # Q(S, A) = Q(S, A) + alpha * (R + gamma * max(Q(S', a')) - Q(S, A))
+        linha = self._linha(s)
+        next_max = max(self._linha(s_next).values())
+        old_q = linha[a]
+        linha[a] = old_q + alpha * (r + gamma * next_max - old_q)
+
+    def atualizar_terminal(self, s, a, r, alpha):
+        linha = self._linha(s)
+        old_q = linha[a]
+        linha[a] = old_q + alpha * (r - old_q)
+
+    # --- Acesso elementar (usado pelos métodos com traços de elegibilidade) ---
+    def valor(self, estado, accao) -> float:
+        return self._linha(estado)[accao]
+
+    def valor_maximo(self, estado) -> float:
+        return max(self._linha(estado).values())
+
+    def somar(self, estado, accao, incremento: float):
+        self._linha(estado)[accao] += incremento
+
+    def como_dicionario(self) -> Dict:
+        return self.dados
+
+    def carregar_dicionario(self, dados: Dict):
+        # Guarda a referência (não copia), como a antiga atribuição direta a q_table
+        self.dados = dados
+
+    def copia(self) -> 'TabelaQDicionario':
+        """Cópia independente (instantâneo para gravar noutra thread enquanto o treino continua)."""
+        tabela = TabelaQDicionario(self.accoes)
+        tabela.dados = {estado: dict(linha) for estado, linha in self.dados.items()}
+        return tabela
+
+
+class TabelaQDensa:
+    """
+    Q-Table num array NumPy (estados x ações) com codificadores inteiros.
+    Os estados codificados (Estado.codificar: id_direcao * 256 + mascara) são diretamente o índice da linha.
+    Qualquer outro estado (ex: posições (x, y)) recebe uma linha nova a seguir a essas.
+    """
+    def __init__(self, accoes: List[Any]):
+        self.accoes = list(accoes)
+        self._coluna = {a: i for i, a in enumerate(self.accoes)}
+        self._n_fixos = N_ESTADOS
+
+        self._indices_extra = {} # estado -> linha, para estados fora do formato (direcao, mascara)
+        self._n_linhas = self._n_fixos
+        self.q = np.zeros((self._n_linhas, len(self.accoes)), dtype=np.float64)
+        self.visitado = np.zeros(self._n_linhas, dtype=bool)
+
+    def __len__(self):
+        return int(self.visitado.sum())
+
+    # --- Codificadores ---
+    def indice_estado(self, estado, criar: bool = True) -> int:
+        """Linha da tabela para um estado (-1 se não existir e criar=False)."""
+        if type(estado) is int and 0 <= estado < self._n_fixos:
+            return estado
+        if type(estado) is tuple:
+            # Formato antigo (rotulo_direcao, mascara)
+            codificado = migrar_estado(estado)
+            if codificado is not estado:
+                return codificado
+
+        indice = self._indices_extra.get(estado)
+        if indice is None:
+            if not criar:
+                return -1
+            indice = self._n_fixos + len(self._indices_extra)
+            if indice >= self._n_linhas:
+                self._crescer()
+            self._indices_extra[estado] = indice
+        return indice
+
+    def estado_do_indice(self, indice: int):
+        """Inverso de indice_estado (para debug e exportação)."""
+        if indice < self._n_fixos:
+            return indice # Os estados codificados são o próprio índice
+        for estado, i in self._indices_extra.items():
+            if i == indice:
+                return estado
+        raise KeyError(indice)
+
+    def indice_accao(self, accao) -> int:
+        return self._coluna[accao]
+
+    def _crescer(self):
+        extra = max(self._n_linhas - self._n_fixos, 64)
+        self.q = np.vstack([self.q, np.zeros((extra, len(self.accoes)), dtype=np.float64)])
+        self.visitado = np.concatenate([self.visitado, np.zeros(extra, dtype=bool)])
+        self._n_linhas += extra
+
+    # --- Interface comum com TabelaQDicionario ---
+    def conhece(self, estado) -> bool:
+        i = self.indice_estado(estado, criar=False)
+        return i >= 0 and bool(self.visitado[i])
+
+    def valores(self, estado) -> Dict[Any, float]:
+        i = self.indice_estado(estado, criar=False)
+        if i < 0 or not self.visitado[i]:
+            return {}
+        return dict(zip(self.accoes, self.q[i].tolist()))
+
+    def melhor_accao(self, estado):
+        i = self.indice_estado(estado, criar=False)
+        if i < 0 or not self.visitado[i]:
+            return None
+        # argmax devolve a primeira em caso de empate (igual ao max do dicionário)
+        return self.accoes[int(self.q[i].argmax())]
+
+    def atualizar(self, s, a, r, s_next, alpha, gamma):
+        i = self.indice_estado(s)
+        j = self.indice_estado(s_next)
+        c = self._coluna[a]
+        self.visitado[i] = True
+        self.visitado[j] = True
+        # Para uma única transição, operar sobre escalares Python é mais rápido do que ufuncs NumPy
+        q = self.q
+        old_q = q.item(i, c)
+        q[i, c] = old_q + alpha * (r + gamma * max(q[j].tolist()) - old_q)
+
+    def atualizar_terminal(self, s, a, r, alpha):
+        i = self.indice_estado(s)
+        c = self._coluna[a]
+        self.visitado[i] = True
+        old_q = self.q.item(i, c)
+        self.q[i, c] = old_q + alpha * (r - old_q)
+
+    def valor(self, estado, accao) -> float:
+        i = self.indice_estado(estado)
+        self.visitado[i] = True
+        return self.q.item(i, self._coluna[accao])
+
+    def valor_maximo(self, estado) -> float:
+        i = self.indice_estado(estado)
+        self.visitado[i] = True
+        return max(self.q[i].tolist())
+
+    def somar(self, estado, accao, incremento: float):
+        i = self.indice_estado(estado)
+        c = self._coluna[accao]
+        self.visitado[i] = True
+        self.q[i, c] = self.q.item(i, c) + incremento
+
+    def melhores_accoes(self):
+        """
+        Melhor ação de cada estado visitado, lida diretamente dos arrays: (array com um id de ação por
+        estado codificado, -1 se nunca visitado; {estado: id} para os estados fora do formato).
+        """
+        accoes = np.asarray(self.accoes, dtype=np.int64)
+        # argmax devolve a primeira em caso de empate (igual a melhor_accao)
+        melhores = accoes[self.q[:self._n_fixos].argmax(axis=1)]
+        melhores[~np.asarray(self.visitado[:self._n_fixos], dtype=bool)] = -1
+        outros = {estado: self.accoes[int(self.q[i].argmax())]
+                  for estado, i in self._indices_extra.items() if self.visitado[i]}
+        return melhores, outros
+
+    # --- Operações vetorizadas (sobre índices já codificados) ---
+    def melhores_accoes_lote(self, indices: np.ndarray) -> np.ndarray:
+        """Índice da melhor ação para cada linha pedida."""
+        return self.q[indices].argmax(axis=1)
+
+    def atualizar_lote(self, s, a, r, s_next, alpha, gamma, terminal=None):
+        """
+        Atualização TD de um lote de transições (arrays de índices de estado/ação).
+        Transições repetidas no mesmo lote acumulam os seus incrementos.
+        """
+        s = np.asarray(s, dtype=np.int64)
+        a = np.asarray(a, dtype=np.int64)
+        alvo = np.asarray(r, dtype=np.float64) + gamma * self.q[s_next].max(axis=1)
+        if terminal is not None:
+            alvo = np.where(terminal, r, alvo)
+        erro_td = alvo - self.q[s, a]
+        np.add.at(self.q, (s, a), alpha * erro_td)
+        self.visitado[s] = True
+        self.visitado[s_next] = True
+        return erro_td
+
+    # --- Compatibilidade com o formato dicionário (.pkl existentes) ---
+    def como_dicionario(self) -> Dict:
+        dados = {}
+        for i in np.flatnonzero(self.visitado[:self._n_fixos]):
+            dados[self.estado_do_indice(int(i))] = dict(zip(self.accoes, self.q[i].tolist()))
+        for estado, i in self._indices_extra.items():
+            if self.visitado[i]:
+                dados[estado] = dict(zip(self.accoes, self.q[i].tolist()))
+        return dados
+
+    def carregar_dicionario(self, dados: Dict):
+        self._indices_extra = {}
+        self.q[:] = 0.0
+        self.visitado[:] = False
+        for estado, q_valores in dados.items():
+            i = self.indice_estado(estado)
+            self.visitado[i] = True
+            for accao, valor in q_valores.items():
+                c = self._coluna.get(accao)
+                if c is not None:
+                    self.q[i, c] = valor
+
+    def copia(self) -> 'TabelaQDensa':
+        """Cópia independente (instantâneo para gravar noutra thread): duas cópias de arrays."""
+        tabela = TabelaQDensa.__new__(TabelaQDensa)
+        tabela.__dict__.update(self.__dict__)
+        tabela.q = self.q.copy()
+        tabela.visitado = self.visitado.copy()
+        tabela._indices_extra = dict(self._indices_extra)
+        return tabela
+
+
+class TabelaQLote:
+    """
+    K Q-Tables densas independentes num único array (réplicas x estados x ações),
+    para treinar várias sementes/hiperparâmetros em paralelo com operações vetorizadas.
+    Os estados são os inteiros de Estado.codificar (id_direcao * 256 + mascara).
+    """
+    def __init__(self, n_replicas: int, accoes: List[Any], n_estados: int = N_ESTADOS,
+                 dtype=np.float64):
+        self.accoes = list(accoes)
+        self.n_replicas = n_replicas
+        self.q = np.zeros((n_replicas, n_estados, len(self.accoes)), dtype=dtype)
+        self.visitado = np.zeros((n_replicas, n_estados), dtype=bool)
+        self._k = np.arange(n_replicas)
+
+    def melhores_accoes(self, estados: np.ndarray) -> np.ndarray:
+        """Índice da melhor ação de cada réplica no seu estado atual."""
+        return self.q[self._k, estados].argmax(axis=1)
+
+    def conhecidos(self, estados: np.ndarray) -> np.ndarray:
+        return self.visitado[self._k, estados]
+
+    def atualizar(self, s, a, r, s_next, terminal, alpha, gamma):
+        """Um passo TD por réplica; alpha e gamma podem ser escalares ou arrays de tamanho K."""
+        k = self._k
+        alvo = r + gamma * self.q[k, s_next].max(axis=1) * ~terminal
+        self.q[k, s, a] += alpha * (alvo - self.q[k, s, a])
+        self.visitado[k, s] = True
+        self.visitado[k, s_next] = True
+
+    def tabela(self, k: int) -> TabelaQDensa:
+        """Exporta a réplica k como TabelaQDensa (para usar/guardar num agente normal)."""
+        tabela = TabelaQDensa(self.accoes)
+        n = self.q.shape[1]
+        tabela.q[:n] = self.q[k]
+        tabela.visitado[:n] = self.visitado[k]
+        return tabela
+
+
+def criar_tabela(tipo: str, accoes: List[Any]):
+    """Fábrica de Q-Tables: 'dicionario' (por defeito) ou 'densa' (NumPy)."""
+    if tipo == "densa":
+        return TabelaQDensa(accoes)
+    return TabelaQDicionario(accoes)
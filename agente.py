@@ -7,6 +7,10 @@ from Sensor import Sensor
 
 class Agente(ABC, threading.Thread):
     """Interface base para todos os agentes."""
+    # False nos agentes que leem cada sensor no age() (ler_sensor): aí o executa_passo não junta as leituras
+    # numa observação que não seria usada
+    JUNTAR_LEITURAS = True
+
     def __init__(self, nome: str):
         threading.Thread.__init__(self)
         self.nome = nome
@@ -18,6 +22,9 @@ class Agente(ABC, threading.Thread):
         self.ambiente = None # Referência para o ambiente
         self.start_step_event = threading.Event()
         self.end_step_event = threading.Event()
+        # Leituras dos sensores neste passo: {sensor: Observacao}, válidas para (tick, posição)
+        self._leituras = {}
+        self._chave_leituras = None
 
     def set_ambiente(self, ambiente):
         self.ambiente = ambiente
@@ -30,28 +37,53 @@ class Agente(ABC, threading.Thread):
             if not self.running: break
             self.start_step_event.clear()
 
-            # Cycle: Observe -> Act
-            if self.ambiente:
-                # Se houver sensores, usar os sensores para obter a observação
-                if self.sensores:
-                    dados_combinados = {}
-                    for sensor in self.sensores:
-                        # Cada sensor recolhe info 
-                        obs_sensor = sensor.detetar(self.ambiente, self)
-                        #Junta os dados de vários sensores
-                        dados_combinados.update(obs_sensor.dados)
-                        #Sprint("A usar sensor instalado")
-                    observacao= Observacao(dados_combinados)
-                else:
-                    observacao = self.ambiente.observacaoPara(self)
-
-                self.observacao(observacao)
-                accao = self.age()
-                self.ambiente.agir(accao, self)
+            self.executa_passo()
             
             # Signal that we are done with this step
             self.end_step_event.set()
 
+    def executa_passo(self):
+        """
+        Executa um passo completo do agente: Observar -> Decidir -> Agir.
+        Chamado pela thread do agente ou diretamente pelo Motor em modo síncrono.
+        """
+        # Cycle: Observe -> Act
+        if self.ambiente:
+            # Se houver sensores, usar os sensores para obter a observação
+            if self.sensores and not self.JUNTAR_LEITURAS:
+                observacao = None # O age() lê os sensores
+            elif self.sensores:
+                observacao = Observacao()
+                for sensor in self.sensores:
+                    # Cada sensor recolhe info (fica em cache para o age() deste passo)
+                    obs_sensor = self.ler_sensor(sensor)
+                    #Junta os dados de vários sensores
+                    observacao.atualizar(obs_sensor)
+                    #Sprint("A usar sensor instalado")
+            else:
+                observacao = self.ambiente.observacaoPara(self)
+
+            self.observacao(observacao)
+            accao = self.age()
+            self.ambiente.agir(accao, self)
+
+    def ler_sensor(self, sensor: Sensor) -> Observacao:
+        """
+        Leitura do sensor no passo atual. Dentro do mesmo tick e na mesma posição o mundo não mudou,
+        por isso uma segunda leitura (ex: no age()) devolve a já calculada em executa_passo.
+        """
+        ambiente = self.ambiente
+        posicoes = getattr(ambiente, 'agentes_posicoes', None)
+        chave = (getattr(ambiente, 'tick', None), posicoes.get(self) if posicoes is not None else None)
+        if chave != self._chave_leituras:
+            self._leituras = {}
+            self._chave_leituras = chave
+
+        obs = self._leituras.get(sensor)
+        if obs is None:
+            obs = self._leituras[sensor] = sensor.detetar(ambiente, self)
+        return obs
+
     @abstractmethod
     def observacao(self, obs: 'Observacao'):
         """Recebe a observação do ambiente. Atualiza o estado interno do agente."""
@@ -68,6 +100,18 @@ class Agente(ABC, threading.Thread):
         self.recompensa_total += recompensa
         self.passos += 1
 
+    def reiniciar(self):
+        """Limpa os contadores do episódio. A política e os sensores mantêm-se em memória."""
+        self.recompensa_total = 0.0
+        self.passos = 0
+        self.ultima_observacao = None
+        self._leituras = {}
+        self._chave_leituras = None
+
+    def fim_episodio(self, sucesso: bool):
+        """Chamado pelo Motor quando um episódio termina (sucesso = objetivo atingido)."""
+        pass
+
     def instala(self, sensor: Sensor): # Tipificação melhorada
         """Instala um sensor no agente."""
         self.sensores.append(sensor)
@@ -94,7 +138,7 @@ class AgenteDirecional(Agente):
         self.direcao_alvo = obs.get("direcao")
 
     def age(self):
-        return Accao("mover", {"direcao": self.direcao_alvo})
+        return Accao("mover", direcao=self.direcao_alvo)
     
     def comunica(self, mensagem: str, de_agente: 'Agente'):
         pass
@@ -114,7 +158,7 @@ class AgenteExplorador(Agente):
 
     def age(self):
         if self.opcoes:
-            return Accao("mover", {"direcao": self.opcoes[0]})
+            return Accao("mover", direcao=self.opcoes[0])
         return Accao("parar")
 
     def comunica(self, mensagem: str, de_agente: 'Agente'):
@@ -0,0 +1,85 @@
+"""
+Microbenchmark das alocações por passo: observações/ações em dicionário (formato antigo)
+contra Observacao/Accao com __slots__ (Modelos.py).
+
+Reproduz o que acontece num passo de um AgenteRL no labirinto: duas leituras de sensores,
+a observação com o estado para a política e a ação. No formato antigo as leituras eram ainda
+juntas numa observação (dados_combinados); o AgenteRL de agora já não o faz (Agente.JUNTAR_LEITURAS).
+Os objetos de N passos ficam vivos durante a medição, para o tracemalloc os contar.
+"""
+import time
+import tracemalloc
+from Modelos import ObservacaoDirecao, ObservacaoProximidade, ObservacaoEstado, Accao
+
+N_PASSOS = 20000
+REPETICOES = 7
+
+
+# --- Formato antigo (cópia do Modelos.py anterior, só para comparação) ---
+class ObservacaoDicionario:
+    def __init__(self, dados):
+        self.dados = dados
+
+    def get(self, key, default=None):
+        return self.dados.get(key, default)
+
+class AccaoDicionario:
+    def __init__(self, tipo, parametros=None):
+        self.tipo = tipo
+        self.parametros = parametros or {}
+
+
+def passo_dicionario(pos, direcao, mascara, estado, accao_id):
+    leitura_direcao = ObservacaoDicionario({"direcao": direcao, "distancia": 5.0, "posicao": pos})
+    leitura_proximidade = ObservacaoDicionario({"mascara_obstaculos": mascara, "posicao": pos})
+    dados_combinados = {}
+    dados_combinados.update(leitura_direcao.dados)
+    dados_combinados.update(leitura_proximidade.dados)
+    observacao = ObservacaoDicionario(dados_combinados)
+    obs_politica = ObservacaoDicionario({"estado_customizado": estado, "posicao": pos})
+    accao = AccaoDicionario("mover", {"direcao": accao_id})
+    return leitura_direcao, leitura_proximidade, observacao, obs_politica, accao
+
+def passo_slots(pos, direcao, mascara, estado, accao_id):
+    # Como os sensores, o AgenteRL e as políticas: leituras com os campos por posição, sem a junção das leituras
+    # (o AgenteRL lê cada sensor no age(), ver Agente.JUNTAR_LEITURAS) e a ação "mover" partilhada
+    leitura_direcao = ObservacaoDirecao(direcao, 5.0, pos)
+    leitura_proximidade = ObservacaoProximidade(mascara, pos)
+    obs_politica = ObservacaoEstado(estado, pos)
+    accao = Accao.mover(accao_id)
+    return leitura_direcao, leitura_proximidade, obs_politica, accao
+
+
+def medir(passo, nome):
+    # Valores partilhados (como no simulador, onde a posição e o estado já existem)
+    pos, direcao, estado = (3, 4), (0.6, 0.8), ("sudeste", 5)
+
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    guardados = [passo(pos, direcao, 5, estado, 2) for _ in range(N_PASSOS)]
+    depois = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    estatisticas = depois.compare_to(antes, "filename")
+    blocos = sum(e.count_diff for e in estatisticas)
+    octetos = sum(e.size_diff for e in estatisticas)
+    del guardados
+
+    # Melhor de REPETICOES medições: uma só varia muito com a carga da máquina
+    duracao = float("inf")
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        for _ in range(N_PASSOS):
+            passo(pos, direcao, 5, estado, 2)
+        duracao = min(duracao, time.perf_counter() - inicio)
+
+    print(f"{nome:<12} {blocos / N_PASSOS:6.1f} alocações/passo | {octetos / N_PASSOS:7.1f} bytes/passo | "
+          f"{duracao / N_PASSOS * 1e6:5.2f} µs/passo")
+    return octetos / N_PASSOS
+
+
+if __name__ == "__main__":
+    print(f"=== Alocações por passo de um agente ({N_PASSOS} passos) ===")
+    antigo = medir(passo_dicionario, "dicionários")
+    novo = medir(passo_slots, "__slots__")
+    print(f"Memória por passo: {novo / antigo:.0%} do formato antigo")
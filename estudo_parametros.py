@@ -1,96 +1,270 @@
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import matplotlib.pyplot as plt
 import numpy as np
 from Motor import MotorDeSimulacao
+from AgenteRL import AgenteRL
+import TabelaPartilhada
+import Registo
+
+CENARIO_PADRAO = "JSONFILES/labirinto1.json"
+PASTA_CACHE = "resultados_estudo" # Um ficheiro JSON por (configuração, semente) já concluída
+# Agenda de exploração comum a todas as execuções (Exploracao.py), para comparar as configurações nas mesmas condições
+EXPLORACAO_ESTUDO = {"tipo": "exponencial", "inicial": 0.6, "fator": 0.996, "minimo": 0.01}
 
 def media_movel(dados, janela=50):
     """Suaviza o gráfico para não ficar muito 'tremido'."""
     if len(dados) < janela: return dados
     return np.convolve(dados, np.ones(janela)/janela, mode='valid')
 
-def correr_teste(parametro_nome, valores_teste, n_episodios=2000):
+# ==========================================
+# ESPAÇOS DE PESQUISA
+# ==========================================
+def grelha(espaco: dict) -> list:
+    """Todas as combinações: {"alpha": [0.1, 0.5], "gamma": [0.9, 0.99]} -> 4 configurações."""
+    nomes = list(espaco)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(espaco[n] for n in nomes))]
+
+def aleatoria(espaco: dict, n_amostras: int, semente: int = 0) -> list:
+    """
+    Amostras aleatórias do espaço. Cada parâmetro é uma lista de valores (escolha uniforme)
+    ou um par (min, max) de floats (valor uniforme no intervalo).
+    """
+    rng = random.Random(semente)
+    configuracoes = []
+    for _ in range(n_amostras):
+        config = {}
+        for nome, dominio in espaco.items():
+            if isinstance(dominio, tuple) and len(dominio) == 2:
+                config[nome] = rng.uniform(*dominio)
+            else:
+                config[nome] = rng.choice(list(dominio))
+        configuracoes.append(config)
+    return configuracoes
+
+# ==========================================
+# EXECUÇÃO (num processo trabalhador)
+# ==========================================
+def _chave_execucao(tarefa: dict) -> str:
+    """Hash estável da configuração completa de uma execução (usado como nome na cache)."""
+    texto = json.dumps(tarefa, sort_keys=True)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+def _impressao_cenario(cenario: str) -> str:
+    """
+    sha1 do conteúdo do cenário e dos JSON dos agentes que ele referencia (paredes, recompensa, gamma, algoritmo...).
+    Entra na chave da cache: editar um destes ficheiros invalida os resultados guardados em vez de os reutilizar.
+    """
+    sha = hashlib.sha1()
+    with open(cenario, "rb") as f:
+        conteudo = f.read()
+    sha.update(conteudo)
+    for agente_info in json.loads(conteudo).get("agentes", []):
+        caminho = agente_info.get("ficheiro_config", "").lstrip('/').lstrip('\\')
+        if caminho and os.path.exists(caminho):
+            with open(caminho, "rb") as f:
+                sha.update(f.read())
+    return sha.hexdigest()
+
+def _nova_tarefa(cenario: str, impressao: str, config: dict, semente: int, n_episodios: int, max_passos: int,
+                 exploracao: dict) -> dict:
+    return {"cenario": cenario, "conteudo": impressao, "parametros": dict(config), "semente": semente,
+            "n_episodios": n_episodios, "max_passos": max_passos, "exploracao": exploracao}
+
+def _executar(tarefa: dict, fila=None, bloco: int = 50) -> list:
+    """
+    Corre uma configuração com uma semente e devolve os passos de cada episódio.
+    Se houver fila, envia os resultados parciais ao processo principal a cada 'bloco' episódios.
+    """
+    chave = _chave_execucao(tarefa)
+    historico_passos = []
+
+    # Num trabalhador as mensagens por episódio são só custo: apenas avisos e erros
+    Registo.configurar(nivel=Registo.AVISO)
+    # O processo trabalhador é reutilizado entre tarefas: cada execução começa sem tabelas partilhadas
+    TabelaPartilhada.esquecer()
+    # A semente da tarefa define o gerador de cada agente: a mesma tarefa repete sempre os mesmos episódios
+    motor = MotorDeSimulacao.cria(tarefa["cenario"], sincrono=True, semente=tarefa["semente"])
+    agente_rl = next(a for a in motor.agentes if isinstance(a, AgenteRL))
+    # Vários processos a gravar o mesmo .pkl corromperiam a memória do agente
+    agente_rl.checkpoints = None
+
+    # RESET DA MEMÓRIA (Tabula Rasa) e injeção dos parâmetros a testar
+    politica = agente_rl.politica
+    politica.q_table = {}
+    for nome, valor in tarefa["parametros"].items():
+        setattr(politica, nome, valor)
+
+    # Exploração: a agenda do estudo (e não a do JSON do agente), igual em todas as execuções.
+    # Se o parâmetro em estudo for o próprio epsilon, fica fixo no valor testado.
+    if "epsilon" in tarefa["parametros"]:
+        politica.definir_exploracao(None)
+    else:
+        politica.definir_exploracao(tarefa["exploracao"])
+
+    for _ in range(tarefa["n_episodios"]):
+        estatisticas = motor.executa_episodio(tarefa["max_passos"])
+        historico_passos.append(estatisticas["passos"])
+        if fila is not None and len(historico_passos) % bloco == 0:
+            fila.put((chave, historico_passos[-bloco:]))
+
+    motor.parar_agentes()
+
+    return historico_passos
+
+# ==========================================
+# MOTOR DO ESTUDO (processo principal)
+# ==========================================
+def _ler_cache(chave: str):
+    caminho = os.path.join(PASTA_CACHE, f"{chave}.json")
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, "r") as f:
+        return json.load(f)["passos"]
+
+def _gravar_cache(chave: str, tarefa: dict, passos: list):
+    os.makedirs(PASTA_CACHE, exist_ok=True)
+    caminho = os.path.join(PASTA_CACHE, f"{chave}.json")
+    temporario = caminho + ".tmp"
+    with open(temporario, "w") as f:
+        json.dump({"tarefa": tarefa, "passos": passos}, f)
+    os.replace(temporario, caminho) # Nunca fica um ficheiro meio escrito
+
+def correr_varrimento(configuracoes, sementes=(0, 1, 2), n_episodios=2000, max_passos=1000,
+                      cenario=CENARIO_PADRAO, n_processos=None, exploracao=EXPLORACAO_ESTUDO) -> dict:
+    """
+    Corre cada (configuração, semente) num ProcessPoolExecutor.
+    As execuções já concluídas são lidas da cache em disco, pelo que um estudo interrompido retoma.
+    Devolve {tuplo ordenado de parâmetros: array (n_sementes, n_episodios) com os passos}.
+    """
+    impressao = _impressao_cenario(cenario)
+    tarefas = {}
+    for config in configuracoes:
+        for semente in sementes:
+            tarefa = _nova_tarefa(cenario, impressao, config, semente, n_episodios, max_passos, exploracao)
+            tarefas[_chave_execucao(tarefa)] = tarefa
+
+    concluidos = {}
+    for chave in tarefas:
+        passos = _ler_cache(chave)
+        if passos is not None:
+            concluidos[chave] = passos
+    print(f"{len(tarefas)} execuções ({len(concluidos)} já em cache).")
+
+    por_correr = [chave for chave in tarefas if chave not in concluidos]
+    if por_correr:
+        parciais = {chave: [] for chave in por_correr}
+        with multiprocessing.Manager() as gestor, ProcessPoolExecutor(max_workers=n_processos) as executor:
+            fila = gestor.Queue()
+            futuros = {executor.submit(_executar, tarefas[chave], fila): chave for chave in por_correr}
+            pendentes = set(futuros)
+
+            while pendentes:
+                feitos, pendentes = wait(pendentes, timeout=1.0, return_when=FIRST_COMPLETED)
+                # Resultados parciais enviados pelos trabalhadores
+                while not fila.empty():
+                    chave, bloco = fila.get()
+                    parciais[chave].extend(bloco)
+                    tarefa = tarefas[chave]
+                    if len(parciais[chave]) % 500 == 0:
+                        print(f"   {tarefa['parametros']} semente {tarefa['semente']}: "
+                              f"episódio {len(parciais[chave])}/{n_episodios} "
+                              f"(média recente: {np.mean(bloco):.1f} passos)")
+                for futuro in feitos:
+                    chave = futuros[futuro]
+                    passos = futuro.result()
+                    concluidos[chave] = passos
+                    _gravar_cache(chave, tarefas[chave], passos)
+
+    resultados = {}
+    for config in configuracoes:
+        rotulo = tuple(sorted(config.items()))
+        linhas = []
+        for semente in sementes:
+            tarefa = _nova_tarefa(cenario, impressao, config, semente, n_episodios, max_passos, exploracao)
+            linhas.append(concluidos[_chave_execucao(tarefa)])
+        resultados[rotulo] = np.array(linhas)
+    return resultados
+
+def correr_teste(parametro_nome, valores_teste, n_episodios=2000, sementes=(0, 1, 2), n_processos=None):
     print(f"\n--- A INICIAR ESTUDO DE: {parametro_nome} ---")
-    print(f"Valores a testar: {valores_teste}")
-    print(f"Episódios por teste: {n_episodios} (Isto vai demorar um pouco...)")
-    
-    # Dicionário para guardar os resultados de cada valor
-    resultados = {} 
-    arquivo_cenario = "JSONFILES/labirinto1.json"
-
-    for valor in valores_teste:
-        print(f"\n> A testar {parametro_nome} = {valor}...")
-        
-        historico_passos = []
-        
-        # 1. Preparação Inicial: Criar motor para aceder ao agente e limpar memória
-        motor = MotorDeSimulacao.cria(arquivo_cenario)
-        # Encontra o primeiro AgenteRL na lista
-        agente_rl_ref = next(a for a in motor.agentes if "AgenteRL" in str(type(a)))
-        
-        # RESET DA MEMÓRIA (Tabula Rasa) para cada valor testado
-        if agente_rl_ref.politica:
-            agente_rl_ref.politica.q_table = {} 
-            
-            # Injetar o valor do parâmetro que queremos testar na referência
-            if hasattr(agente_rl_ref.politica, parametro_nome):
-                setattr(agente_rl_ref.politica, parametro_nome, valor)
-
-        # 2. Loop de Episódios
-        for episodio in range(n_episodios):
-            # Reiniciar ambiente e posições para novo episódio
-            motor = MotorDeSimulacao.cria(arquivo_cenario)
-            agente_ativo = next(a for a in motor.agentes if "AgenteRL" in str(type(a)))
-            
-            # IMPORTANTE: Passar a memória ("cérebro") da referência para o agente atual
-            agente_ativo.politica.q_table = agente_rl_ref.politica.q_table
-            
-            # Garantir que o parâmetro testado se mantém
-            if hasattr(agente_ativo.politica, parametro_nome):
-                setattr(agente_ativo.politica, parametro_nome, valor)
-            
-            # --- CORREÇÃO CRÍTICA PARA O GRÁFICO ---
-            # Se NÃO estamos a testar o 'epsilon', forçamos um valor alto (0.6)
-            # para garantir que ele explora e encontra a saída.
-            if parametro_nome != "epsilon" and hasattr(agente_ativo.politica, 'epsilon'):
-                agente_ativo.politica.epsilon = 0.6
-
-            passos = 0
-            # AUMENTADO PARA 1000: Dá tempo ao agente de encontrar a saída nas primeiras vezes
-            max_passos = 1000 
-            
-            while passos < max_passos:
-                motor.executa()
-                passos += 1
-                if motor.ambiente.simulacao_concluida():
-                    break
-            
-            # Guardar resultado
-            historico_passos.append(passos)
-            
-            # Atualizar a memória de referência com o que ele aprendeu neste episódio
-            agente_rl_ref.politica.q_table = agente_ativo.politica.q_table
-            
-            # Print de progresso a cada 100 episódios para saberes que não encravou
-            if episodio % 500 == 0:
-                print(f"   Episódio {episodio}/{n_episodios}...")
-
-        resultados[valor] = historico_passos
+    print(f"Valores a testar: {valores_teste} | Sementes: {list(sementes)}")
+    print(f"Episódios por teste: {n_episodios} (em paralelo, pode demorar um pouco...)")
+
+    configuracoes = [{parametro_nome: valor} for valor in valores_teste]
+    por_config = correr_varrimento(configuracoes, sementes, n_episodios, n_processos=n_processos)
+
+    # Dicionário com os resultados de cada valor: array (sementes x episódios)
+    resultados = {}
+    for valor, config in zip(valores_teste, configuracoes):
+        dados = por_config[tuple(sorted(config.items()))]
+        resultados[valor] = dados
         # Mostra a média dos últimos 50 episódios para ver se aprendeu
-        media_final = np.mean(historico_passos[-50:])
-        print(f"  Concluído. Média final de passos: {media_final:.2f}")
+        print(f"  {parametro_nome} = {valor}: média final de passos {dados[:, -50:].mean():.2f}")
 
     return resultados
 
+def passos_otimos_cenario(cenario=CENARIO_PADRAO):
+    """Caminho mais curto (BFS sobre a grelha) desde a posição do primeiro agente RL até ao objetivo."""
+    with open(cenario, "r") as f:
+        params = json.load(f)
+    ambiente = MotorDeSimulacao.criar_ambiente(params)
+    if ambiente is None or not hasattr(ambiente, "passos_otimos"):
+        return None
+    for agente_info in params.get("agentes", []):
+        if agente_info.get("classe", "").strip() == "AgenteRL":
+            return ambiente.passos_otimos(tuple(agente_info.get("posicao", [0, 0])))
+    return None
+
+def plotar_eficiencia(resultados, parametro_nome, passos_otimos):
+    """Eficiência por episódio: passos ótimos / passos usados (1.0 = caminho mais curto)."""
+    if not passos_otimos:
+        print("Sem referência de passos ótimos para este cenário.")
+        return
+    eficiencias = {valor: passos_otimos / np.maximum(np.asarray(dados, dtype=np.float64), 1.0)
+                   for valor, dados in resultados.items()}
+
+    plt.figure(figsize=(10, 6))
+    for valor, dados in eficiencias.items():
+        dados_suaves = np.array([media_movel(linha) for linha in np.atleast_2d(dados)])
+        plt.plot(np.arange(dados_suaves.shape[1]), dados_suaves.mean(axis=0), label=f"{parametro_nome} = {valor}")
+
+    plt.axhline(1.0, color="grey", linestyle="--")
+    plt.title(f'Eficiência do caminho ({passos_otimos} passos ótimos): {parametro_nome}')
+    plt.xlabel('Episódios')
+    plt.ylabel('Passos ótimos / passos usados (Média Móvel)')
+    plt.legend()
+    plt.grid(True)
+    nome_arquivo = f"grafico_eficiencia_{parametro_nome}.png"
+    plt.savefig(nome_arquivo)
+    print(f"Gráfico guardado como '{nome_arquivo}'")
+    plt.show()
+
 def plotar_grafico(resultados, parametro_nome):
+    """Média entre sementes (após média móvel) com intervalo de confiança a 95%."""
     plt.figure(figsize=(10, 6))
-    
+
     for valor, dados in resultados.items():
+        dados = np.atleast_2d(np.asarray(dados, dtype=np.float64))
         # Aplicar suavização para o gráfico ficar legível
-        dados_suaves = media_movel(dados)
-        plt.plot(dados_suaves, label=f"{parametro_nome} = {valor}")
-    
+        dados_suaves = np.array([media_movel(linha) for linha in dados])
+        media = dados_suaves.mean(axis=0)
+        eixo = np.arange(len(media))
+        linha, = plt.plot(eixo, media, label=f"{parametro_nome} = {valor}")
+
+        n = dados_suaves.shape[0]
+        if n > 1:
+            ic = 1.96 * dados_suaves.std(axis=0, ddof=1) / np.sqrt(n)
+            plt.fill_between(eixo, media - ic, media + ic, color=linha.get_color(), alpha=0.2)
+
     plt.title(f'Comparação de Performance: {parametro_nome}')
     plt.xlabel('Episódios')
-    plt.ylabel('Passos para chegar ao Objetivo (Média Móvel)')
+    plt.ylabel('Passos para chegar ao Objetivo (Média Móvel, média ± IC 95%)')
     plt.legend()
     plt.grid(True)
     nome_arquivo = f"grafico_comparacao_{parametro_nome}.png"
@@ -100,11 +274,17 @@ def plotar_grafico(resultados, parametro_nome):
 
 if __name__ == "__main__":
     # --- TESTE 1: Taxa de Aprendizagem (Alpha) ---
-    # Recomendado: 2000 episódios para o labirinto
+    # Recomendado: 2000 episódios para o labirinto, 3 sementes por valor
     dados_alpha = correr_teste("alpha", [0.1, 0.5, 0.9], n_episodios=2000)
     plotar_grafico(dados_alpha, "Taxa de Aprendizagem (Alpha)")
+    plotar_eficiencia(dados_alpha, "Taxa de Aprendizagem (Alpha)", passos_otimos_cenario())
 
     # --- (Opcional) TESTE 2: Gamma ---
     # Se quiseres testar o Gamma, descomenta as linhas abaixo:
     # dados_gamma = correr_teste("gamma", [0.5, 0.9, 0.99], n_episodios=2000)
-    # plotar_grafico(dados_gamma, "Fator de Desconto (Gamma)")
\ No newline at end of file
+    # plotar_grafico(dados_gamma, "Fator de Desconto (Gamma)")
+
+    # --- (Opcional) Vários parâmetros de uma vez: grelha ou pesquisa aleatória ---
+    # configs = grelha({"alpha": [0.1, 0.5], "gamma": [0.9, 0.99]})
+    # configs = aleatoria({"alpha": (0.05, 0.9), "gamma": [0.9, 0.95, 0.99]}, n_amostras=8)
+    # resultados = correr_varrimento(configs, sementes=(0, 1, 2), n_episodios=2000)
@@ -29,6 +29,11 @@ if __name__ == "__main__":
 
     motor = MotorDeSimulacao.cria(caminho_ficheiro)
 
+    # Visualização de agentes já treinados: políticas congeladas (sem updates TD nem gravações do .pkl)
+    for a in motor.agentes:
+        if hasattr(a, 'congelar'):
+            a.congelar()
+
     # --- BLOCO DE DIAGNÓSTICO (Para debug inicial) ---
     print(f"Total de agentes criados: {len(motor.agentes)}")
     for i, a in enumerate(motor.agentes):
@@ -12,6 +12,7 @@ from Politica import PoliticaQLearning
 from Motor import MotorDeSimulacao
 from visualizador import VisualizadorTk
 from Sensor import SensorDirecao, SensorVisao
+from Accoes import NOMES_ACCOES
 
 def testar_farol_visual_rl():
     print("=== Teste Visual: Problema do Farol (Agente Treinado) ===")
@@ -22,7 +23,7 @@ def testar_farol_visual_rl():
         return
 
     # 1. Configurar Política
-    accoes_possiveis = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+    accoes_possiveis = list(NOMES_ACCOES)
     politica = PoliticaQLearning(accoes_possiveis, epsilon=0.1) 
     politica.carregar(Q_TABLE_FILE)
     
@@ -38,6 +39,8 @@ def testar_farol_visual_rl():
     config_file = "JSONFILES/config_agente_qlearning.json"
     agente = AgenteRL("AgenteTreinado", (0, 0), config_file)
     agente.politica = politica
+    # Só avaliação: tabela estado -> ação, sem updates, gravações ou exploração
+    agente.congelar()
     # Criar um sensor que sabe calcular a direção
     sensor_bussola = SensorDirecao()
     sensor_visão = SensorVisao(raio_visao=1.5)
@@ -62,7 +65,7 @@ def testar_farol_visual_rl():
             viz.desenhar(ambiente, [agente])
             
             # Verificar se chegou
-            dist = ambiente.observacaoPara(agente).dados['distancia']
+            dist = ambiente.observacaoPara(agente).distancia
             if dist < 1.0:
                 print("!!! SUCESSO: O agente chegou ao farol! !!!")
                 # Mostrar estado final por um momento
@@ -36,7 +36,8 @@ def testar_labirinto_visual():
     Q_TABLE_FILE = "qtable_labirinto.pkl"
     if os.path.exists(Q_TABLE_FILE):
         agente.politica.carregar(Q_TABLE_FILE)
-        agente.politica.epsilon = 0.0  # Desligar exploração: o agente usa apenas o conhecimento
+        # Modo inferência: o agente usa apenas o conhecimento (sem exploração, updates nem gravações)
+        agente.congelar()
         print(f"Memória {Q_TABLE_FILE} carregada com sucesso.")
     else:
         print(f"AVISO: {Q_TABLE_FILE} não encontrado. O agente agirá sem treino.")
@@ -1,6 +1,7 @@
 import time
 import os
 from Motor import MotorDeSimulacao
+import Registo
 import sys
 
 # Configuração dos Cenários Disponíveis
@@ -26,36 +27,34 @@ def treinar_agente(n_episodios=1000):
     print(f"--- A INICIAR TREINO NO CENÁRIO: {ficheiro_cenario} ---")
     start_time = time.time()
 
+    # Treino sem consola: só avisos e erros. Para depurar, por exemplo:
+    # Registo.configurar(nivel=Registo.DEPURACAO, ficheiro="treino.jsonl")
+    Registo.configurar(nivel=Registo.AVISO)
+
     # Caminho do ficheiro de configuração
     ficheiro_cenario = "JSONFILES/farol1copy.json"
 
+    # 1. Criar o motor uma única vez (o AgenteRL carrega o .pkl existente e continua a aprender)
+    # Entre episódios o mundo é apenas reiniciado: sem reler o JSON, o .pkl ou criar novas threads
+    motor = MotorDeSimulacao.cria(ficheiro_cenario, sincrono=True)
+    max_passos = 200 # Limite para ele não ficar preso em loop infinito
+
     for i in range(1, n_episodios + 1):
-        # 1. Criar o motor (isto reinicia o ambiente e carrega o agente)
-        # O AgenteRL vai carregar automaticamente o .pkl existente e continuar a aprender
-        motor = MotorDeSimulacao.cria(ficheiro_cenario)
-        
-        # 2. Executar até ao fim (sem visualizador)
-        # Precisamos de um ciclo que faça o motor andar passo a passo até acabar
-        # Como o teu motor.executa() faz apenas um passo, fazemos um loop:
-        passos = 0
-        max_passos = 200 # Limite para ele não ficar preso em loop infinito
-        
-        while passos < max_passos:
-            motor.executa()
-            passos += 1
-            
-            # Critério de paragem: Precisas de saber se o agente chegou
-            # Podes verificar a recompensa do agente ou se a distância é 0
-            # Para simplificar, assumimos que ele corre max_passos e aprende com isso
-        
-        # 3. Importante: Forçar o agente a salvar o cérebro no final do episódio
-        for agente in motor.agentes:
-            if hasattr(agente, "stop"):
-                agente.stop() # Isto chama o método salvar() que criámos antes
+        # 2. Executar um episódio completo (sem visualizador)
+        motor.executa_episodio(max_passos)
 
         if i % 100 == 0:
+            # 3. Forçar o agente a salvar o cérebro periodicamente
+            for agente in motor.agentes:
+                if hasattr(agente, "stop"):
+                    agente.stop() # Isto chama o método salvar() que criámos antes
             print(f"Episódio {i}/{n_episodios} concluído...")
 
+    for agente in motor.agentes:
+        if hasattr(agente, "stop"):
+            agente.stop()
+    motor.parar_agentes()
+
     total_time = time.time() - start_time
     print(f"--- TREINO CONCLUÍDO EM {total_time:.2f} SEGUNDOS ---")
     print("Agora podes correr o 'main.py' para ver o resultado!")
@@ -1,7 +1,6 @@
 import sys
 import os
 import time
-import random
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -10,11 +9,17 @@ from AmbienteFarol import AmbienteFarol
 from AgenteRL import AgenteRL
 from Politica import PoliticaQLearning
 from Motor import MotorDeSimulacao
+import Registo
 
 from Sensor import SensorDirecao
+from Accoes import NOMES_ACCOES
 
 def treinar_farol():
     print("=== Treino: Problema do Farol (Q-Learning) ===")
+    # Treino sem consola: só avisos e erros. Para depurar, por exemplo:
+    # Registo.configurar(nivel=Registo.DEPURACAO, ficheiro="treino.jsonl")
+    Registo.configurar(nivel=Registo.AVISO)
+
     
     # Parâmetros de Treino
     NUM_EPISODIOS = 1000
@@ -22,8 +27,10 @@ def treinar_farol():
     Q_TABLE_FILE = "qtable_farol.pkl"
     
     # 1. Configurar Política
-    accoes_possiveis = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)] # 8 direções
-    politica = PoliticaQLearning(accoes_possiveis, alpha=0.5, gamma=0.9, epsilon=0.5)
+    accoes_possiveis = list(NOMES_ACCOES) # 8 direções (ids inteiros dentro da política)
+    # Exploração: 0.5 a descer 0.5% por episódio até 0.01 (avançada pelo Motor no fim de cada episódio)
+    politica = PoliticaQLearning(accoes_possiveis, alpha=0.5, gamma=0.9,
+                                 exploracao={"tipo": "exponencial", "inicial": 0.5, "fator": 0.995, "minimo": 0.01})
     
     # Carregar política existente se houver (para continuar treino)
     if os.path.exists(Q_TABLE_FILE):
@@ -39,7 +46,8 @@ def treinar_farol():
             obstaculos=[(5,5),(2,2), (4,5)]
         )
         
-        agente = AgenteRL("AgenteAprendiz", politica)
+        agente = AgenteRL("AgenteAprendiz", pos_inicial_agente, "JSONFILES/config_agente_qlearning.json")
+        agente.politica = politica
         
         # Instalar sensores para consistência com o teste
         sensor_bussola = SensorDirecao()
@@ -49,10 +57,7 @@ def treinar_farol():
         
         ambiente.adicionar_agente(agente, pos_inicial_agente)
         
-        motor = MotorDeSimulacao(ambiente, [agente])
-        
-        # Reduzir epsilon ao longo do tempo (Exploration Decay)
-        politica.epsilon = max(0.01, politica.epsilon * 0.995)
+        motor = MotorDeSimulacao(ambiente, [agente], sincrono=True)
         
         # Loop do Episódio
         passos = 0
@@ -63,7 +68,7 @@ def treinar_farol():
             
             # Verificar se chegou (distancia < 1.0)
             obs = ambiente.observacaoPara(agente)
-            if obs.dados['distancia'] < 1.0:
+            if obs.distancia < 1.0:
                 chegou = True
                 break
         
@@ -71,10 +76,10 @@ def treinar_farol():
         if (episodio + 1) % 10 == 0:
             print(f"Episódio {episodio+1}/{NUM_EPISODIOS} - Passos: {passos} - Recompensa Total: {agente.recompensa_total:.2f} - Epsilon: {politica.epsilon:.4f}")
 
-        # Parar thread do agente deste episódio
-        agente.running = False
-        agente.start_step_event.set()
-        agente.join() # Esperar que a thread termine
+        # Fechar o episódio (sem threads no modo síncrono) e avançar a exploração
+        agente.fim_episodio(chegou)
+        motor.avancar_exploracao(chegou)
+        motor.parar_agentes()
 
     print("\n=== Treino Concluído ===")
     politica.salvar(Q_TABLE_FILE)
@@ -4,9 +4,14 @@ from AmbienteLabirinto import AmbienteLabirinto
 from AgenteLabirinto import AgenteLabirinto
 from Sensor import SensorDirecao, SensorProximidade
 from Motor import MotorDeSimulacao
+import Registo
 
 def treinar_labirinto():
     print("=== Iniciando Treino: Problema do Labirinto ===")
+    # Treino sem consola: só avisos e erros. Para depurar, por exemplo:
+    # Registo.configurar(nivel=Registo.DEPURACAO, ficheiro="treino.jsonl")
+    Registo.configurar(nivel=Registo.AVISO)
+
     
     # 1. Carregar Configurações do Mapa
     with open("JSONFILES/labirinto1.json", "r") as f:
@@ -30,8 +35,11 @@ def treinar_labirinto():
     # Instalar os dois sensores fundamentais para o labirinto
     agente.instala(SensorDirecao())
     agente.instala(SensorProximidade())
+    # Regista a posição inicial: o reset() de cada episódio repõe-na
+    ambiente.adicionar_agente(agente, tuple(agente_cfg["posicao"]))
     
-    motor = MotorDeSimulacao(ambiente, [agente])
+    # Treino sem visualização: modo síncrono (sem threads por agente)
+    motor = MotorDeSimulacao(ambiente, [agente], sincrono=True)
     
     # 3. Parâmetros de Treino
     EPISODIOS = 1000  # Labirintos exigem mais episódios que o farol
@@ -41,20 +49,11 @@ def treinar_labirinto():
     print(f"Treinando por {EPISODIOS} episódios...")
     
     for ep in range(EPISODIOS):
-        # Reset do ambiente para o início do labirinto
-        ambiente.adicionar_agente(agente, tuple(agente_cfg["posicao"]))
-        ambiente._alvo_atingido = False
-        agente.passos = 0
-        
-        # Estratégia de Exploração (Epsilon-Greedy Decay)
-        # Começa em 0.6 (muita exploração) e desce até 0.1 (mais decisão)
-        if agente.politica:
-            agente.politica.epsilon = max(0.1, 0.6 * (0.996 ** ep))
+        # O epsilon segue a agenda "exploracao" do JSON do agente (Exploracao.py), avançada pelo Motor no fim
+        # de cada episódio: começa em 0.6 e desce até 0.01 (a avaliação, com congelar(), já não explora)
         
-        for passo in range(MAX_PASSOS):
-            motor.executa()
-            if ambiente.simulacao_concluida():
-                break
+        # Reinicia o labirinto (posição inicial, saída por atingir) e corre o episódio
+        motor.executa_episodio(MAX_PASSOS)
         
         # Feedback de progresso e salvamento periódico
         if (ep + 1) % 100 == 0:
@@ -0,0 +1,93 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from Motor import MotorDeSimulacao
+from AgenteRL import AgenteRL
+from Politica import PoliticaQLearning
+from Accoes import ids_accoes
+import FicheiroQ
+import TabelaPartilhada
+import Registo
+
+# Q-learning assíncrono: N processos correm episódios do mesmo cenário e atualizam todos a mesma
+# Q-Table densa, guardada num bloco de memória partilhada (TabelaPartilhada.TabelaQMemoriaPartilhada).
+# O processo principal carrega a memória do agente para o bloco no início e grava-a no fim.
+
+CENARIO = "JSONFILES/labirinto1.json"
+ACCOES_PADRAO = ["norte", "sul", "este", "oeste", "nordeste", "sudeste", "sudoeste", "noroeste"]
+
+
+def _iniciar_trabalhador(chave: str, nome_memoria: str):
+    Registo.configurar(nivel=Registo.AVISO)
+    TabelaPartilhada.usar_memoria_partilhada(chave, nome_memoria)
+    # Quem carrega e grava a memória é o processo principal: os agentes dos trabalhadores nascem sem ler
+    # o ficheiro nem criar checkpoints, e só depois passam a usar o bloco partilhado
+    AgenteRL.dono_memoria = False
+
+def _treinar(cenario: str, chave: str, n_episodios: int, max_passos: int, semente: int) -> dict:
+    motor = MotorDeSimulacao.cria(cenario, sincrono=True, semente=semente)
+    for agente in motor.agentes:
+        if isinstance(agente, AgenteRL) and agente.politica is not None:
+            # Mesmo sem "tabela_partilhada" no JSON, todos os agentes RL passam a usar o bloco partilhado
+            agente.politica.tabela, _ = TabelaPartilhada.partilhar(chave, agente.politica.tabela)
+
+    passos = sucessos = 0
+    try:
+        for _ in range(n_episodios):
+            estatisticas = motor.executa_episodio(max_passos)
+            passos += estatisticas["passos"]
+            sucessos += estatisticas["sucesso"]
+    finally:
+        motor.parar_agentes()
+        # Fecha a ligação deste trabalhador ao bloco; a próxima tarefa no mesmo processo volta a abri-la
+        TabelaPartilhada.esquecer(chave)
+    return {"passos": passos, "sucessos": sucessos}
+
+
+def treinar_paralelo(cenario=CENARIO, n_processos=4, episodios_por_processo=250, max_passos=200):
+    print(f"=== Treino paralelo: {cenario} | {n_processos} processos x {episodios_por_processo} episódios ===")
+    Registo.configurar(nivel=Registo.AVISO)
+
+    # Configuração do primeiro agente RL do cenário (ações, chave e ficheiro de memória)
+    with open(cenario, "r") as f:
+        params = json.load(f)
+    agente_info = next(a for a in params["agentes"] if a.get("classe", "").strip() == "AgenteRL")
+    ficheiro_config = agente_info["ficheiro_config"].lstrip('/').lstrip('\\')
+    with open(ficheiro_config, "r") as f:
+        config = json.load(f)
+    chave = config.get("tabela_partilhada", ficheiro_config)
+    ficheiro_memoria = ficheiro_config.replace(".json", ".pkl")
+    ficheiro_binario = ficheiro_config.replace(".json", FicheiroQ.EXTENSAO)
+    if config.get("memoria") == "binaria" or os.path.exists(ficheiro_binario):
+        ficheiro_memoria = ficheiro_binario
+
+    tabela = TabelaPartilhada.TabelaQMemoriaPartilhada(ids_accoes(config.get("accoes", ACCOES_PADRAO)), criar=True)
+    try:
+        # A política do processo principal só serve para ler e gravar a memória do bloco
+        politica = PoliticaQLearning(config.get("accoes", ACCOES_PADRAO), alpha=config.get("alpha", 0.1),
+                                     gamma=config.get("gamma", 0.9), epsilon=config.get("epsilon", 0.1))
+        politica.tabela = tabela
+        politica.carregar(ficheiro_memoria)
+
+        inicio = time.time()
+        with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_trabalhador,
+                                 initargs=(chave, tabela.nome)) as executor:
+            futuros = [executor.submit(_treinar, cenario, chave, episodios_por_processo, max_passos, semente)
+                       for semente in range(n_processos)]
+            resultados = [futuro.result() for futuro in futuros]
+        duracao = time.time() - inicio
+
+        passos = sum(r["passos"] for r in resultados)
+        sucessos = sum(r["sucessos"] for r in resultados)
+        print(f"{passos} passos em {duracao:.2f} s ({passos / duracao:.0f} passos/s) | "
+              f"{sucessos}/{n_processos * episodios_por_processo} episódios com sucesso")
+
+        politica.salvar(ficheiro_memoria)
+        print(f"Memória guardada em: {ficheiro_memoria} ({len(tabela)} estados)")
+    finally:
+        tabela.destruir()
+
+
+if __name__ == "__main__":
+    treinar_paralelo()